@@ -0,0 +1,40 @@
+"""Compare two benchmark reports written by benchmarks.run.
+
+    python -m benchmarks.compare before.json after.json
+"""
+import argparse
+import json
+
+METRICS = ["rps", "p50_ms", "p95_ms", "p99_ms", "queries_per_request"]
+
+def change(before, after):
+    if before is None or after is None:
+        return "-"
+    if before == 0:
+        return f"{after:.1f}"
+    return f"{(after - before) / before * 100:+.1f}%"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show per-route changes between two benchmark reports.")
+    parser.add_argument("before")
+    parser.add_argument("after")
+    args = parser.parse_args()
+
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+
+    print(f"before: {before['meta'].get('commit')}  after: {after['meta'].get('commit')}")
+    header = f"{'route':<42} " + " ".join(f"{metric:>20}" for metric in METRICS)
+    print(header)
+    print("-" * len(header))
+    rows = [("total", before["totals"], after["totals"])]
+    rows += [(label, before["routes"].get(label, {}), route) for label, route in after["routes"].items()]
+    for label, old, new in rows:
+        cells = []
+        for metric in METRICS:
+            old_value, new_value = old.get(metric), new.get(metric)
+            value = "-" if new_value is None else f"{new_value:g}"
+            cells.append(f"{value + ' (' + change(old_value, new_value) + ')':>20}")
+        print(f"{label:<42} " + " ".join(cells))
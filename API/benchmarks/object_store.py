@@ -0,0 +1,40 @@
+import io
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+class InMemoryObjectStore:
+    """Stand-in for the MinIO client so in-process benchmarks measure the API, not object storage."""
+
+    def __init__(self, endpoint: str = "http://minio.benchmark"):
+        self.endpoint = endpoint
+        self.buckets = set()
+        self.objects = {}
+
+    def bucket_exists(self, bucket_name):
+        return bucket_name in self.buckets
+
+    def make_bucket(self, bucket_name):
+        self.buckets.add(bucket_name)
+
+    def put_object(self, bucket_name, object_name, data, length, content_type="application/octet-stream", **kwargs):
+        body = data.read() if length == -1 else data.read(length)
+        self.buckets.add(bucket_name)
+        self.objects[(bucket_name, object_name)] = (body, content_type, datetime.now(timezone.utc))
+        return SimpleNamespace(bucket_name=bucket_name, object_name=object_name, etag=str(hash(body)))
+
+    def get_object(self, bucket_name, object_name, **kwargs):
+        return io.BytesIO(self.objects[(bucket_name, object_name)][0])
+
+    def stat_object(self, bucket_name, object_name, **kwargs):
+        body, content_type, modified = self.objects[(bucket_name, object_name)]
+        return SimpleNamespace(bucket_name=bucket_name, object_name=object_name, size=len(body),
+                               content_type=content_type, last_modified=modified, etag=str(hash(body)))
+
+    def remove_object(self, bucket_name, object_name, **kwargs):
+        self.objects.pop((bucket_name, object_name), None)
+
+    def presigned_get_object(self, bucket_name, object_name, expires=None, **kwargs):
+        return f"{self.endpoint}/{bucket_name}/{object_name}"
+
+    def presigned_put_object(self, bucket_name, object_name, expires=None, **kwargs):
+        return f"{self.endpoint}/{bucket_name}/{object_name}?upload"
@@ -0,0 +1,300 @@
+"""Replay weighted, frontend-shaped traffic against the API and report latency per route.
+
+    python -m benchmarks.run --duration 60 --concurrency 20 --output results.json
+    python -m benchmarks.run --base-url http://localhost:8000 --duration 60
+
+Without --base-url the app runs in-process behind an ASGI transport with an in-memory
+object store standing in for MinIO. Queries per request come from the Server-Timing
+header, so against a live server they are reported for sampled requests only. Seed the
+database with `python -m benchmarks.seed` first. Compare two result files with
+`python -m benchmarks.compare`.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+
+import httpx
+
+API = "/api/v1"
+DEFAULT_WEIGHTS = {"open_project": 20, "drag_task": 15, "post_comment": 10, "poll_notifications": 55}
+TASK_STATUSES = ["pending", "in_progress", "completed"]
+
+def queries_from_server_timing(header: str):
+    # e.g. 'app;dur=12.0, db;dur=3.1, queries;desc="4", db-slowest;dur=1.2'
+    for metric in header.split(","):
+        name, _, params = metric.strip().partition(";")
+        if name == "queries":
+            for param in params.split(";"):
+                key, _, value = param.partition("=")
+                if key.strip() == "desc":
+                    return int(value.strip('" '))
+    return None
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+        self.queries = defaultdict(list)
+        self.recording = False
+
+    async def request(self, client: httpx.AsyncClient, label: str, method: str, path: str, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, API + path, **kwargs)
+        except httpx.HTTPError as exc:
+            if self.recording:
+                self.statuses[label][type(exc).__name__] += 1
+            return None
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if self.recording:
+            self.latencies[label].append(elapsed_ms)
+            self.statuses[label][str(response.status_code)] += 1
+            queries = queries_from_server_timing(response.headers.get("server-timing", ""))
+            if queries is not None:
+                self.queries[label].append(queries)
+        return response
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    rank = max(int(round(pct / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+def summarize(recorder: Recorder, measured_seconds: float):
+    routes = {}
+    for label in sorted(set(recorder.statuses) | set(recorder.latencies)):
+        values = sorted(recorder.latencies[label])
+        statuses = dict(recorder.statuses[label])
+        count = sum(statuses.values())
+        queries = recorder.queries[label]
+        routes[label] = {
+            "requests": count,
+            "errors": sum(n for code, n in statuses.items() if not code.isdigit() or int(code) >= 500),
+            "statuses": statuses,
+            "rps": round(count / measured_seconds, 2),
+            "p50_ms": _round(percentile(values, 50)),
+            "p95_ms": _round(percentile(values, 95)),
+            "p99_ms": _round(percentile(values, 99)),
+            "mean_ms": _round(sum(values) / len(values) if values else None),
+            "max_ms": _round(values[-1] if values else None),
+            "queries_per_request": _round(sum(queries) / len(queries) if queries else None),
+        }
+    total = sum(route["requests"] for route in routes.values())
+    all_values = sorted(v for values in recorder.latencies.values() for v in values)
+    totals = {
+        "requests": total,
+        "errors": sum(route["errors"] for route in routes.values()),
+        "rps": round(total / measured_seconds, 2),
+        "p50_ms": _round(percentile(all_values, 50)),
+        "p95_ms": _round(percentile(all_values, 95)),
+        "p99_ms": _round(percentile(all_values, 99)),
+    }
+    return totals, routes
+
+def _round(value):
+    return None if value is None else round(value, 2)
+
+class VirtualUser:
+    def __init__(self, index: int, client: httpx.AsyncClient, recorder: Recorder, rng: random.Random, password: str):
+        self.index = index
+        self.client = client
+        self.recorder = recorder
+        self.rng = rng
+        self.password = password
+        self.project_ids = []
+        self.tasks = {}
+        self.etags = {}
+
+    @property
+    def email(self):
+        # Every fourth virtual user is a manager, like the mix of people using a project board.
+        if self.index % 4 == 0:
+            return f"bench-manager-{self.index // 4}@example.com"
+        return f"bench-member-{self.index}@example.com"
+
+    async def start(self):
+        response = await self.client.post(f"{API}/token", data={"username": self.email, "password": self.password})
+        response.raise_for_status()
+        self.client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+        projects = await self.recorder.request(self.client, "GET /projects/", "GET", "/projects/")
+        self.project_ids = [project["id"] for project in projects.json()] if projects is not None else []
+        if not self.project_ids:
+            raise RuntimeError(f"{self.email} is not a member of any project; run benchmarks.seed first")
+
+    async def open_project(self):
+        # Mirrors fetchProjectData in Frontend/src/stores/project.js: one board request that the
+        # browser revalidates with If-None-Match when the project is opened again.
+        project_id = self.rng.choice(self.project_ids)
+        headers = {"If-None-Match": self.etags[project_id]} if project_id in self.etags else {}
+        response = await self.recorder.request(
+            self.client, "GET /projects/{project_id}/board", "GET", f"/projects/{project_id}/board", headers=headers
+        )
+        if response is not None and response.status_code == 200:
+            self.etags[project_id] = response.headers.get("etag")
+            self.tasks[project_id] = response.json()["tasks"]
+        return project_id
+
+    async def _some_task(self):
+        if not self.tasks:
+            await self.open_project()
+        tasks = self.tasks.get(self.rng.choice(list(self.tasks)))
+        return self.rng.choice(tasks) if tasks else None
+
+    async def drag_task(self):
+        # Mirrors updateTaskStatus: the whole task minus read-only fields, with a new status.
+        task = await self._some_task()
+        if task is None:
+            return
+        task["status"] = self.rng.choice([s for s in TASK_STATUSES if s != task["status"]])
+        payload = {key: value for key, value in task.items() if key not in ("id", "project_id", "created_at", "updated_at", "files")}
+        await self.recorder.request(self.client, "PUT /tasks/{task_id}", "PUT", f"/tasks/{task['id']}", json=payload)
+
+    async def post_comment(self):
+        task = await self._some_task()
+        if task is None:
+            return
+        body = {"content": f"Benchmark comment {self.rng.random():.6f}"}
+        if task.get("assignee_id") and self.rng.random() < 0.3:
+            body["mentioned_user_ids"] = [task["assignee_id"]]
+        await self.recorder.request(self.client, "POST /tasks/{task_id}/comments/", "POST", f"/tasks/{task['id']}/comments/", json=body)
+        await self.recorder.request(self.client, "GET /tasks/{task_id}/comments/", "GET", f"/tasks/{task['id']}/comments/")
+
+    async def poll_notifications(self):
+        # The notification bell polls with the last ETag, so an unchanged inbox is a 304.
+        headers = {"If-None-Match": self.etags["notifications"]} if "notifications" in self.etags else {}
+        response = await self.recorder.request(
+            self.client, "GET /notifications/me", "GET", "/notifications/me", params={"unread_only": True}, headers=headers
+        )
+        if response is not None and response.status_code == 200:
+            self.etags["notifications"] = response.headers.get("etag")
+
+    async def run(self, deadline: float, weights: dict, think_seconds: float):
+        names = list(weights)
+        chances = [weights[name] for name in names]
+        while time.monotonic() < deadline:
+            await getattr(self, self.rng.choices(names, chances)[0])()
+            if think_seconds:
+                await asyncio.sleep(think_seconds)
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+async def run_benchmark(args, weights):
+    recorder = Recorder()
+    timeout = httpx.Timeout(args.timeout)
+    limits = httpx.Limits(max_connections=args.concurrency * 8)
+
+    if args.base_url:
+        def make_client():
+            return httpx.AsyncClient(base_url=args.base_url, timeout=timeout, limits=limits)
+        lifespan = None
+    else:
+        # Every request carries Server-Timing in-process unless a sample rate was set explicitly.
+        os.environ.setdefault("INSTRUMENTATION_SAMPLE_RATE", "1")
+        from core.minio_client import get_minio_client
+        from benchmarks.object_store import InMemoryObjectStore
+        from main import app
+
+        store = InMemoryObjectStore()
+        app.dependency_overrides[get_minio_client] = lambda: store
+        transport = httpx.ASGITransport(app=app)
+        lifespan = app.router.lifespan_context(app)
+
+        def make_client():
+            return httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=timeout)
+
+    if lifespan is not None:
+        await lifespan.__aenter__()
+    try:
+        users = [
+            VirtualUser(i, make_client(), recorder, random.Random(args.seed + i), args.password)
+            for i in range(args.concurrency)
+        ]
+        await asyncio.gather(*(user.start() for user in users))
+
+        if args.warmup:
+            warmup_deadline = time.monotonic() + args.warmup
+            await asyncio.gather(*(user.run(warmup_deadline, weights, args.think_ms / 1000) for user in users))
+
+        recorder.recording = True
+        started = time.monotonic()
+        await asyncio.gather(*(user.run(started + args.duration, weights, args.think_ms / 1000) for user in users))
+        measured = time.monotonic() - started
+        recorder.recording = False
+
+        for user in users:
+            await user.client.aclose()
+    finally:
+        if lifespan is not None:
+            await lifespan.__aexit__(None, None, None)
+    return recorder, measured
+
+def print_table(totals, routes):
+    header = f"{'route':<42} {'req':>7} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'q/req':>6} {'err':>5}"
+    print(header, file=sys.stderr)
+    print("-" * len(header), file=sys.stderr)
+    for label, route in routes.items():
+        queries = "-" if route["queries_per_request"] is None else f"{route['queries_per_request']:.1f}"
+        print(f"{label:<42} {route['requests']:>7} {route['rps']:>8.1f} {route['p50_ms'] or 0:>8.1f} "
+              f"{route['p95_ms'] or 0:>8.1f} {route['p99_ms'] or 0:>8.1f} {queries:>6} {route['errors']:>5}", file=sys.stderr)
+    print(f"{'total':<42} {totals['requests']:>7} {totals['rps']:>8.1f} {totals['p50_ms'] or 0:>8.1f} "
+          f"{totals['p95_ms'] or 0:>8.1f} {totals['p99_ms'] or 0:>8.1f} {'':>6} {totals['errors']:>5}", file=sys.stderr)
+
+def parse_weights(value: str):
+    weights = dict(DEFAULT_WEIGHTS)
+    for item in filter(None, value.split(",")):
+        name, _, weight = item.partition("=")
+        if name not in DEFAULT_WEIGHTS:
+            raise argparse.ArgumentTypeError(f"unknown scenario {name!r}; choose from {', '.join(DEFAULT_WEIGHTS)}")
+        weights[name] = float(weight)
+    return {name: weight for name, weight in weights.items() if weight > 0}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay weighted frontend traffic and report per-route latency.")
+    parser.add_argument("--base-url", help="Benchmark a running server instead of the in-process app")
+    parser.add_argument("--duration", type=float, default=30, help="Measured seconds (default: 30)")
+    parser.add_argument("--warmup", type=float, default=5, help="Unmeasured seconds before measuring (default: 5)")
+    parser.add_argument("--concurrency", type=int, default=20, help="Virtual users (default: 20)")
+    parser.add_argument("--think-ms", type=float, default=0, help="Pause after each scenario, per virtual user")
+    parser.add_argument("--weights", type=parse_weights, default=dict(DEFAULT_WEIGHTS),
+                        help="Scenario weights, e.g. open_project=20,drag_task=15,post_comment=10,poll_notifications=55")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for scenario choice")
+    parser.add_argument("--password", default="benchmark", help="Password given to benchmarks.seed")
+    parser.add_argument("--timeout", type=float, default=30, help="Per-request timeout in seconds")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+
+    recorder, measured = asyncio.run(run_benchmark(args, args.weights))
+    totals, routes = summarize(recorder, measured)
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "finished_at": datetime.now(timezone.utc).isoformat(),
+            "mode": "http" if args.base_url else "in-process",
+            "base_url": args.base_url,
+            "duration_seconds": round(measured, 2),
+            "concurrency": args.concurrency,
+            "think_ms": args.think_ms,
+            "weights": args.weights,
+            "seed": args.seed,
+        },
+        "totals": totals,
+        "routes": routes,
+    }
+
+    print_table(totals, routes)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
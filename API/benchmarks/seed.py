@@ -0,0 +1,180 @@
+"""Seed a scratch database with a synthetic dataset for the benchmarks.
+
+    python -m benchmarks.seed --truncate
+
+Everything is generated inside Postgres with generate_series, so the default dataset
+(2,000 projects, 200,000 tasks with as many comments and time logs) takes seconds.
+Benchmark accounts are bench-manager-<n>@example.com and bench-member-<n>@example.com,
+all with the password from --password.
+"""
+import argparse
+import time
+
+from sqlalchemy import text
+
+from core.database import SessionLocal
+from v1.auth import get_password_hash
+from v1.notification_inbox import reconcile_notification_counters
+from v1.task_counters import reconcile_task_counters
+
+APP_TABLES = [
+    "notification_counters", "project_task_counts", "mentions", "task_files", "project_files", "notifications", "issues", "time_logs",
+    "task_dependencies", "comments", "tasks", "milestones", "project_members", "projects", "users",
+]
+
+STEPS = [
+    ("users", """
+        INSERT INTO users (email, hashed_password, role_id)
+        SELECT 'bench-manager-' || g || '@example.com', :password, 2 FROM generate_series(0, :managers - 1) g
+        UNION ALL
+        SELECT 'bench-member-' || g || '@example.com', :password, 3 FROM generate_series(0, :members - 1) g
+    """),
+    ("user index", """
+        CREATE TEMP TABLE bench_managers AS
+            SELECT substring(email FROM 'bench-manager-(\\d+)@')::int AS n, id FROM users WHERE email LIKE 'bench-manager-%';
+        CREATE TEMP TABLE bench_members AS
+            SELECT substring(email FROM 'bench-member-(\\d+)@')::int AS n, id FROM users WHERE email LIKE 'bench-member-%';
+        CREATE UNIQUE INDEX ON bench_managers (n);
+        CREATE UNIQUE INDEX ON bench_members (n);
+    """),
+    ("projects", """
+        CREATE TEMP TABLE bench_projects (n int PRIMARY KEY, id int, owner_id int);
+        WITH created AS (
+            INSERT INTO projects (name, description, owner_id, start_date, end_date, budget, created_at)
+            SELECT 'Benchmark project ' || g, 'Synthetic project ' || g, m.id,
+                   current_date - (g % 365), current_date + 30 + (g % 365), 1000 + (g % 50) * 500,
+                   now() - make_interval(days => g % 365)
+            FROM generate_series(0, :projects - 1) g
+            JOIN bench_managers m ON m.n = g % :managers
+            RETURNING id, owner_id
+        )
+        INSERT INTO bench_projects SELECT row_number() OVER (ORDER BY id) - 1, id, owner_id FROM created;
+    """),
+    ("project members", """
+        INSERT INTO project_members (project_id, user_id, role_id)
+        SELECT id, owner_id, 2 FROM bench_projects;
+        CREATE TEMP TABLE bench_project_members AS
+            SELECT p.n AS project_n, p.id AS project_id, j, m.id AS user_id
+            FROM bench_projects p
+            CROSS JOIN generate_series(0, :members_per_project - 1) j
+            JOIN bench_members m ON m.n = (p.n * :members_per_project + j) % :members;
+        CREATE INDEX ON bench_project_members (project_id, j);
+        INSERT INTO project_members (project_id, user_id, role_id)
+        SELECT project_id, user_id, 3 FROM bench_project_members ON CONFLICT DO NOTHING;
+    """),
+    ("tasks", """
+        INSERT INTO tasks (title, description, status, priority, project_id, assignee_id, created_at, due_date)
+        SELECT 'Task ' || t || ' of project ' || p.n,
+               'Synthetic task description ' || t,
+               (ARRAY['pending', 'in_progress', 'completed'])[1 + (t + p.n) % 3],
+               (ARRAY['low', 'medium', 'high'])[1 + t % 3],
+               p.id,
+               pm.user_id,
+               now() - make_interval(days => (t * 7 + p.n) % 365, mins => t),
+               current_date + ((t * 3 + p.n) % 120) - 30
+        FROM bench_projects p
+        CROSS JOIN generate_series(0, :tasks_per_project - 1) t
+        JOIN bench_project_members pm ON pm.project_id = p.id AND pm.j = t % :members_per_project;
+    """),
+    ("task dependencies", """
+        INSERT INTO task_dependencies (task_id, depends_on_task_id)
+        SELECT id, previous_id FROM (
+            SELECT id, lag(id) OVER (PARTITION BY project_id ORDER BY id) AS previous_id,
+                   row_number() OVER (PARTITION BY project_id ORDER BY id) AS position
+            FROM tasks
+        ) chained
+        WHERE previous_id IS NOT NULL AND position % 5 <> 1;
+    """),
+    ("comments", """
+        INSERT INTO comments (content, task_id, author_id, created_at)
+        SELECT 'Synthetic comment ' || c || ' on task ' || t.id, t.id, coalesce(t.assignee_id, p.owner_id),
+               t.created_at + make_interval(hours => c + 1)
+        FROM tasks t
+        JOIN bench_projects p ON p.id = t.project_id
+        CROSS JOIN generate_series(1, :comments_per_task) c;
+    """),
+    ("time logs", """
+        INSERT INTO time_logs (task_id, user_id, start_time, end_time, notes)
+        SELECT t.id, coalesce(t.assignee_id, p.owner_id),
+               t.created_at + make_interval(days => l),
+               t.created_at + make_interval(days => l, hours => 1 + (t.id + l) % 6),
+               'Synthetic work log'
+        FROM tasks t
+        JOIN bench_projects p ON p.id = t.project_id
+        CROSS JOIN generate_series(1, :timelogs_per_task) l;
+    """),
+    ("issues", """
+        INSERT INTO issues (project_id, title, description, status, severity, reporter_id, assignee_id, created_at)
+        SELECT p.id, 'Issue ' || i, 'Synthetic issue ' || i,
+               (ARRAY['open', 'in_progress', 'closed'])[1 + i % 3],
+               (ARRAY['low', 'medium', 'high', 'critical'])[1 + i % 4],
+               p.owner_id, pm.user_id, now() - make_interval(days => i)
+        FROM bench_projects p
+        CROSS JOIN generate_series(0, :issues_per_project - 1) i
+        JOIN bench_project_members pm ON pm.project_id = p.id AND pm.j = i % :members_per_project;
+    """),
+    ("milestones", """
+        INSERT INTO milestones (project_id, name, description, due_date, status)
+        SELECT p.id, 'Milestone ' || m, 'Synthetic milestone', current_date + m * 30,
+               CASE WHEN m = 1 THEN 'completed' ELSE 'pending' END
+        FROM bench_projects p
+        CROSS JOIN generate_series(1, :milestones_per_project) m;
+    """),
+    ("files", """
+        INSERT INTO project_files (project_id, file_name, object_name, content_type, file_size, uploaded_by_id, uploaded_at)
+        SELECT p.id, 'document-' || f || '.pdf', 'benchmark/' || p.id || '/document-' || f || '.pdf',
+               'application/pdf', 10000 + f * 1000, p.owner_id, now() - make_interval(days => f)
+        FROM bench_projects p
+        CROSS JOIN generate_series(1, :files_per_project) f;
+    """),
+    ("notifications", """
+        INSERT INTO notifications (user_id, message, is_read, created_at)
+        SELECT u.id, 'Synthetic notification ' || k, k % 4 <> 0, now() - make_interval(hours => k)
+        FROM (SELECT id FROM bench_managers UNION ALL SELECT id FROM bench_members) u
+        CROSS JOIN generate_series(1, :notifications_per_user) k;
+    """),
+]
+
+def seed(db, params: dict, truncate: bool):
+    if truncate:
+        db.execute(text(f"TRUNCATE {', '.join(APP_TABLES)} RESTART IDENTITY CASCADE"))
+    for name, sql in STEPS:
+        started = time.perf_counter()
+        for statement in filter(str.strip, sql.split(";")):
+            db.execute(text(statement), params)
+        print(f"  {name:<18} {time.perf_counter() - started:6.2f}s")
+    db.commit()
+
+    reconcile_task_counters(db)
+    reconcile_notification_counters(db)
+    # Fresh statistics so the planner sees the real table sizes.
+    db.connection().exec_driver_sql("ANALYZE")
+    db.commit()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seed a scratch database with a synthetic benchmark dataset.")
+    parser.add_argument("--truncate", action="store_true", help="Empty every application table (except roles) first")
+    parser.add_argument("--password", default="benchmark", help="Password for every benchmark account")
+    parser.add_argument("--managers", type=int, default=200)
+    parser.add_argument("--members", type=int, default=2000)
+    parser.add_argument("--projects", type=int, default=2000)
+    parser.add_argument("--members-per-project", type=int, default=8)
+    parser.add_argument("--tasks-per-project", type=int, default=100)
+    parser.add_argument("--comments-per-task", type=int, default=1)
+    parser.add_argument("--timelogs-per-task", type=int, default=1)
+    parser.add_argument("--issues-per-project", type=int, default=10)
+    parser.add_argument("--milestones-per-project", type=int, default=3)
+    parser.add_argument("--files-per-project", type=int, default=5)
+    parser.add_argument("--notifications-per-user", type=int, default=20)
+    args = parser.parse_args()
+
+    params = {key: value for key, value in vars(args).items() if key not in ("truncate", "password")}
+    params["password"] = get_password_hash(args.password)
+
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        seed(db, params, args.truncate)
+    finally:
+        db.close()
+    print(f"Seeded {args.projects} projects and {args.projects * args.tasks_per_project} tasks in {time.perf_counter() - started:.1f}s.")
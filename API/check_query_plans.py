@@ -0,0 +1,190 @@
+"""EXPLAIN every query the routers issue and fail if any of them needs a sequential scan.
+
+Run it against a scratch database created from init_db.sql (or `alembic upgrade head`):
+it seeds its own users, projects and tasks through the API, replays a catalogue of
+requests while recording the SQL they send, then EXPLAINs each distinct statement with
+`enable_seqscan = off`. With sequential scans disabled the planner only falls back to one
+(or to filtering a whole unrelated index) when no index can serve the query, so either in a
+plan means an index is missing.
+"""
+import argparse
+import json
+import os
+import sys
+import uuid
+
+os.environ["DATABASE_ASYNC"] = "false"
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event, update
+
+from core.database import SessionLocal, engine
+from main import app
+from v1.auth import user_cache
+from v1.models import ProjectFile, User
+from v1.permissions import membership_cache
+from v1.task_graph import task_graph_cache
+
+API = "/api/v1"
+# Fixed lookup tables that are read whole on purpose.
+DEFAULT_ALLOWED_TABLES = {"roles"}
+EXPLAINED_VERBS = ("SELECT", "UPDATE", "DELETE", "WITH")
+
+def seed(client: TestClient):
+    suffix = uuid.uuid4().hex[:8]
+    emails = {name: f"plan-{name}-{suffix}@example.com" for name in ("admin", "manager", "member")}
+    for email in emails.values():
+        client.post(f"{API}/users/", json={"email": email, "password": "password"}).raise_for_status()
+
+    db = SessionLocal()
+    try:
+        db.execute(update(User).where(User.email == emails["admin"]).values(role_id=1))
+        db.execute(update(User).where(User.email == emails["manager"]).values(role_id=2))
+        db.commit()
+        ids = dict(db.query(User.email, User.id).filter(User.email.in_(emails.values())).all())
+    finally:
+        db.close()
+
+    def login(email):
+        token = client.post(f"{API}/token", data={"username": email, "password": "password"}).json()["access_token"]
+        return {"Authorization": f"Bearer {token}"}
+
+    ctx = {name: ids[email] for name, email in emails.items()}
+    ctx.update({f"{name}_headers": login(email) for name, email in emails.items()})
+    headers = ctx["manager_headers"]
+
+    project_id = client.post(f"{API}/projects/", json={"name": f"plan-{suffix}"}, headers=headers).json()["id"]
+    client.post(f"{API}/projects/{project_id}/members", json={"user_id": ctx["member"], "role_id": 3}, headers=headers)
+    tasks = client.post(f"{API}/projects/{project_id}/tasks/bulk", json={"create": [
+        {"title": f"task {i}", "assignee_id": ctx["member"] if i % 2 else None, "due_date": "2030-01-01"} for i in range(20)
+    ]}, headers=headers).json()["created"]
+    client.post(f"{API}/tasks/{tasks[1]}/dependencies/", json={"depends_on_task_id": tasks[0]}, headers=headers)
+    comment_id = client.post(f"{API}/tasks/{tasks[0]}/comments/", json={
+        "content": "seed", "mentioned_user_ids": [ctx["member"]]
+    }, headers=headers).json()["id"]
+    client.post(f"{API}/tasks/{tasks[0]}/timelogs/", json={"start_time": "2030-01-01T09:00:00Z", "end_time": "2030-01-01T10:00:00Z"}, headers=headers)
+    issue_id = client.post(f"{API}/projects/{project_id}/issues/", json={"title": "seed"}, headers=headers).json()["id"]
+    milestone_id = client.post(f"{API}/projects/{project_id}/milestones/", json={"name": "seed"}, headers=headers).json()["id"]
+
+    # Uploads need object storage; a metadata row is enough for the queries checked here.
+    db = SessionLocal()
+    try:
+        db_file = ProjectFile(project_id=project_id, file_name="seed.txt", object_name=f"plan-{suffix}",
+                              content_type="text/plain", file_size=0, uploaded_by_id=ctx["manager"])
+        db.add(db_file)
+        db.commit()
+        file_id = db_file.id
+    finally:
+        db.close()
+
+    ctx.update(project_id=project_id, task_id=tasks[0], dependent_task_id=tasks[1], delete_task_id=tasks[-1],
+               comment_id=comment_id, issue_id=issue_id, milestone_id=milestone_id, file_id=file_id)
+    return ctx
+
+def catalogue(ctx):
+    """(label, method, path, json body, caller) for the requests whose SQL gets checked."""
+    p, t, comment_id = ctx["project_id"], ctx["task_id"], ctx["comment_id"]
+    return [
+        ("users.me", "GET", "/users/me/", None, "member"),
+        ("users.list", "GET", "/users/?is_active=true", None, "manager"),
+        ("projects.list", "GET", "/projects/", None, "member"),
+        ("projects.read", "GET", f"/projects/{p}", None, "member"),
+        ("projects.members", "GET", f"/projects/{p}/members", None, "member"),
+        ("tasks.list", "GET", f"/projects/{p}/tasks/", None, "member"),
+        ("tasks.list.status", "GET", f"/projects/{p}/tasks/?status=pending&sort=-created_at", None, "member"),
+        ("tasks.list.assignee", "GET", f"/projects/{p}/tasks/?assignee_id={ctx['member']}", None, "member"),
+        ("tasks.list.due", "GET", f"/projects/{p}/tasks/?due_after=2029-01-01&due_before=2031-01-01", None, "member"),
+        ("tasks.update", "PUT", f"/tasks/{t}", {"title": "task 0", "status": "in_progress"}, "member"),
+        ("tasks.bulk", "POST", f"/projects/{p}/tasks/bulk", {"update": [{"id": t, "priority": "high"}]}, "manager"),
+        ("tasks.delete", "DELETE", f"/tasks/{ctx['delete_task_id']}", None, "manager"),
+        ("tasks.attach_file", "POST", f"/tasks/{t}/files/{ctx['file_id']}", None, "member"),
+        ("dependencies.list", "GET", f"/tasks/{ctx['dependent_task_id']}/dependencies/", None, "member"),
+        ("graph.order", "GET", f"/projects/{p}/graph/order", None, "member"),
+        ("graph.status", "GET", f"/projects/{p}/graph/status", None, "member"),
+        ("comments.list", "GET", f"/tasks/{t}/comments/", None, "member"),
+        ("timelogs.list", "GET", f"/tasks/{t}/timelogs/?user_id={ctx['manager']}", None, "member"),
+        ("issues.list", "GET", f"/projects/{p}/issues/?status=open", None, "member"),
+        ("issues.update", "PUT", f"/issues/{ctx['issue_id']}", {"title": "seed", "status": "closed"}, "member"),
+        ("milestones.list", "GET", f"/projects/{p}/milestones/", None, "member"),
+        ("files.list", "GET", f"/projects/{p}/files", None, "member"),
+        ("files.download_links", "POST", "/files/download-links", {"file_ids": [ctx["file_id"]]}, "member"),
+        ("files.storage", "GET", f"/projects/{p}/storage", None, "member"),
+        ("search.all", "GET", "/search?q=seed", None, "member"),
+        ("search.project", "GET", f"/search?q=se&project_id={p}&type=task&type=file", None, "member"),
+        ("notifications.list", "GET", "/notifications/me?unread_only=true", None, "member"),
+        ("notifications.unread_count", "GET", "/notifications/me/unread-count", None, "member"),
+        ("notifications.mark_read", "POST", "/notifications/me/read", {"up_to_id": comment_id}, "member"),
+        ("reports.summary", "GET", f"/reports/projects/{p}/summary", None, "manager"),
+        ("reports.team_workload", "GET", "/reports/team_workload", None, "manager"),
+        ("exports.tasks", "GET", f"/projects/{p}/export/tasks", None, "member"),
+        ("exports.timelogs", "GET", f"/projects/{p}/export/timelogs", None, "member"),
+        ("exports.issues", "GET", f"/projects/{p}/export/issues", None, "member"),
+        ("admin.roles", "GET", "/admin/roles", None, "admin"),
+        ("admin.jobs_failed", "GET", "/admin/jobs/failed", None, "admin"),
+    ]
+
+def record_statements(client: TestClient, ctx):
+    statements = {}
+    current = {}
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if current and not executemany and statement.lstrip().upper().startswith(EXPLAINED_VERBS):
+            statements.setdefault(statement, (current["label"], parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        for label, method, path, body, caller in catalogue(ctx):
+            # Empty caches so lookups normally served from memory are checked too.
+            user_cache.clear()
+            membership_cache.clear()
+            task_graph_cache.clear()
+            current["label"] = label
+            response = client.request(method, API + path, json=body, headers=ctx[f"{caller}_headers"])
+            current.clear()
+            if response.status_code >= 400:
+                print(f"warning: {label} returned {response.status_code}: {response.text[:200]}", file=sys.stderr)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    return statements
+
+def sequential_scans(plan, under_limit=False):
+    node_type = plan.get("Node Type")
+    if node_type == "Seq Scan":
+        yield plan.get("Relation Name")
+    elif node_type in ("Index Scan", "Index Only Scan") and "Index Cond" not in plan and "Filter" in plan and not under_limit:
+        # Walking a whole index (e.g. a composite primary key led by another column) and filtering
+        # row by row is a sequential scan in disguise. Under a LIMIT it is an ordered keyset read.
+        yield plan.get("Relation Name")
+    for child in plan.get("Plans", []):
+        yield from sequential_scans(child, under_limit or node_type == "Limit")
+
+def explain(statements, allowed_tables):
+    findings = []
+    with engine.connect() as conn:
+        conn.exec_driver_sql("SET enable_seqscan = off")
+        for statement, (label, parameters) in statements.items():
+            raw = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters or {}).scalar()
+            plan = (raw if isinstance(raw, list) else json.loads(raw))[0]["Plan"]
+            tables = sorted({t for t in sequential_scans(plan) if t not in allowed_tables})
+            if tables:
+                findings.append((label, tables, statement))
+        conn.rollback()
+    return findings
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fail when a router query can only be served by a sequential scan.")
+    parser.add_argument("--allow", action="append", default=[], metavar="TABLE", help="Ignore sequential scans on this table (repeatable)")
+    parser.add_argument("--verbose", action="store_true", help="Print the full SQL of every offending statement")
+    args = parser.parse_args()
+
+    with TestClient(app) as client:
+        ctx = seed(client)
+        statements = record_statements(client, ctx)
+
+    findings = explain(statements, DEFAULT_ALLOWED_TABLES | set(args.allow))
+    print(f"Checked {len(statements)} distinct statements.")
+    for label, tables, statement in findings:
+        print(f"SEQ SCAN  {label}: {', '.join(tables)}")
+        if args.verbose:
+            print("    " + " ".join(statement.split()))
+    sys.exit(1 if findings else 0)
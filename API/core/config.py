@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings
 from pydantic import computed_field, model_validator
-from typing import List, Union
+from typing import List, Optional, Union
 
 class Settings(BaseSettings):
     POSTGRES_USER: str
@@ -8,14 +8,99 @@ class Settings(BaseSettings):
     POSTGRES_DB: str
     POSTGRES_SERVER: str = "db"
     API_V1_STR: str = "/api/v1"
+    DATABASE_ASYNC: bool = False
+
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Transaction-pooling PgBouncer: no client-side pool and no server-side prepared statements
+    DB_PGBOUNCER_MODE: bool = False
 
     MINIO_ENDPOINT: str
     MINIO_ROOT_USER: str
     MINIO_ROOT_PASSWORD: str
     MINIO_BUCKET_NAME: str
+    MINIO_POOL_SIZE: int = 32
+    MINIO_CONNECT_TIMEOUT: float = 3
+    MINIO_READ_TIMEOUT: float = 120
+    MINIO_RETRIES: int = 2
+    MINIO_HEALTH_CACHE_SECONDS: float = 10
+    # Uploads stream into MinIO multipart uploads of this part size (min 5 MiB), several parts in flight at once.
+    # Memory per upload is roughly (UPLOAD_PARALLEL_PARTS + 1) * UPLOAD_PART_SIZE.
+    UPLOAD_PART_SIZE: int = 8 * 1024 * 1024
+    UPLOAD_PARALLEL_PARTS: int = 4
+    # Per-project limit on the total size of its files; 0 means unlimited.
+    PROJECT_STORAGE_QUOTA_BYTES: int = 0
+    # Largest file a browser may upload straight to MinIO (a single presigned PUT/POST tops out at 5 GiB).
+    UPLOAD_MAX_BYTES: int = 5 * 1024 * 1024 * 1024
+    # Host browsers reach MinIO on; presigned URLs are signed for it. Defaults to MINIO_ENDPOINT.
+    MINIO_PUBLIC_ENDPOINT: Optional[str] = None
+    MINIO_PUBLIC_SECURE: bool = False
+    MINIO_REGION: str = "us-east-1"
+    PRESIGNED_UPLOAD_EXPIRES_SECONDS: int = 900
+    # How long after a presigned upload is issued it can still be completed; unclaimed objects are removed after this.
+    PRESIGNED_UPLOAD_COMPLETE_SECONDS: int = 3600
+    DOWNLOAD_URL_EXPIRES_SECONDS: int = 3600
+    # Generated download URLs are reused for this long, so a returned URL is valid for at least EXPIRES - CACHE seconds.
+    DOWNLOAD_URL_CACHE_SECONDS: int = 300
+    DOWNLOAD_URL_CACHE_MAX_SIZE: int = 10000
+    DOWNLOAD_LINKS_MAX: int = 200
+    # Thumbnails and previews rendered for images, PDFs and text files (v1/previews.py)
+    PREVIEW_THUMBNAIL_SIZE: int = 256
+    PREVIEW_IMAGE_SIZE: int = 1024
+    PREVIEW_TEXT_BYTES: int = 4096
+    # Larger images and PDFs are not read into memory for a preview
+    PREVIEW_MAX_SOURCE_BYTES: int = 50 * 1024 * 1024
+    # Preview URLs are signed per window of this length, so browsers keep hitting their cached copy.
+    PREVIEW_URL_WINDOW_SECONDS: int = 86400
     
     CORS_ORIGINS: Union[str, List[str]] = ""
 
+    USER_CACHE_TTL_SECONDS: int = 60
+    USER_CACHE_MAX_SIZE: int = 1024
+    MEMBERSHIP_CACHE_TTL_SECONDS: int = 60
+    MEMBERSHIP_CACHE_MAX_SIZE: int = 4096
+    TASK_GRAPH_CACHE_TTL_SECONDS: int = 300
+    TASK_GRAPH_CACHE_MAX_SIZE: int = 256
+
+    PAGE_SIZE_DEFAULT: int = 100
+    PAGE_SIZE_MAX: int = 500
+    BULK_TASKS_MAX: int = 1000
+    SEARCH_PAGE_SIZE_DEFAULT: int = 20
+    SEARCH_PAGE_SIZE_MAX: int = 100
+    # Words of a search query beyond this many are ignored
+    SEARCH_MAX_TERMS: int = 8
+
+    # Read notifications older than this are deleted by prune_notifications.py
+    NOTIFICATION_RETENTION_DAYS: int = 90
+    NOTIFICATION_PRUNE_BATCH_SIZE: int = 5000
+
+    INSTRUMENTATION_ENABLED: bool = True
+    INSTRUMENTATION_SAMPLE_RATE: float = 1.0
+    QUERY_BUDGET_PER_REQUEST: int = 20
+    SLOW_QUERY_MS: float = 200
+
+    # "memory" only reaches clients connected to the same worker; use "postgres" (LISTEN/NOTIFY) with several workers
+    EVENTS_BACKEND: str = "memory"
+    EVENTS_QUEUE_SIZE: int = 100
+    EVENTS_HEARTBEAT_SECONDS: float = 15
+    # Streams are closed after this long so the client reconnects and its token and memberships are checked again
+    EVENTS_STREAM_MAX_SECONDS: float = 900
+
+    # Background jobs (v1/jobs.py). The API runs this many worker threads itself; set 0 when worker.py runs separately.
+    # Events published by a separate worker process only reach SSE clients with EVENTS_BACKEND=postgres.
+    JOB_WORKERS_IN_PROCESS: int = 1
+    JOB_POLL_SECONDS: float = 1.0
+    JOB_BATCH_SIZE: int = 10
+    JOB_MAX_ATTEMPTS: int = 5
+    JOB_RETRY_BASE_SECONDS: float = 5
+    JOB_RETRY_MAX_SECONDS: float = 600
+    # A running job whose worker has been silent this long is assumed lost and queued again
+    JOB_LOCK_TIMEOUT_SECONDS: int = 300
+    JOB_RETENTION_HOURS: int = 24
+
     @model_validator(mode='after')
     def assemble_cors_origins(self) -> 'Settings':
         if isinstance(self.CORS_ORIGINS, str):
@@ -27,7 +112,15 @@ class Settings(BaseSettings):
     @property
     def DATABASE_URL(self) -> str:
         return (
-            f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}"
+            f"postgresql+psycopg2://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}"
+            f"@{self.POSTGRES_SERVER}/{self.POSTGRES_DB}"
+        )
+
+    @computed_field
+    @property
+    def ASYNC_DATABASE_URL(self) -> str:
+        return (
+            f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}"
             f"@{self.POSTGRES_SERVER}/{self.POSTGRES_DB}"
         )
 
@@ -1,9 +1,79 @@
+import threading
+import time
+import uuid
+
 from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+from starlette.concurrency import run_in_threadpool
 from .config import settings
 
-engine = create_engine(settings.DATABASE_URL)
+class PoolMetrics:
+    """Counters for connection checkouts, including how long callers waited for a connection."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            self.checkouts += 1
+            self.timeouts += int(timed_out)
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def snapshot(self, pool) -> dict:
+        with self._lock:
+            data = {
+                "pool": type(pool).__name__,
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.timeouts,
+                "wait_ms_avg": round(self.wait_seconds_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "wait_ms_max": round(self.wait_seconds_max * 1000, 3),
+            }
+        if isinstance(pool, QueuePool):
+            data.update({
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": max(pool.overflow(), 0),
+            })
+        return data
+
+def _instrumented(pool_class, metrics: PoolMetrics):
+    class InstrumentedPool(pool_class):
+        def _do_get(self):
+            started = time.perf_counter()
+            try:
+                connection = super()._do_get()
+            except PoolTimeoutError:
+                metrics.record_wait(time.perf_counter() - started, timed_out=True)
+                raise
+            metrics.record_wait(time.perf_counter() - started)
+            return connection
+
+    InstrumentedPool.__name__ = f"Instrumented{pool_class.__name__}"
+    return InstrumentedPool
+
+def _engine_options(queue_pool_class, metrics: PoolMetrics) -> dict:
+    if settings.DB_PGBOUNCER_MODE:
+        return {"poolclass": _instrumented(NullPool, metrics), "pool_pre_ping": settings.DB_POOL_PRE_PING}
+    return {
+        "poolclass": _instrumented(queue_pool_class, metrics),
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+pool_metrics = PoolMetrics()
+engine = create_engine(settings.DATABASE_URL, **_engine_options(QueuePool, pool_metrics))
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -15,4 +85,47 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async_engine = None
+async_pool_metrics = None
+AsyncSessionLocal = None
+
+if settings.DATABASE_ASYNC:
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+    async_pool_metrics = PoolMetrics()
+    async_options = _engine_options(AsyncAdaptedQueuePool, async_pool_metrics)
+    if settings.DB_PGBOUNCER_MODE:
+        # asyncpg prepares every statement; PgBouncer can hand the next one to another server connection.
+        async_options["connect_args"] = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+        }
+    async_engine = create_async_engine(settings.ASYNC_DATABASE_URL, **async_options)
+    AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False)
+
+# Dependency to get an asyncpg-backed session (DATABASE_ASYNC=true only)
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# Session dependency for routes that support both modes, chosen by DATABASE_ASYNC
+get_session = get_async_db if settings.DATABASE_ASYNC else get_db
+
+async def run_db(db, fn, *args):
+    """Run `fn(session, *args)` without blocking the event loop.
+
+    With an AsyncSession the ORM code runs on the event loop through `run_sync`;
+    with a regular Session it runs on the thread pool, as a sync route would.
+    """
+    if settings.DATABASE_ASYNC:
+        return await db.run_sync(fn, *args)
+    return await run_in_threadpool(fn, db, *args)
+
+def database_pool_stats() -> dict:
+    stats = {"sync": pool_metrics.snapshot(engine.pool)}
+    if async_engine is not None:
+        stats["async"] = async_pool_metrics.snapshot(async_engine.sync_engine.pool)
+    return stats
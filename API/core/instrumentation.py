@@ -0,0 +1,143 @@
+import json
+import logging
+import random
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+
+from .config import settings
+
+logger = logging.getLogger("api.requests")
+if not logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+SERVER_TIMING_HEADER = "Server-Timing"
+
+class RequestStats:
+    __slots__ = ("queries", "db_seconds", "slowest_seconds", "slowest_statement")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.slowest_seconds = 0.0
+        self.slowest_statement: Optional[str] = None
+
+    def record(self, statement: str, seconds: float):
+        self.queries += 1
+        self.db_seconds += seconds
+        if seconds > self.slowest_seconds:
+            self.slowest_seconds = seconds
+            self.slowest_statement = statement
+
+# Only set for sampled requests; the engine hooks do nothing when it is empty.
+_current_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_stats.get() is not None and context is not None:
+        context._instrumentation_started = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    started = getattr(context, "_instrumentation_started", None)
+    if stats is not None and started is not None:
+        stats.record(statement, time.perf_counter() - started)
+
+def instrument_engine(engine):
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+def _server_timing(stats: RequestStats, elapsed: float) -> bytes:
+    metrics = [
+        f"app;dur={elapsed * 1000:.1f}",
+        f"db;dur={stats.db_seconds * 1000:.1f}",
+        f'queries;desc="{stats.queries}"',
+    ]
+    if stats.queries:
+        metrics.append(f"db-slowest;dur={stats.slowest_seconds * 1000:.1f}")
+    return ", ".join(metrics).encode()
+
+def _route_template(scope) -> str:
+    template = getattr(scope.get("route"), "path", None)
+    if not template:
+        return "unmatched"
+    # Included routers may report their path without the prefix; take the prefix from the request path.
+    prefix = scope["path"].rsplit("/", template.count("/"))[0]
+    return prefix + template
+
+class QueryInstrumentationMiddleware:
+    """Per-request SQL statistics for a sample of requests.
+
+    Sampled responses get a Server-Timing header (app time, db time, query count, slowest
+    statement time) and one JSON log line; requests over the query budget or with a slow
+    statement are logged as warnings together with that statement.
+    """
+
+    def __init__(self, app, sample_rate: float = 1.0, query_budget: int = 0, slow_query_ms: float = 0):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.query_budget = query_budget
+        self.slow_query_ms = slow_query_ms
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or random.random() >= self.sample_rate:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current_stats.set(stats)
+        started = time.perf_counter()
+        response = {"status": 500}
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((SERVER_TIMING_HEADER.lower().encode(), _server_timing(stats, time.perf_counter() - started)))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_stats.reset(token)
+            self._log(scope, response["status"], stats, time.perf_counter() - started)
+
+    def _log(self, scope, status_code: int, stats: RequestStats, elapsed: float):
+        over_budget = bool(self.query_budget) and stats.queries > self.query_budget
+        slow = bool(self.slow_query_ms) and stats.slowest_seconds * 1000 > self.slow_query_ms
+        record = {
+            "event": "request",
+            "method": scope["method"],
+            "route": _route_template(scope),
+            "status": status_code,
+            "duration_ms": round(elapsed * 1000, 2),
+            "queries": stats.queries,
+            "db_ms": round(stats.db_seconds * 1000, 2),
+            "slowest_query_ms": round(stats.slowest_seconds * 1000, 2),
+        }
+        if over_budget:
+            record["query_budget"] = self.query_budget
+        if over_budget or slow:
+            record["slowest_statement"] = " ".join((stats.slowest_statement or "").split())[:1000]
+            logger.warning(json.dumps(record))
+        else:
+            logger.info(json.dumps(record))
+
+def install_instrumentation(app):
+    from . import database
+
+    instrument_engine(database.engine)
+    if database.async_engine is not None:
+        instrument_engine(database.async_engine.sync_engine)
+    app.add_middleware(
+        QueryInstrumentationMiddleware,
+        sample_rate=settings.INSTRUMENTATION_SAMPLE_RATE,
+        query_budget=settings.QUERY_BUDGET_PER_REQUEST,
+        slow_query_ms=settings.SLOW_QUERY_MS,
+    )
@@ -1,19 +1,84 @@
+import logging
+import threading
+import time
+
+import urllib3
 from minio import Minio
-from minio.error import S3Error
 from .config import settings
 
+logger = logging.getLogger("api.storage")
+
+# One tuned pool shared by every request and worker thread. Short connect timeouts and few
+# retries, so an unreachable MinIO fails a request in seconds instead of minutes.
+http_client = urllib3.PoolManager(
+    maxsize=settings.MINIO_POOL_SIZE,
+    timeout=urllib3.Timeout(connect=settings.MINIO_CONNECT_TIMEOUT, read=settings.MINIO_READ_TIMEOUT),
+    retries=urllib3.Retry(total=settings.MINIO_RETRIES, backoff_factor=0.2, status_forcelist=[500, 502, 503, 504]),
+)
+
+# The region is fixed so the client never spends a request looking up the bucket location.
 minio_client = Minio(
     settings.MINIO_ENDPOINT,
     access_key=settings.MINIO_ROOT_USER,
     secret_key=settings.MINIO_ROOT_PASSWORD,
-    secure=False 
+    secure=False,
+    region=settings.MINIO_REGION,
+    http_client=http_client
+)
+
+# Signs URLs that browsers use. The region is fixed so presigning never has to look it up
+# through the public endpoint, which may not be reachable from inside the deployment.
+presign_client = Minio(
+    settings.MINIO_PUBLIC_ENDPOINT or settings.MINIO_ENDPOINT,
+    access_key=settings.MINIO_ROOT_USER,
+    secret_key=settings.MINIO_ROOT_PASSWORD,
+    secure=settings.MINIO_PUBLIC_SECURE,
+    region=settings.MINIO_REGION
+)
+
+# Health probes get their own single connection without retries, so a probe answers quickly.
+_probe_client = Minio(
+    settings.MINIO_ENDPOINT,
+    access_key=settings.MINIO_ROOT_USER,
+    secret_key=settings.MINIO_ROOT_PASSWORD,
+    secure=False,
+    region=settings.MINIO_REGION,
+    http_client=urllib3.PoolManager(maxsize=1, timeout=urllib3.Timeout(settings.MINIO_CONNECT_TIMEOUT), retries=False)
 )
 
+_health_lock = threading.Lock()
+_health = {"ok": False, "error": "not checked yet", "checked_at": None}
+
+def ensure_bucket(client: Minio = minio_client):
+    if not client.bucket_exists(settings.MINIO_BUCKET_NAME):
+        client.make_bucket(settings.MINIO_BUCKET_NAME)
+
+def storage_health(force: bool = False) -> dict:
+    """Whether MinIO answers and the bucket exists, re-checked at most every MINIO_HEALTH_CACHE_SECONDS.
+
+    A failed check provisions the bucket again on the next one, so storage that was down at
+    startup recovers without a restart.
+    """
+    with _health_lock:
+        checked_at = _health["checked_at"]
+        if force or checked_at is None or time.monotonic() - checked_at >= settings.MINIO_HEALTH_CACHE_SECONDS:
+            try:
+                if _health["ok"]:
+                    if not _probe_client.bucket_exists(settings.MINIO_BUCKET_NAME):
+                        raise LookupError(f"Bucket {settings.MINIO_BUCKET_NAME!r} is missing")
+                else:
+                    ensure_bucket(_probe_client)
+                _health.update(ok=True, error=None)
+            except Exception as exc:
+                _health.update(ok=False, error=f"{type(exc).__name__}: {exc}")
+            _health["checked_at"] = checked_at = time.monotonic()
+        return {"ok": _health["ok"], "error": _health["error"], "age_seconds": round(time.monotonic() - checked_at, 1)}
+
+def provision_storage():
+    status = storage_health(force=True)
+    if not status["ok"]:
+        logger.warning("Storage is not ready (%s); /health keeps retrying", status["error"])
+
 def get_minio_client():
-    try:
-        found = minio_client.bucket_exists(settings.MINIO_BUCKET_NAME)
-        if not found:
-            minio_client.make_bucket(settings.MINIO_BUCKET_NAME)
-        yield minio_client
-    except S3Error as exc:
-        raise ConnectionError(f"Could not connect to MinIO: {exc}")
\ No newline at end of file
+    # The bucket is provisioned at startup (see main.lifespan); nothing to check per request.
+    return minio_client
@@ -0,0 +1,226 @@
+import asyncio
+import json
+import logging
+import select
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from .config import settings
+
+logger = logging.getLogger("api.events")
+
+# Postgres channel every worker LISTENs on; the payload carries the broker channel.
+PG_CHANNEL = "app_events"
+# NOTIFY payloads must stay under 8000 bytes.
+PG_PAYLOAD_LIMIT = 7900
+_PENDING_KEY = "pending_events"
+
+Event = Tuple[str, dict]
+
+class Subscription:
+    def __init__(self, channels: Set[str], maxsize: int):
+        self.channels = channels
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+
+    def put(self, event: dict):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # A consumer this far behind has to refetch anyway; replace the backlog with one marker.
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"type": "resync"})
+
+    async def get(self) -> dict:
+        return await self.queue.get()
+
+class MemoryBackend:
+    """Delivers events to the subscribers of this process only."""
+
+    def start(self, broker: "Broker"):
+        self.broker = broker
+
+    def stop(self):
+        pass
+
+    def before_commit(self, session: Session, events: List[Event]):
+        pass
+
+    def after_commit(self, events: List[Event]):
+        for channel, data in events:
+            self.broker.deliver(channel, data)
+
+class PostgresBackend:
+    """Fans events out to every worker through LISTEN/NOTIFY.
+
+    NOTIFY is sent inside the writing transaction, so Postgres delivers it on commit and
+    drops it on rollback. Each worker keeps one dedicated listening connection on a thread;
+    it has to reach Postgres directly, since LISTEN does not survive transaction pooling.
+    """
+
+    def __init__(self, url):
+        self.url = url
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, broker: "Broker"):
+        self.broker = broker
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._listen_forever, name="pubsub-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def before_commit(self, session: Session, events: List[Event]):
+        payloads = [self._payload(channel, data) for channel, data in events]
+        session.execute(
+            text("SELECT pg_notify(:channel, payload) FROM unnest(CAST(:payloads AS text[])) AS payload"),
+            {"channel": PG_CHANNEL, "payloads": payloads},
+        )
+
+    def after_commit(self, events: List[Event]):
+        pass
+
+    @staticmethod
+    def _payload(channel: str, data: dict) -> str:
+        payload = json.dumps({"channel": channel, "event": data}, default=str)
+        if len(payload.encode()) > PG_PAYLOAD_LIMIT:
+            # Too big to ship: send the ids only and let the client fetch the rest.
+            data = {key: value for key, value in data.items() if key == "type" or key.endswith(("id", "ids"))}
+            payload = json.dumps({"channel": channel, "event": dict(data, truncated=True)}, default=str)
+        return payload
+
+    def _connect(self):
+        import psycopg2
+
+        connection = psycopg2.connect(**self.url.translate_connect_args(username="user", database="dbname"))
+        connection.autocommit = True
+        connection.cursor().execute(f"LISTEN {PG_CHANNEL}")
+        return connection
+
+    def _listen_forever(self):
+        delay = 1
+        while not self._stopping.is_set():
+            try:
+                connection = self._connect()
+            except Exception:
+                logger.exception("Could not open the event listener connection; retrying in %ss", delay)
+                self._stopping.wait(delay)
+                delay = min(delay * 2, 30)
+                continue
+            delay = 1
+            try:
+                while not self._stopping.is_set():
+                    if select.select([connection], [], [], 1)[0]:
+                        connection.poll()
+                        while connection.notifies:
+                            self._dispatch(connection.notifies.pop(0).payload)
+            except Exception:
+                logger.exception("Event listener connection lost; reconnecting")
+            finally:
+                connection.close()
+
+    def _dispatch(self, payload: str):
+        try:
+            message = json.loads(payload)
+            self.broker.deliver(message["channel"], message["event"])
+        except (ValueError, KeyError):
+            logger.warning("Ignoring malformed event payload: %s", payload[:200])
+
+class Broker:
+    """In-process pub/sub for server-sent events.
+
+    Writers queue events on their session with `publish_after_commit`; the backend
+    publishes them only once the transaction commits. Subscribers are asyncio queues on
+    the event loop the broker was started on.
+    """
+
+    def __init__(self, backend, queue_size: int = 100):
+        self.backend = backend
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set[Subscription]] = defaultdict(set)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.received = 0
+        self.delivered = 0
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self.backend.start(self)
+
+    async def stop(self):
+        self._loop = None
+        await asyncio.get_running_loop().run_in_executor(None, self.backend.stop)
+
+    def subscribe(self, channels: Iterable[str]) -> Subscription:
+        subscription = Subscription(set(channels), self.queue_size)
+        for channel in subscription.channels:
+            self._subscribers[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        for channel in subscription.channels:
+            subscribers = self._subscribers.get(channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[channel]
+
+    def deliver(self, channel: str, data: dict):
+        """Hand an event to local subscribers; safe to call from any thread."""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        self.received += 1
+        loop.call_soon_threadsafe(self._fan_out, channel, data)
+
+    def _fan_out(self, channel: str, data: dict):
+        for subscription in list(self._subscribers.get(channel, ())):
+            subscription.put(data)
+            self.delivered += 1
+
+    def stats(self) -> dict:
+        return {
+            "backend": type(self.backend).__name__,
+            "running": self._loop is not None,
+            "channels": len(self._subscribers),
+            "subscriptions": len({s for subscribers in self._subscribers.values() for s in subscribers}),
+            "received": self.received,
+            "delivered": self.delivered,
+        }
+
+def publish_after_commit(db: Session, channel: str, data: dict):
+    db.info.setdefault(_PENDING_KEY, []).append((channel, data))
+
+def _make_backend():
+    if settings.EVENTS_BACKEND == "memory":
+        return MemoryBackend()
+    if settings.EVENTS_BACKEND == "postgres":
+        from sqlalchemy.engine import make_url
+
+        return PostgresBackend(make_url(settings.DATABASE_URL))
+    raise ValueError(f"Unknown EVENTS_BACKEND {settings.EVENTS_BACKEND!r}; expected 'memory' or 'postgres'")
+
+broker = Broker(_make_backend(), queue_size=settings.EVENTS_QUEUE_SIZE)
+
+@event.listens_for(Session, "before_commit")
+def _send_pending_events(session: Session):
+    events = session.info.get(_PENDING_KEY)
+    if events:
+        broker.backend.before_commit(session, events)
+
+@event.listens_for(Session, "after_commit")
+def _deliver_pending_events(session: Session):
+    events = session.info.pop(_PENDING_KEY, None)
+    if events:
+        broker.backend.after_commit(events)
+
+@event.listens_for(Session, "after_soft_rollback")
+def _drop_pending_events(session: Session, previous_transaction):
+    session.info.pop(_PENDING_KEY, None)
@@ -1,4 +1,4 @@
-DROP TABLE IF EXISTS mentions, task_files, project_files, notifications, issues, time_logs, task_dependencies, comments, tasks, milestones, project_members, projects, users, roles CASCADE;
+DROP TABLE IF EXISTS alembic_version, jobs, project_storage, notification_counters, assignee_task_counts, project_task_counts, mentions, task_files, project_files, file_blobs, notifications, issues, time_logs, task_dependencies, comments, tasks, milestones, project_members, projects, users, roles CASCADE;
 
 CREATE TABLE roles (
     id SERIAL PRIMARY KEY,
@@ -30,17 +30,58 @@ CREATE TABLE projects (
     FOREIGN KEY (owner_id) REFERENCES users (id)
 );
 
+CREATE TABLE project_task_counts (
+    project_id INTEGER NOT NULL,
+    status VARCHAR(50) NOT NULL,
+    task_count INTEGER NOT NULL DEFAULT 0, -- Maintained on every task write, see v1/task_counters.py
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (project_id, status),
+    FOREIGN KEY (project_id) REFERENCES projects (id) ON DELETE CASCADE
+);
+
+CREATE TABLE assignee_task_counts (
+    user_id INTEGER NOT NULL,
+    status VARCHAR(50) NOT NULL,
+    task_count INTEGER NOT NULL DEFAULT 0, -- Reports read these instead of aggregating tasks
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (user_id, status),
+    FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
+);
+
+CREATE TABLE file_blobs (
+    id BIGSERIAL PRIMARY KEY,
+    checksum VARCHAR(64) UNIQUE NOT NULL, -- Files are deduplicated by content, see v1/file_storage.py
+    object_name VARCHAR(255) UNIQUE NOT NULL,
+    size BIGINT NOT NULL,
+    ref_count INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    preview_status VARCHAR(20) NOT NULL DEFAULT 'pending', -- Thumbnails/previews, see v1/previews.py
+    thumbnail_object_name VARCHAR(255),
+    preview_object_name VARCHAR(255)
+);
+
 CREATE TABLE project_files (
     id SERIAL PRIMARY KEY,
     project_id INTEGER NOT NULL,
     file_name VARCHAR(255) NOT NULL,
     object_name VARCHAR(255) UNIQUE NOT NULL,
     content_type VARCHAR(100),
-    file_size INTEGER,
+    file_size BIGINT,
+    checksum VARCHAR(64),
+    blob_id BIGINT,
     uploaded_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     uploaded_by_id INTEGER NOT NULL,
+    search_vector TSVECTOR GENERATED ALWAYS AS (to_tsvector('simple', regexp_replace(file_name, '[^[:alnum:]]+', ' ', 'g'))) STORED,
     FOREIGN KEY (project_id) REFERENCES projects(id) ON DELETE CASCADE,
-    FOREIGN KEY (uploaded_by_id) REFERENCES users(id)
+    FOREIGN KEY (uploaded_by_id) REFERENCES users(id),
+    FOREIGN KEY (blob_id) REFERENCES file_blobs(id)
+);
+
+CREATE TABLE project_storage (
+    project_id INTEGER PRIMARY KEY,
+    file_count INTEGER NOT NULL DEFAULT 0, -- Maintained on every file write, see v1/file_storage.py
+    total_bytes BIGINT NOT NULL DEFAULT 0,
+    FOREIGN KEY (project_id) REFERENCES projects(id) ON DELETE CASCADE
 );
 
 CREATE TABLE project_members (
@@ -61,6 +102,7 @@ CREATE TABLE milestones (
     due_date DATE,
     status VARCHAR(50) DEFAULT 'pending',
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (project_id) REFERENCES projects (id) ON DELETE CASCADE
 );
 
@@ -73,8 +115,12 @@ CREATE TABLE tasks (
     project_id INTEGER NOT NULL,
     assignee_id INTEGER,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
     due_date DATE,
     reminder_date TIMESTAMP WITH TIME ZONE,
+    search_vector TSVECTOR GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') || setweight(to_tsvector('english', coalesce(description, '')), 'B')
+    ) STORED, -- Full-text search, see v1/routers/search.py
     FOREIGN KEY (project_id) REFERENCES projects (id) ON DELETE CASCADE,
     FOREIGN KEY (assignee_id) REFERENCES users (id)
 );
@@ -102,6 +148,8 @@ CREATE TABLE comments (
     task_id INTEGER NOT NULL,
     author_id INTEGER NOT NULL,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    search_vector TSVECTOR GENERATED ALWAYS AS (to_tsvector('english', content)) STORED,
     FOREIGN KEY (task_id) REFERENCES tasks (id) ON DELETE CASCADE,
     FOREIGN KEY (author_id) REFERENCES users (id)
 );
@@ -136,7 +184,11 @@ CREATE TABLE issues (
     reporter_id INTEGER NOT NULL,
     assignee_id INTEGER,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
     resolved_at TIMESTAMP WITH TIME ZONE,
+    search_vector TSVECTOR GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') || setweight(to_tsvector('english', coalesce(description, '')), 'B')
+    ) STORED,
     FOREIGN KEY (project_id) REFERENCES projects (id) ON DELETE CASCADE,
     FOREIGN KEY (reporter_id) REFERENCES users (id),
     FOREIGN KEY (assignee_id) REFERENCES users (id)
@@ -151,6 +203,72 @@ CREATE TABLE notifications (
     FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
 );
 
+CREATE TABLE notification_counters (
+    user_id INTEGER PRIMARY KEY,
+    unread_count INTEGER NOT NULL DEFAULT 0, -- Maintained on every notification write, see v1/notification_inbox.py
+    version BIGINT NOT NULL DEFAULT 0,
+    FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
+);
+
+-- Background job queue, see v1/jobs.py
+CREATE TABLE jobs (
+    id BIGSERIAL PRIMARY KEY,
+    kind VARCHAR(100) NOT NULL,
+    payload JSONB NOT NULL DEFAULT '{}'::jsonb,
+    status VARCHAR(20) NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    idempotency_key VARCHAR(255),
+    run_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    locked_at TIMESTAMP WITH TIME ZONE,
+    locked_by VARCHAR(255),
+    last_error TEXT,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    finished_at TIMESTAMP WITH TIME ZONE
+);
+CREATE INDEX ix_jobs_queued_run_at ON jobs (run_at, id) WHERE status = 'queued';
+CREATE UNIQUE INDEX ix_jobs_idempotency_key ON jobs (idempotency_key) WHERE status = 'queued';
+CREATE INDEX ix_jobs_status_finished ON jobs (status, finished_at);
+
+-- Indexes backing the keyset-paginated list endpoints (sort column, id)
+CREATE INDEX ix_tasks_project_created ON tasks (project_id, created_at, id);
+CREATE INDEX ix_tasks_project_status_created ON tasks (project_id, status, created_at, id);
+CREATE INDEX ix_issues_project_created ON issues (project_id, created_at, id);
+CREATE INDEX ix_comments_task_created ON comments (task_id, created_at, id);
+CREATE INDEX ix_time_logs_task_start ON time_logs (task_id, start_time, id);
+CREATE INDEX ix_project_files_project_uploaded ON project_files (project_id, uploaded_at, id);
+CREATE INDEX ix_notifications_user_created ON notifications (user_id, created_at, id);
+CREATE INDEX ix_notifications_user_unread ON notifications (user_id, created_at, id) WHERE is_read = false;
+
+-- Indexes for the remaining filter/join columns used by the routers
+CREATE INDEX ix_tasks_project_assignee ON tasks (project_id, assignee_id);
+CREATE INDEX ix_tasks_project_due ON tasks (project_id, due_date) WHERE due_date IS NOT NULL;
+CREATE INDEX ix_tasks_assignee_status ON tasks (assignee_id, status) WHERE assignee_id IS NOT NULL;
+CREATE INDEX ix_issues_project_status_created ON issues (project_id, status, created_at, id);
+CREATE INDEX ix_issues_assignee_status ON issues (assignee_id, status) WHERE assignee_id IS NOT NULL;
+CREATE INDEX ix_project_members_user ON project_members (user_id, project_id);
+CREATE INDEX ix_milestones_project_due ON milestones (project_id, due_date);
+CREATE INDEX ix_task_dependencies_depends_on ON task_dependencies (depends_on_task_id, task_id);
+CREATE INDEX ix_task_files_file ON task_files (file_id);
+CREATE INDEX ix_mentions_comment ON mentions (comment_id);
+CREATE INDEX ix_mentions_user ON mentions (user_id);
+CREATE INDEX ix_time_logs_user_start ON time_logs (user_id, start_time);
+
+-- Version tokens for conditional GETs on task lists (count and max/sum of updated_at)
+CREATE INDEX ix_tasks_project_updated ON tasks (project_id, updated_at);
+
+-- Retention: read notifications by age (prune_notifications.py)
+CREATE INDEX ix_notifications_read_created ON notifications (created_at) WHERE is_read = true;
+
+-- Reference counting and blob garbage collection (the FK check on deleting a blob)
+CREATE INDEX ix_project_files_blob_id ON project_files (blob_id);
+
+-- Full-text search (GET /search)
+CREATE INDEX ix_tasks_search ON tasks USING gin (search_vector);
+CREATE INDEX ix_comments_search ON comments USING gin (search_vector);
+CREATE INDEX ix_issues_search ON issues USING gin (search_vector);
+CREATE INDEX ix_project_files_search ON project_files USING gin (search_vector);
+
 INSERT INTO roles (id, name, description) VALUES 
 (1, 'superadmin', 'Can manage users and roles.'),
 (2, 'manager', 'Can create and manage projects.'),
@@ -158,4 +276,11 @@ INSERT INTO roles (id, name, description) VALUES
 
 INSERT INTO users (email, hashed_password, role_id) VALUES 
 ('admin@example.com', '$argon2id$v=19$m=65536,t=3,p=4$BaCU0tpbyzlH6H1PCSFEiA$qzCj9VGHMNkltiSwhsHgwzcu7GSB2O4pvPcesd0t0xw', 1),
-('manager@example.com', '$argon2id$v=19$m=65536,t=3,p=4$BaCU0tpbyzlH6H1PCSFEiA$qzCj9VGHMNkltiSwhsHgwzcu7GSB2O4pvPcesd0t0xw', 2);
\ No newline at end of file
+('manager@example.com', '$argon2id$v=19$m=65536,t=3,p=4$BaCU0tpbyzlH6H1PCSFEiA$qzCj9VGHMNkltiSwhsHgwzcu7GSB2O4pvPcesd0t0xw', 2);
+
+-- This file always matches the newest migration; mark fresh databases as up to date.
+CREATE TABLE alembic_version (
+    version_num VARCHAR(32) NOT NULL,
+    CONSTRAINT alembic_version_pkc PRIMARY KEY (version_num)
+);
+INSERT INTO alembic_version (version_num) VALUES ('0011');
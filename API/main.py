@@ -1,14 +1,31 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response, status
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 from datetime import timedelta
 
 from core.config import settings
-from v1.routers import projects, users, tasks, comments, admin, milestones, dependencies, timelogs, issues, reports, notifications, files
+from core.minio_client import provision_storage, storage_health
+from core.instrumentation import SERVER_TIMING_HEADER, install_instrumentation
+from core.pubsub import broker
+from v1.jobs import start_job_workers, stop_job_workers
+from v1.pagination import NEXT_CURSOR_HEADER
+from v1.routers import projects, users, tasks, comments, admin, milestones, dependencies, timelogs, issues, reports, notifications, files, exports, task_graph, events, search
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await run_in_threadpool(provision_storage)
+    await broker.start()
+    workers = start_job_workers(settings.JOB_WORKERS_IN_PROCESS)
+    yield
+    await run_in_threadpool(stop_job_workers, *workers)
+    await broker.stop()
 
 app = FastAPI(
     title="Project Management API",
     description="An API for managing projects, tasks, and users.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 if settings.CORS_ORIGINS:
@@ -18,8 +35,12 @@ if settings.CORS_ORIGINS:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER, SERVER_TIMING_HEADER],
     )
 
+if settings.INSTRUMENTATION_ENABLED:
+    install_instrumentation(app)
+
 app.include_router(admin.router, prefix=settings.API_V1_STR)
 app.include_router(users.router, prefix=settings.API_V1_STR)
 app.include_router(projects.router, prefix=settings.API_V1_STR)
@@ -27,12 +48,23 @@ app.include_router(tasks.router, prefix=settings.API_V1_STR)
 app.include_router(comments.router, prefix=settings.API_V1_STR)
 app.include_router(milestones.router, prefix=settings.API_V1_STR)
 app.include_router(dependencies.router, prefix=settings.API_V1_STR)
+app.include_router(task_graph.router, prefix=settings.API_V1_STR)
 app.include_router(timelogs.router, prefix=settings.API_V1_STR)
 app.include_router(issues.router, prefix=settings.API_V1_STR)
 app.include_router(reports.router, prefix=settings.API_V1_STR)
 app.include_router(notifications.router, prefix=settings.API_V1_STR)
 app.include_router(files.router, prefix=settings.API_V1_STR)
+app.include_router(exports.router, prefix=settings.API_V1_STR)
+app.include_router(events.router, prefix=settings.API_V1_STR)
+app.include_router(search.router, prefix=settings.API_V1_STR)
 
 @app.get("/")
 def read_root():
-    return {"message": "Welcome to the Project Management API"}
\ No newline at end of file
+    return {"message": "Welcome to the Project Management API"}
+
+@app.get("/health")
+async def health(response: Response):
+    storage = await run_in_threadpool(storage_health)
+    if not storage["ok"]:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return {"status": "ok" if storage["ok"] else "unavailable", "storage": storage}
\ No newline at end of file
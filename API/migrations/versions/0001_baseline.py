@@ -0,0 +1,22 @@
+"""Baseline: the schema created by init_db.sql before migrations were introduced
+
+Existing databases are brought under Alembic with `alembic stamp 0001`
+followed by `alembic upgrade head`.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    pass
+
+
+def downgrade():
+    pass
@@ -0,0 +1,63 @@
+"""Per-project task counters and the keyset pagination indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+PAGINATION_INDEXES = [
+    ("ix_tasks_project_created", "tasks", ["project_id", "created_at", "id"], None),
+    ("ix_tasks_project_status_created", "tasks", ["project_id", "status", "created_at", "id"], None),
+    ("ix_issues_project_created", "issues", ["project_id", "created_at", "id"], None),
+    ("ix_comments_task_created", "comments", ["task_id", "created_at", "id"], None),
+    ("ix_time_logs_task_start", "time_logs", ["task_id", "start_time", "id"], None),
+    ("ix_project_files_project_uploaded", "project_files", ["project_id", "uploaded_at", "id"], None),
+    ("ix_notifications_user_created", "notifications", ["user_id", "created_at", "id"], None),
+    ("ix_notifications_user_unread", "notifications", ["user_id", "created_at", "id"], "is_read = false"),
+]
+
+
+def upgrade():
+    op.create_table(
+        "project_task_counts",
+        sa.Column("project_id", sa.Integer, sa.ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("status", sa.String(50), primary_key=True),
+        sa.Column("task_count", sa.Integer, nullable=False, server_default="0"),
+        if_not_exists=True,
+    )
+    op.execute("""
+        INSERT INTO project_task_counts (project_id, status, task_count)
+        SELECT project_id, status, count(*) FROM tasks WHERE status IS NOT NULL GROUP BY project_id, status
+        ON CONFLICT (project_id, status) DO UPDATE SET task_count = EXCLUDED.task_count
+    """)
+    op.execute("""
+        UPDATE projects SET progress = coalesce((
+            SELECT sum(CASE WHEN c.status = 'completed' THEN c.task_count ELSE 0 END) * 100
+                   / nullif(sum(c.task_count), 0)
+            FROM project_task_counts c WHERE c.project_id = projects.id
+        ), 0)
+    """)
+
+    # CONCURRENTLY keeps the tables writable while the indexes build; it cannot run inside a transaction.
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in PAGINATION_INDEXES:
+            op.create_index(
+                name, table, columns,
+                postgresql_where=sa.text(where) if where else None,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(PAGINATION_INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+    op.drop_table("project_task_counts")
@@ -0,0 +1,48 @@
+"""Indexes for the remaining router filters, joins and foreign-key lookups
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    # Task filters by assignee / due date inside a project, and open work per assignee
+    ("ix_tasks_project_assignee", "tasks", ["project_id", "assignee_id"], None),
+    ("ix_tasks_project_due", "tasks", ["project_id", "due_date"], "due_date IS NOT NULL"),
+    ("ix_tasks_assignee_status", "tasks", ["assignee_id", "status"], "assignee_id IS NOT NULL"),
+    ("ix_issues_project_status_created", "issues", ["project_id", "status", "created_at", "id"], None),
+    ("ix_issues_assignee_status", "issues", ["assignee_id", "status"], "assignee_id IS NOT NULL"),
+    # "Projects I belong to"; the primary key only covers lookups by project first
+    ("ix_project_members_user", "project_members", ["user_id", "project_id"], None),
+    ("ix_milestones_project_due", "milestones", ["project_id", "due_date"], None),
+    # Reverse sides of association tables, also used by ON DELETE CASCADE
+    ("ix_task_dependencies_depends_on", "task_dependencies", ["depends_on_task_id", "task_id"], None),
+    ("ix_task_files_file", "task_files", ["file_id"], None),
+    ("ix_mentions_comment", "mentions", ["comment_id"], None),
+    ("ix_mentions_user", "mentions", ["user_id"], None),
+    ("ix_time_logs_user_start", "time_logs", ["user_id", "start_time"], None),
+]
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name, table, columns,
+                postgresql_where=sa.text(where) if where else None,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,35 @@
+"""updated_at on tasks, issues, milestones and comments for conditional GETs
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+TABLES = ["tasks", "issues", "milestones", "comments"]
+
+
+def upgrade():
+    # A constant default needs no table rewrite; existing rows simply start at the migration time.
+    for table in TABLES:
+        op.add_column(table, sa.Column(
+            "updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()
+        ))
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_tasks_project_updated", "tasks", ["project_id", "updated_at"],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_tasks_project_updated", table_name="tasks", postgresql_concurrently=True, if_exists=True)
+    for table in reversed(TABLES):
+        op.drop_column(table, "updated_at")
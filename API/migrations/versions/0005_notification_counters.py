@@ -0,0 +1,42 @@
+"""Per-user unread notification counters and the retention index
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "notification_counters",
+        sa.Column("user_id", sa.Integer, sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("unread_count", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("version", sa.BigInteger, nullable=False, server_default="0"),
+        if_not_exists=True,
+    )
+    op.execute("""
+        INSERT INTO notification_counters (user_id, unread_count, version)
+        SELECT user_id, count(*) FILTER (WHERE is_read = false), 1 FROM notifications GROUP BY user_id
+        ON CONFLICT (user_id) DO UPDATE SET unread_count = EXCLUDED.unread_count, version = notification_counters.version + 1
+    """)
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_notifications_read_created", "notifications", ["created_at"],
+            postgresql_where=sa.text("is_read = true"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_notifications_read_created", table_name="notifications", postgresql_concurrently=True, if_exists=True)
+    op.drop_table("notification_counters")
@@ -0,0 +1,42 @@
+"""Postgres-backed background job queue
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "jobs",
+        sa.Column("id", sa.BigInteger, primary_key=True),
+        sa.Column("kind", sa.String(100), nullable=False),
+        sa.Column("payload", postgresql.JSONB, nullable=False, server_default=sa.text("'{}'::jsonb")),
+        sa.Column("status", sa.String(20), nullable=False, server_default="queued"),
+        sa.Column("attempts", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("max_attempts", sa.Integer, nullable=False),
+        sa.Column("idempotency_key", sa.String(255)),
+        sa.Column("run_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column("locked_at", sa.DateTime(timezone=True)),
+        sa.Column("locked_by", sa.String(255)),
+        sa.Column("last_error", sa.Text),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("finished_at", sa.DateTime(timezone=True)),
+        if_not_exists=True,
+    )
+    # A new table: plain CREATE INDEX is instant here.
+    op.create_index("ix_jobs_queued_run_at", "jobs", ["run_at", "id"], postgresql_where=sa.text("status = 'queued'"))
+    op.create_index("ix_jobs_idempotency_key", "jobs", ["idempotency_key"], unique=True, postgresql_where=sa.text("status = 'queued'"))
+    op.create_index("ix_jobs_status_finished", "jobs", ["status", "finished_at"])
+
+
+def downgrade():
+    op.drop_table("jobs")
@@ -0,0 +1,24 @@
+"""Checksums for project files and 64-bit file sizes
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("project_files", sa.Column("checksum", sa.String(64)))
+    # Rewrites project_files under an exclusive lock; the table holds one row per upload, so this is brief.
+    op.alter_column("project_files", "file_size", type_=sa.BigInteger, existing_type=sa.Integer)
+
+
+def downgrade():
+    op.alter_column("project_files", "file_size", type_=sa.Integer, existing_type=sa.BigInteger)
+    op.drop_column("project_files", "checksum")
@@ -0,0 +1,72 @@
+"""Content-addressed file blobs and per-project storage totals
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "file_blobs",
+        sa.Column("id", sa.BigInteger, primary_key=True),
+        sa.Column("checksum", sa.String(64), nullable=False, unique=True),
+        sa.Column("object_name", sa.String(255), nullable=False, unique=True),
+        sa.Column("size", sa.BigInteger, nullable=False),
+        sa.Column("ref_count", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "project_storage",
+        sa.Column("project_id", sa.Integer, sa.ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("file_count", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("total_bytes", sa.BigInteger, nullable=False, server_default="0"),
+        if_not_exists=True,
+    )
+    op.add_column("project_files", sa.Column("blob_id", sa.BigInteger, sa.ForeignKey("file_blobs.id")))
+
+    # Files uploaded with a checksum become blobs: the oldest copy of each content is kept and the
+    # redundant objects are queued for removal. Older files without a checksum keep their own objects.
+    op.execute("""
+        INSERT INTO file_blobs (checksum, object_name, size, ref_count)
+        SELECT DISTINCT ON (checksum) checksum, object_name, coalesce(file_size, 0),
+               count(*) OVER (PARTITION BY checksum)
+        FROM project_files WHERE checksum IS NOT NULL
+        ORDER BY checksum, id
+    """)
+    op.execute("""
+        INSERT INTO jobs (kind, payload, status, attempts, max_attempts)
+        SELECT 'files.remove_object', jsonb_build_object('object_name', f.object_name), 'queued', 0, 5
+        FROM project_files f JOIN file_blobs b ON b.checksum = f.checksum
+        WHERE f.object_name <> b.object_name
+    """)
+    op.execute("UPDATE project_files f SET blob_id = b.id FROM file_blobs b WHERE b.checksum = f.checksum")
+    op.execute("""
+        INSERT INTO project_storage (project_id, file_count, total_bytes)
+        SELECT project_id, count(*), coalesce(sum(file_size), 0) FROM project_files GROUP BY project_id
+    """)
+
+    with op.get_context().autocommit_block():
+        op.create_index("ix_project_files_blob_id", "project_files", ["blob_id"], postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    # A deduplicated file's own object is gone; without file_blobs nothing would point at its content.
+    shared = op.get_bind().execute(sa.text(
+        "SELECT count(*) FROM project_files f JOIN file_blobs b ON b.id = f.blob_id WHERE f.object_name <> b.object_name"
+    )).scalar()
+    if shared:
+        raise RuntimeError(f"{shared} files store their content in another file's object; cannot downgrade below 0008")
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_project_files_blob_id", "project_files", postgresql_concurrently=True, if_exists=True)
+    op.drop_column("project_files", "blob_id")
+    op.drop_table("project_storage")
+    op.drop_table("file_blobs")
@@ -0,0 +1,40 @@
+"""Thumbnails and previews for file blobs
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("file_blobs", sa.Column("preview_status", sa.String(20), nullable=False, server_default="pending"))
+    op.add_column("file_blobs", sa.Column("thumbnail_object_name", sa.String(255)))
+    op.add_column("file_blobs", sa.Column("preview_object_name", sa.String(255)))
+
+    # Existing content gets its previews from the job workers; files stored before checksums
+    # existed are fingerprinted first, which attaches them to a blob and queues its previews.
+    op.execute("""
+        INSERT INTO jobs (kind, payload, status, attempts, max_attempts, idempotency_key)
+        SELECT 'files.render_previews', jsonb_build_object('blob_id', id), 'queued', 0, 5, 'previews:' || id
+        FROM file_blobs
+    """)
+    op.execute("""
+        INSERT INTO jobs (kind, payload, status, attempts, max_attempts)
+        SELECT 'files.fingerprint', jsonb_build_object('file_id', id), 'queued', 0, 5
+        FROM project_files WHERE blob_id IS NULL
+    """)
+
+
+def downgrade():
+    # Rendered derivatives stay in the bucket under previews/; they are unreferenced afterwards.
+    op.execute("DELETE FROM jobs WHERE kind = 'files.render_previews' AND status = 'queued'")
+    op.drop_column("file_blobs", "preview_object_name")
+    op.drop_column("file_blobs", "thumbnail_object_name")
+    op.drop_column("file_blobs", "preview_status")
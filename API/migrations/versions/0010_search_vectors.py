@@ -0,0 +1,43 @@
+"""Full-text search vectors for tasks, comments, issues and file names
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+TITLE_AND_DESCRIPTION = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+)
+SEARCH_VECTORS = {
+    "tasks": TITLE_AND_DESCRIPTION,
+    "comments": "to_tsvector('english', content)",
+    "issues": TITLE_AND_DESCRIPTION,
+    "project_files": "to_tsvector('simple', regexp_replace(file_name, '[^[:alnum:]]+', ' ', 'g'))",
+}
+
+
+def upgrade():
+    # Adding a stored generated column rewrites each table under an exclusive lock; run this in a
+    # maintenance window on large installs. The GIN indexes are then built without blocking writes.
+    for table, expression in SEARCH_VECTORS.items():
+        op.add_column(table, sa.Column("search_vector", TSVECTOR, sa.Computed(expression, persisted=True)))
+    with op.get_context().autocommit_block():
+        for table in SEARCH_VECTORS:
+            op.create_index(
+                f"ix_{table}_search", table, ["search_vector"],
+                postgresql_using="gin", postgresql_concurrently=True, if_not_exists=True
+            )
+
+
+def downgrade():
+    for table in SEARCH_VECTORS:
+        op.drop_index(f"ix_{table}_search", table_name=table, if_exists=True)
+        op.drop_column(table, "search_vector")
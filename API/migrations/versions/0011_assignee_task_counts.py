@@ -0,0 +1,41 @@
+"""Per-assignee task counts for reports and freshness of the task rollups
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0011'
+down_revision = '0010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "project_task_counts",
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now())
+    )
+    op.create_table(
+        "assignee_task_counts",
+        sa.Column("user_id", sa.Integer, sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("status", sa.String(50), primary_key=True),
+        sa.Column("task_count", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        if_not_exists=True,
+    )
+    # Stop task writes while backfilling so no change falls between the count and the first delta.
+    op.execute("LOCK TABLE tasks IN SHARE MODE")
+    op.execute("""
+        INSERT INTO assignee_task_counts (user_id, status, task_count)
+        SELECT assignee_id, status, count(*) FROM tasks
+        WHERE assignee_id IS NOT NULL AND status IS NOT NULL
+        GROUP BY assignee_id, status
+    """)
+
+
+def downgrade():
+    op.drop_table("assignee_task_counts")
+    op.drop_column("project_task_counts", "updated_at")
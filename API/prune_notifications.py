@@ -0,0 +1,22 @@
+import argparse
+from datetime import datetime, timedelta, timezone
+
+from core.config import settings
+from core.database import SessionLocal
+from v1.notification_inbox import prune_read_notifications
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Delete read notifications older than the retention period, in small batches.")
+    parser.add_argument("--days", type=int, default=settings.NOTIFICATION_RETENTION_DAYS, help="Keep read notifications this many days")
+    parser.add_argument("--batch-size", type=int, default=settings.NOTIFICATION_PRUNE_BATCH_SIZE, help="Rows deleted per transaction")
+    parser.add_argument("--pause", type=float, default=0.1, help="Seconds to wait between batches")
+    args = parser.parse_args()
+
+    cutoff = datetime.now(timezone.utc) - timedelta(days=args.days)
+    db = SessionLocal()
+    try:
+        deleted = prune_read_notifications(db, cutoff, args.batch_size, args.pause)
+    finally:
+        db.close()
+
+    print(f"Deleted {deleted} read notifications created before {cutoff:%Y-%m-%d %H:%M} UTC.")
@@ -0,0 +1,30 @@
+import argparse
+
+from core.database import SessionLocal
+from v1.file_storage import reconcile_storage
+from v1.notification_inbox import reconcile_notification_counters
+from v1.task_counters import reconcile_task_counters
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the maintained counters (per-project task counts, progress and storage usage, per-assignee task counts, per-user unread notifications, blob references).")
+    parser.add_argument("--counters", choices=["all", "tasks", "notifications", "storage"], default="all", help="Which counters to rebuild")
+    parser.add_argument("--project-id", type=int, default=None, help="Only reconcile this project's task counters and storage usage (default: all projects, plus assignee counts and blob references)")
+    parser.add_argument("--user-id", type=int, default=None, help="Only reconcile this user's notification counter (default: all users)")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.counters in ("all", "tasks"):
+            reconcile_task_counters(db, args.project_id)
+            scope = f"project {args.project_id}" if args.project_id is not None else "all projects and assignees"
+            print(f"Task counters reconciled for {scope}.")
+        if args.counters in ("all", "notifications"):
+            reconcile_notification_counters(db, args.user_id)
+            scope = f"user {args.user_id}" if args.user_id is not None else "all users"
+            print(f"Notification counters reconciled for {scope}.")
+        if args.counters in ("all", "storage"):
+            reconcile_storage(db, args.project_id)
+            scope = f"project {args.project_id}" if args.project_id is not None else "all projects and blobs"
+            print(f"Storage usage reconciled for {scope}.")
+    finally:
+        db.close()
@@ -0,0 +1,91 @@
+"""Fixtures for the API tests.
+
+Run from API/ with `python -m pytest`. The database settings come from the environment (or .env)
+as for the app; tests that need Postgres are skipped when it can't be reached. Each test creates
+its own users and projects, so the database doesn't need to be empty.
+"""
+import os
+import sys
+import uuid
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Jobs are run by the tests themselves, not picked up behind their back.
+os.environ.setdefault("JOB_WORKERS_IN_PROCESS", "0")
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+import main
+import v1.job_handlers as job_handlers
+from core.database import SessionLocal
+from core.minio_client import get_minio_client
+
+API = "/api/v1"
+
+class FakeMinio:
+    """Keeps objects in memory; enough of the Minio client for the routes and job handlers."""
+
+    def __init__(self):
+        self.objects = {}
+
+    def bucket_exists(self, bucket_name):
+        return True
+
+    def put_object(self, bucket_name, object_name, data, length, content_type=None, **kwargs):
+        self.objects[object_name] = data.read() if length == -1 else data.read(length)
+
+    def remove_object(self, bucket_name, object_name):
+        self.objects.pop(object_name, None)
+
+    def presigned_get_object(self, bucket_name, object_name, expires=None, **kwargs):
+        return f"http://minio/{bucket_name}/{object_name}"
+
+@pytest.fixture(scope="session")
+def database():
+    try:
+        with SessionLocal() as session:
+            session.execute(text("SELECT 1"))
+    except OperationalError as e:
+        pytest.skip(f"Postgres is not reachable: {e.orig}")
+
+@pytest.fixture
+def db(database):
+    """A session whose work is rolled back at the end of the test."""
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.rollback()
+        session.close()
+
+@pytest.fixture
+def minio(monkeypatch):
+    fake = FakeMinio()
+    monkeypatch.setattr(job_handlers, "minio_client", fake)
+    main.app.dependency_overrides[get_minio_client] = lambda: fake
+    yield fake
+    main.app.dependency_overrides.pop(get_minio_client, None)
+
+@pytest.fixture(scope="session")
+def client(database):
+    # One client, and so one event loop, for the run: the async engine's pooled connections are tied to it.
+    with TestClient(main.app) as client:
+        yield client
+
+@pytest.fixture
+def make_user(client):
+    """Registers a user and returns (id, auth headers); role_id 2 makes them a manager."""
+    def make_user(role_id: int = 3):
+        email = f"{uuid.uuid4().hex}@example.com"
+        response = client.post(f"{API}/users/", json={"email": email, "password": "pw"})
+        assert response.status_code == 200, response.text
+        if role_id != 3:
+            with SessionLocal() as session:
+                session.execute(text("UPDATE users SET role_id = :role_id WHERE email = :email"), {"role_id": role_id, "email": email})
+                session.commit()
+        token = client.post(f"{API}/token", data={"username": email, "password": "pw"}).json()["access_token"]
+        return response.json()["id"], {"Authorization": f"Bearer {token}"}
+    return make_user
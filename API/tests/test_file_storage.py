@@ -0,0 +1,69 @@
+import uuid
+
+from v1.file_storage import attach_blob, release_blob
+from v1.job_handlers import collect_blob_job
+from v1.models import FileBlob, Job
+
+API = "/api/v1"
+
+def _checksum() -> str:
+    return uuid.uuid4().hex * 2
+
+def _collect_jobs(db, blob_id: int) -> int:
+    return db.query(Job).filter(Job.kind == "files.collect_blob", Job.payload["blob_id"].as_integer() == blob_id).count()
+
+def test_blob_is_shared_and_collected_after_last_release(db, minio):
+    checksum = _checksum()
+    blob_id, redundant = attach_blob(db, checksum, "first.bin", 10)
+    assert not redundant
+    same_id, redundant = attach_blob(db, checksum, "second.bin", 10)
+    assert (same_id, redundant) == (blob_id, True)
+    assert db.get(FileBlob, blob_id).ref_count == 2
+
+    release_blob(db, blob_id)
+    assert _collect_jobs(db, blob_id) == 0
+    release_blob(db, blob_id)
+    assert _collect_jobs(db, blob_id) == 1
+
+    minio.objects["first.bin"] = b"0123456789"
+    collect_blob_job(db, {"blob_id": blob_id})
+    db.expire_all()
+    assert db.get(FileBlob, blob_id) is None
+    assert "first.bin" not in minio.objects
+
+def test_collect_skips_blob_taken_back_before_it_ran(db, minio):
+    checksum = _checksum()
+    blob_id, _ = attach_blob(db, checksum, "first.bin", 10)
+    release_blob(db, blob_id)
+    # The same content is uploaded again before the collect job runs.
+    assert attach_blob(db, checksum, "again.bin", 10) == (blob_id, True)
+
+    minio.objects["first.bin"] = b"0123456789"
+    collect_blob_job(db, {"blob_id": blob_id})
+    db.expire_all()
+    assert db.get(FileBlob, blob_id).ref_count == 1
+    assert "first.bin" in minio.objects
+
+def test_deleting_deduplicated_files_releases_blob(client, make_user, minio, db):
+    _, headers = make_user(role_id=2)
+    project_id = client.post(f"{API}/projects/", json={"name": "Files"}, headers=headers).json()["id"]
+    content = uuid.uuid4().bytes
+    upload = lambda name: client.post(
+        f"{API}/projects/{project_id}/files/stream?filename={name}", content=content, headers={**headers, "Content-Type": "application/octet-stream"}
+    ).json()
+    first, second = upload("a.bin"), upload("b.bin")
+    blob = db.query(FileBlob).filter(FileBlob.checksum == first["checksum"]).one()
+    assert blob.ref_count == 2
+
+    assert client.delete(f"{API}/files/{first['id']}", headers=headers).status_code == 204
+    db.expire_all()
+    assert db.get(FileBlob, blob.id).ref_count == 1
+    assert _collect_jobs(db, blob.id) == 0
+
+    assert client.delete(f"{API}/files/{second['id']}", headers=headers).status_code == 204
+    db.expire_all()
+    assert db.get(FileBlob, blob.id).ref_count == 0
+    assert _collect_jobs(db, blob.id) == 1
+    collect_blob_job(db, {"blob_id": blob.id})
+    db.commit()
+    assert blob.object_name not in minio.objects
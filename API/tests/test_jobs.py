@@ -0,0 +1,116 @@
+import uuid
+
+import pytest
+from sqlalchemy import text
+
+from core.database import SessionLocal
+from v1.jobs import HANDLERS, SUPERSEDED, JobWorker, claim_jobs, enqueue_job, requeue_stale_jobs, retry_failed_job
+
+@pytest.fixture
+def kind(database, monkeypatch):
+    """A job kind of this test's own, so workers claim nothing else; handlers record the payloads they ran."""
+    kind = f"test.{uuid.uuid4().hex}"
+    runs = []
+    monkeypatch.setitem(HANDLERS, kind, lambda db, payload: runs.append(payload))
+    yield kind, runs
+    with SessionLocal() as session:
+        session.execute(text("DELETE FROM jobs WHERE kind = :kind"), {"kind": kind})
+        session.commit()
+
+def _enqueue(kind: str, key=None, **payload):
+    with SessionLocal() as session:
+        enqueue_job(session, kind, payload, idempotency_key=key)
+        session.commit()
+
+def _jobs(kind: str):
+    with SessionLocal() as session:
+        return session.execute(text(
+            "SELECT id, status, locked_by, last_error FROM jobs WHERE kind = :kind ORDER BY id"
+        ), {"kind": kind}).all()
+
+def _set(kind: str, assignments: str, **params):
+    with SessionLocal() as session:
+        session.execute(text(f"UPDATE jobs SET {assignments} WHERE kind = :kind"), dict(params, kind=kind))
+        session.commit()
+
+def test_retry_of_failed_job_with_queued_twin_is_superseded(kind):
+    kind, _ = kind
+    key = uuid.uuid4().hex
+    _enqueue(kind, key)
+    _set(kind, "status = 'failed'")
+    _enqueue(kind, key)
+
+    failed_id = _jobs(kind)[0].id
+    with SessionLocal() as session:
+        assert retry_failed_job(session, failed_id)
+    assert [(job.status, job.last_error) for job in _jobs(kind)] == [("done", SUPERSEDED), ("queued", None)]
+
+def test_retry_of_failed_job_without_twin_queues_it(kind):
+    kind, _ = kind
+    _enqueue(kind, uuid.uuid4().hex)
+    _set(kind, "status = 'failed'")
+    with SessionLocal() as session:
+        assert retry_failed_job(session, _jobs(kind)[0].id)
+        assert not retry_failed_job(session, _jobs(kind)[0].id)
+    assert [job.status for job in _jobs(kind)] == ["queued"]
+
+def test_stale_jobs_sharing_a_key_are_requeued_once(kind):
+    kind, _ = kind
+    key = uuid.uuid4().hex
+    for _ in range(2):
+        _enqueue(kind, key)
+        _set(kind, "status = 'running', locked_by = 'lost', locked_at = now() - interval '1 day'")
+    _enqueue(kind, uuid.uuid4().hex)
+    _set(kind, "status = 'running', locked_by = 'lost', locked_at = now() - interval '1 day'")
+
+    with SessionLocal() as session:
+        requeue_stale_jobs(session)
+    assert sorted(job.status for job in _jobs(kind)) == ["done", "queued", "queued"]
+
+def test_failing_job_with_queued_twin_does_not_stop_the_batch(kind, monkeypatch):
+    kind, runs = kind
+    key = uuid.uuid4().hex
+
+    def fail_after_twin_is_queued(db, payload):
+        if payload.get("fail"):
+            _enqueue(kind, key, twin=True)
+            raise RuntimeError("boom")
+        runs.append(payload)
+    monkeypatch.setitem(HANDLERS, kind, fail_after_twin_is_queued)
+    _enqueue(kind, key, fail=True)
+    _enqueue(kind, None, n=1)
+
+    assert JobWorker(kinds=[kind]).run_once() == 2
+    assert runs == [{"n": 1}]
+    assert [(job.status, job.last_error) for job in _jobs(kind)] == [("done", SUPERSEDED), ("done", None), ("queued", None)]
+
+def test_job_taken_over_by_another_worker_is_not_run_twice(kind):
+    kind, runs = kind
+    _enqueue(kind, None, n=1)
+    worker = JobWorker(kinds=[kind])
+    with SessionLocal() as session:
+        [job] = claim_jobs(session, worker.name, 10, [kind])
+    # Declared lost while waiting in the batch, and claimed by another worker
+    _set(kind, "locked_by = 'other', locked_at = now()")
+
+    worker._run(job)
+    assert runs == []
+    assert [(job.status, job.locked_by) for job in _jobs(kind)] == [("running", "other")]
+
+def test_lock_is_stamped_again_when_a_job_starts(kind, monkeypatch):
+    kind, runs = kind
+    _enqueue(kind, None, n=1)
+    worker = JobWorker(kinds=[kind])
+    with SessionLocal() as session:
+        [job] = claim_jobs(session, worker.name, 10, [kind])
+    _set(kind, "locked_at = now() - interval '1 day'")
+
+    def check_not_stale(db, payload):
+        with SessionLocal() as session:
+            requeue_stale_jobs(session)
+        assert [(job.status, job.locked_by) for job in _jobs(kind)] == [("running", worker.name)]
+        runs.append(payload)
+    monkeypatch.setitem(HANDLERS, kind, check_not_stale)
+    worker._run(job)
+    assert runs == [{"n": 1}]
+    assert [job.status for job in _jobs(kind)] == ["done"]
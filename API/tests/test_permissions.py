@@ -0,0 +1,19 @@
+from sqlalchemy import text
+
+from core.database import SessionLocal
+from v1.permissions import membership_cache
+
+API = "/api/v1"
+
+def test_refusal_is_not_cached_across_requests(client, make_user):
+    _, manager_headers = make_user(role_id=2)
+    user_id, headers = make_user()
+    project_id = client.post(f"{API}/projects/", json={"name": "Members"}, headers=manager_headers).json()["id"]
+    assert client.get(f"{API}/projects/{project_id}/members", headers=headers).status_code == 403
+
+    # Added by another worker: nothing here is invalidated.
+    with SessionLocal() as session:
+        session.execute(text("INSERT INTO project_members (project_id, user_id, role_id) VALUES (:p, :u, 3)"), {"p": project_id, "u": user_id})
+        session.commit()
+    assert client.get(f"{API}/projects/{project_id}/members", headers=headers).status_code == 200
+    assert membership_cache.get((user_id, project_id)) is not None
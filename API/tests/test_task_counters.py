@@ -0,0 +1,76 @@
+from sqlalchemy import text
+
+from core.database import SessionLocal
+
+API = "/api/v1"
+
+def _rows(query: str, **params) -> dict:
+    with SessionLocal() as session:
+        return {(row[0], row[1]): row[2] for row in session.execute(text(query), params) if row[2]}
+
+def assert_counters_match_tasks(project_id: int, user_ids):
+    """The rollups must equal a fresh count of the tasks table (rows at zero don't matter)."""
+    assert _rows(
+        "SELECT project_id, status, task_count FROM project_task_counts WHERE project_id = :p", p=project_id
+    ) == _rows(
+        "SELECT project_id, status, count(*) FROM tasks WHERE project_id = :p GROUP BY 1, 2", p=project_id
+    )
+    assert _rows(
+        "SELECT user_id, status, task_count FROM assignee_task_counts WHERE user_id = ANY(:u)", u=list(user_ids)
+    ) == _rows(
+        "SELECT assignee_id, status, count(*) FROM tasks WHERE assignee_id = ANY(:u) GROUP BY 1, 2", u=list(user_ids)
+    )
+
+def test_bulk_operations_keep_task_counters_in_step(client, make_user):
+    manager_id, headers = make_user(role_id=2)
+    member_id, _ = make_user()
+    project_id = client.post(f"{API}/projects/", json={"name": "Counters"}, headers=headers).json()["id"]
+    response = client.post(f"{API}/projects/{project_id}/members", json={"user_id": member_id, "role_id": 3}, headers=headers)
+    assert response.status_code == 201, response.text
+    users = (manager_id, member_id)
+    bulk = lambda **operations: client.post(f"{API}/projects/{project_id}/tasks/bulk", json=operations, headers=headers)
+
+    response = bulk(create=[
+        {"title": "a", "assignee_id": manager_id},
+        {"title": "b", "assignee_id": manager_id},
+        {"title": "c", "status": "in_progress", "assignee_id": member_id},
+        {"title": "d"},
+    ])
+    assert response.status_code == 200, response.text
+    a, b, c, d = response.json()["created"]
+    assert_counters_match_tasks(project_id, users)
+    assert _rows("SELECT project_id, status, task_count FROM project_task_counts WHERE project_id = :p", p=project_id) == {
+        (project_id, "pending"): 3, (project_id, "in_progress"): 1
+    }
+
+    # A status change, a reassignment, both at once, and an update that changes neither
+    response = bulk(update=[
+        {"id": a, "status": "completed"},
+        {"id": b, "assignee_id": member_id},
+        {"id": c, "status": "completed", "assignee_id": None},
+        {"id": d, "title": "d2"},
+    ])
+    assert response.status_code == 200, response.text
+    assert_counters_match_tasks(project_id, users)
+
+    response = bulk(create=[{"title": "e", "assignee_id": member_id}], update=[{"id": d, "status": "in_progress"}], delete=[a, b])
+    assert response.status_code == 200, response.text
+    assert_counters_match_tasks(project_id, users)
+    assert _rows("SELECT user_id, status, task_count FROM assignee_task_counts WHERE user_id = ANY(:u)", u=list(users)) == {
+        (member_id, "pending"): 1
+    }
+
+def test_rejected_bulk_request_leaves_counters_alone(client, make_user):
+    _, headers = make_user(role_id=2)
+    project_id = client.post(f"{API}/projects/", json={"name": "Counters"}, headers=headers).json()["id"]
+    task_id = client.post(f"{API}/projects/{project_id}/tasks/bulk", json={"create": [{"title": "a"}]}, headers=headers).json()["created"][0]
+
+    response = client.post(f"{API}/projects/{project_id}/tasks/bulk", json={"update": [{"id": task_id, "status": None}]}, headers=headers)
+    assert response.status_code == 422
+    response = client.post(f"{API}/projects/{project_id}/tasks/bulk", json={
+        "create": [{"title": "b"}], "delete": [task_id, task_id + 1_000_000]
+    }, headers=headers)
+    assert response.status_code == 404
+    assert _rows("SELECT project_id, status, task_count FROM project_task_counts WHERE project_id = :p", p=project_id) == {
+        (project_id, "pending"): 1
+    }
@@ -0,0 +1,47 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+from jose import jwt
+
+from v1.auth import ALGORITHM, SECRET_KEY, create_access_token
+from v1.uploads import create_upload_token, read_upload_token
+
+API = "/api/v1"
+
+def _claims(**overrides) -> dict:
+    token = create_upload_token(1, 2, "object.bin", "file.bin", "application/octet-stream", 10)
+    return dict(jwt.get_unverified_claims(token), **overrides)
+
+def _tampered(**overrides) -> str:
+    """A genuine token whose claims were edited, keeping the original signature."""
+    header, _, signature = create_upload_token(1, 2, "object.bin", "file.bin", "application/octet-stream", 10).split(".")
+    payload = jwt.encode(_claims(**overrides), "any", algorithm=ALGORITHM).split(".")[1]
+    return f"{header}.{payload}.{signature}"
+
+def test_upload_token_round_trip():
+    claims = read_upload_token(create_upload_token(1, 2, "object.bin", "file.bin", "application/octet-stream", 10))
+    assert (claims["project_id"], claims["user_id"], claims["object_name"], claims["file_size"]) == (1, 2, "object.bin", 10)
+
+@pytest.mark.parametrize("token", [
+    pytest.param(lambda: jwt.encode(_claims(exp=datetime.now(timezone.utc) - timedelta(seconds=1)), SECRET_KEY, algorithm=ALGORITHM), id="expired"),
+    pytest.param(lambda: jwt.encode(_claims(), "not-the-secret", algorithm=ALGORITHM), id="wrong-key"),
+    pytest.param(lambda: _tampered(file_size=10**12), id="tampered-claims"),
+    pytest.param(lambda: create_access_token({"sub": "someone@example.com"}), id="access-token"),
+    pytest.param(lambda: "not-a-token", id="garbage"),
+])
+def test_bad_upload_token_is_rejected(token):
+    with pytest.raises(HTTPException) as error:
+        read_upload_token(token())
+    assert error.value.status_code == 400
+
+def test_completing_with_expired_token_is_rejected(client, make_user):
+    user_id, headers = make_user(role_id=2)
+    project_id = client.post(f"{API}/projects/", json={"name": "Uploads"}, headers=headers).json()["id"]
+    claims = _claims(project_id=project_id, user_id=user_id, exp=datetime.now(timezone.utc) - timedelta(seconds=1))
+    response = client.post(
+        f"{API}/projects/{project_id}/files/uploads/complete",
+        json={"upload_token": jwt.encode(claims, SECRET_KEY, algorithm=ALGORITHM)}, headers=headers
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid or expired upload token"
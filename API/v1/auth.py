@@ -1,11 +1,15 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
+from typing import Optional
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.database import get_db
+from core.cache import TTLCache
+from core.config import settings
+from core.database import get_async_db, get_db
 from v1.models import User
 from v1.schemas import Token, TokenData
 
@@ -16,6 +20,13 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/token")
+oauth2_scheme_optional = OAuth2PasswordBearer(tokenUrl="/api/v1/token", auto_error=False)
+
+# Resolved users (with their role) keyed by token subject, stored detached from any session.
+user_cache = TTLCache(maxsize=settings.USER_CACHE_MAX_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS)
+
+def invalidate_cached_user(email: str):
+    user_cache.pop(email)
 
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
@@ -33,12 +44,15 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    credentials_exception = HTTPException(
+def _credentials_exception():
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def _token_subject(token: str) -> str:
+    credentials_exception = _credentials_exception()
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
@@ -47,8 +61,42 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
         token_data = TokenData(email=email)
     except JWTError:
         raise credentials_exception
-    
-    user = db.query(User).filter(User.email == token_data.email).first()
-    if user is None:
+    return token_data.email
+
+def _resolve_user(db: Session, email: str) -> User:
+    credentials_exception = _credentials_exception()
+    cached_user = user_cache.get(email)
+    if cached_user is None:
+        user = db.query(User).options(joinedload(User.role)).filter(User.email == email).first()
+        if user is None:
+            raise credentials_exception
+        if user.role is not None:
+            db.expunge(user.role)
+        db.expunge(user)
+        user_cache.set(email, user)
+        cached_user = user
+
+    if not cached_user.is_active:
         raise credentials_exception
-    return user
\ No newline at end of file
+    # Attach a per-request copy to this session without hitting the database.
+    return db.merge(cached_user, load=False)
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    return _resolve_user(db, _token_subject(token))
+
+def get_stream_user(
+    token: Optional[str] = Depends(oauth2_scheme_optional),
+    access_token: Optional[str] = Query(None),
+    db: Session = Depends(get_db)
+):
+    # EventSource cannot send an Authorization header, so streams also accept the token as a query parameter.
+    token = token or access_token
+    if not token:
+        raise _credentials_exception()
+    return _resolve_user(db, _token_subject(token))
+
+async def get_current_user_async(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(_resolve_user, _token_subject(token))
+
+# Current-user dependency matching core.database.get_session
+get_session_user = get_current_user_async if settings.DATABASE_ASYNC else get_current_user
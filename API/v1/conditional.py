@@ -0,0 +1,53 @@
+import hashlib
+import json
+from typing import Optional
+
+from fastapi import Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+def etag_for(payload: bytes) -> str:
+    return 'W/"' + hashlib.sha256(payload).hexdigest()[:32] + '"'
+
+def if_none_match(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [tag.strip() for tag in header.split(",")]
+    # Weak comparison: W/"x" and "x" name the same representation.
+    return "*" in candidates or etag.removeprefix("W/") in [tag.removeprefix("W/") for tag in candidates]
+
+def _conditional_headers(etag: str) -> dict:
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+def json_response_with_etag(request: Request, content) -> Response:
+    """Serialize `content` once, tag it, and answer 304 when the client already has this version."""
+    body = json.dumps(jsonable_encoder(content), separators=(",", ":")).encode()
+    etag = etag_for(body)
+    if if_none_match(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=_conditional_headers(etag))
+    return Response(content=body, media_type="application/json", headers=_conditional_headers(etag))
+
+def collection_version(db: Session, updated_at, *criteria) -> tuple:
+    """Row count plus max and sum of `updated_at` over a collection, in one aggregate query.
+
+    Inserts and deletes move the count and edits move the max. The sum also catches a
+    transaction that started earlier (older now()) but committed after a newer one.
+    """
+    return tuple(db.query(
+        func.count(), func.max(updated_at), func.sum(func.extract("epoch", updated_at))
+    ).filter(*criteria).one())
+
+def version_etag(request: Request, *version) -> str:
+    """Tag one representation of a collection: its version plus the query string (filters, sort, cursor)."""
+    key = "|".join([request.url.path, request.url.query, *map(str, version)])
+    return etag_for(key.encode())
+
+def not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """The 304 to return when the client already holds `etag`; otherwise tag the outgoing response."""
+    headers = _conditional_headers(etag)
+    if if_none_match(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
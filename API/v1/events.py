@@ -0,0 +1,15 @@
+from sqlalchemy.orm import Session
+
+from core.pubsub import publish_after_commit
+
+def project_channel(project_id: int) -> str:
+    return f"project:{project_id}"
+
+def user_channel(user_id: int) -> str:
+    return f"user:{user_id}"
+
+def publish_project_event(db: Session, project_id: int, event_type: str, **data):
+    publish_after_commit(db, project_channel(project_id), {"type": event_type, "project_id": project_id, **data})
+
+def publish_user_event(db: Session, user_id: int, event_type: str, **data):
+    publish_after_commit(db, user_channel(user_id), {"type": event_type, **data})
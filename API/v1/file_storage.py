@@ -0,0 +1,113 @@
+from typing import Optional, Tuple
+
+from sqlalchemy import func, select, text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from v1.jobs import enqueue_job
+from v1.models import FileBlob, ProjectFile, ProjectStorage
+
+def attach_blob(db: Session, checksum: str, object_name: str, size: int) -> Tuple[int, bool]:
+    """Take a reference on the blob holding this content, registering `object_name` as it if it's new.
+
+    Returns (blob id, whether `object_name` is redundant). A redundant object holds bytes some
+    other blob already stores and should be removed once nothing can still read it.
+    """
+    stmt = insert(FileBlob).values(checksum=checksum, object_name=object_name, size=size, ref_count=1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[FileBlob.checksum],
+        set_={"ref_count": FileBlob.ref_count + 1}
+    ).returning(FileBlob.id, FileBlob.object_name)
+    blob = db.execute(stmt).one()
+    redundant = blob.object_name != object_name
+    if not redundant:
+        # New content: render its thumbnail and preview once, for every file that will share it.
+        enqueue_job(db, "files.render_previews", {"blob_id": blob.id}, idempotency_key=f"previews:{blob.id}")
+    return blob.id, redundant
+
+def release_blob(db: Session, blob_id: int):
+    ref_count = db.execute(
+        update(FileBlob).where(FileBlob.id == blob_id).values(ref_count=FileBlob.ref_count - 1).returning(FileBlob.ref_count)
+    ).scalar_one()
+    if ref_count <= 0:
+        # Collected by a worker; an upload of the same content before then takes the blob back.
+        enqueue_job(db, "files.collect_blob", {"blob_id": blob_id})
+
+def remaining_quota(db: Session, project_id: int) -> Optional[int]:
+    """Bytes the project may still add, or None without a quota."""
+    if not settings.PROJECT_STORAGE_QUOTA_BYTES:
+        return None
+    used = db.query(ProjectStorage.total_bytes).filter(ProjectStorage.project_id == project_id).scalar() or 0
+    return max(settings.PROJECT_STORAGE_QUOTA_BYTES - used, 0)
+
+def reserve_storage(db: Session, project_id: int, size: int) -> bool:
+    """Count a new file against the project's usage; False, with nothing changed, if it would exceed the quota."""
+    quota = settings.PROJECT_STORAGE_QUOTA_BYTES
+    if quota and size > quota:
+        return False
+    stmt = insert(ProjectStorage).values(project_id=project_id, file_count=1, total_bytes=size)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ProjectStorage.project_id],
+        set_={
+            "file_count": ProjectStorage.file_count + 1,
+            "total_bytes": ProjectStorage.total_bytes + stmt.excluded.total_bytes,
+        },
+        # The row lock serializes concurrent uploads, so the check and the increment are atomic.
+        where=(ProjectStorage.total_bytes + stmt.excluded.total_bytes <= quota) if quota else None
+    ).returning(ProjectStorage.project_id)
+    return db.execute(stmt).first() is not None
+
+def release_storage(db: Session, project_id: int, size: int):
+    db.execute(update(ProjectStorage).where(ProjectStorage.project_id == project_id).values(
+        file_count=ProjectStorage.file_count - 1,
+        total_bytes=ProjectStorage.total_bytes - size
+    ))
+
+def get_storage_usage(db: Session, project_id: int) -> dict:
+    usage = db.query(ProjectStorage).filter(ProjectStorage.project_id == project_id).first()
+    return {
+        "file_count": usage.file_count if usage else 0,
+        "total_bytes": usage.total_bytes if usage else 0,
+        "quota_bytes": settings.PROJECT_STORAGE_QUOTA_BYTES or None,
+    }
+
+def storage_stats(db: Session) -> dict:
+    # Admin-only: scans the small blob and totals tables.
+    logical_bytes, files = db.query(func.coalesce(func.sum(ProjectStorage.total_bytes), 0), func.coalesce(func.sum(ProjectStorage.file_count), 0)).one()
+    blob_bytes, blobs, references = db.query(
+        func.coalesce(func.sum(FileBlob.size), 0), func.count(FileBlob.id), func.coalesce(func.sum(FileBlob.ref_count), 0)
+    ).one()
+    unshared_bytes = db.query(func.coalesce(func.sum(ProjectFile.file_size), 0)).filter(ProjectFile.blob_id.is_(None)).scalar()
+    stored_bytes = blob_bytes + unshared_bytes
+    return {
+        "files": files,
+        "logical_bytes": logical_bytes,
+        "stored_bytes": stored_bytes,
+        "blobs": blobs,
+        "blob_references": references,
+        "saved_bytes": logical_bytes - stored_bytes,
+    }
+
+def reconcile_storage(db: Session, project_id: Optional[int] = None):
+    # Block concurrent uploads and deletes so the rebuilt totals match project_files exactly.
+    db.execute(text("LOCK TABLE project_storage, file_blobs IN EXCLUSIVE MODE"))
+
+    usage = select(
+        ProjectFile.project_id, func.count(ProjectFile.id), func.coalesce(func.sum(ProjectFile.file_size), 0)
+    ).group_by(ProjectFile.project_id)
+    clear = ProjectStorage.__table__.delete()
+    if project_id is not None:
+        usage = usage.where(ProjectFile.project_id == project_id)
+        clear = clear.where(ProjectStorage.project_id == project_id)
+    db.execute(clear)
+    db.execute(insert(ProjectStorage).from_select(
+        [ProjectStorage.project_id, ProjectStorage.file_count, ProjectStorage.total_bytes], usage
+    ))
+
+    if project_id is None:
+        references = select(func.count(ProjectFile.id)).where(ProjectFile.blob_id == FileBlob.id).scalar_subquery()
+        db.execute(update(FileBlob).values(ref_count=references).execution_options(synchronize_session=False))
+        for blob_id in db.scalars(select(FileBlob.id).where(FileBlob.ref_count == 0)):
+            enqueue_job(db, "files.collect_blob", {"blob_id": blob_id})
+    db.commit()
@@ -0,0 +1,128 @@
+import hashlib
+import io
+import logging
+
+from sqlalchemy import delete, or_, update
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from core.minio_client import minio_client
+from v1.file_storage import attach_blob
+from v1.jobs import enqueue_job, job_handler
+from v1.models import FileBlob, ProjectFile
+from v1.notifier import deliver_notifications
+from v1.previews import DERIVATIVE_CACHE_CONTROL, PreviewError, derivative_name, preview_kind, render_image, render_pdf, render_text
+from v1.task_counters import refresh_project_progress
+
+logger = logging.getLogger("api.jobs")
+
+@job_handler("notifications.send")
+def send_notifications_job(db: Session, payload: dict):
+    deliver_notifications(db, [(row["user_id"], row["message"]) for row in payload["notifications"]])
+
+@job_handler("projects.refresh_progress")
+def refresh_project_progress_job(db: Session, payload: dict):
+    refresh_project_progress(db, payload["project_id"])
+
+@job_handler("files.remove_object")
+def remove_file_object_job(db: Session, payload: dict):
+    # Removing an object that is already gone succeeds, so a retried job is harmless.
+    minio_client.remove_object(payload.get("bucket", settings.MINIO_BUCKET_NAME), payload["object_name"])
+
+@job_handler("files.discard_unclaimed")
+def discard_unclaimed_upload_job(db: Session, payload: dict):
+    # Runs once a presigned upload can no longer be completed; drops the object if nothing recorded it.
+    # A recorded upload may have become a blob's object and outlived its file; files.collect_blob owns it then.
+    object_name = payload["object_name"]
+    if db.query(ProjectFile.id).filter(ProjectFile.object_name == object_name).first() is not None:
+        return
+    if db.query(FileBlob.id).filter(or_(
+        FileBlob.object_name == object_name,
+        FileBlob.thumbnail_object_name == object_name,
+        FileBlob.preview_object_name == object_name
+    )).first() is not None:
+        return
+    minio_client.remove_object(payload.get("bucket", settings.MINIO_BUCKET_NAME), object_name)
+
+@job_handler("files.collect_blob")
+def collect_blob_job(db: Session, payload: dict):
+    # Skipped if an upload of the same content took a new reference in the meantime.
+    blob = db.execute(
+        delete(FileBlob).where(FileBlob.id == payload["blob_id"], FileBlob.ref_count <= 0).returning(
+            FileBlob.object_name, FileBlob.thumbnail_object_name, FileBlob.preview_object_name
+        )
+    ).first()
+    if blob is not None:
+        for object_name in blob:
+            if object_name is not None:
+                minio_client.remove_object(settings.MINIO_BUCKET_NAME, object_name)
+
+@job_handler("files.render_previews")
+def render_previews_job(db: Session, payload: dict):
+    """Render a blob's thumbnail and preview and store them next to it in the bucket."""
+    blob = db.get(FileBlob, payload["blob_id"])
+    if blob is None or blob.preview_status != "pending":
+        return
+    source = db.query(ProjectFile.content_type, ProjectFile.file_name).filter(ProjectFile.blob_id == blob.id).first()
+    blob_id, object_name, size = blob.id, blob.object_name, blob.size
+    kind = preview_kind(source.content_type, source.file_name) if source else None
+    # Don't hold a pooled connection while the source downloads and renders.
+    db.rollback()
+
+    derivatives, status = {}, "unsupported"
+    if kind == "text" or (kind is not None and size <= settings.PREVIEW_MAX_SOURCE_BYTES):
+        # Text previews only need the head of the file; length 0 reads the whole object.
+        length = min(settings.PREVIEW_TEXT_BYTES, size) if kind == "text" else 0
+        response = minio_client.get_object(settings.MINIO_BUCKET_NAME, object_name, length=length)
+        try:
+            data = response.read()
+        finally:
+            response.close()
+            response.release_conn()
+        try:
+            derivatives = {"image": render_image, "pdf": render_pdf, "text": render_text}[kind](data)
+            status = "ready"
+        except PreviewError as e:
+            logger.info("No preview for blob %s: %s", blob_id, e)
+            status = "failed"
+
+    names = {}
+    for name, (content, content_type) in derivatives.items():
+        names[name] = derivative_name(blob_id, name, content_type)
+        minio_client.put_object(
+            settings.MINIO_BUCKET_NAME, names[name], io.BytesIO(content), len(content),
+            content_type=content_type, metadata={"Cache-Control": DERIVATIVE_CACHE_CONTROL}
+        )
+    db.execute(update(FileBlob).where(FileBlob.id == blob_id).values(
+        preview_status=status,
+        thumbnail_object_name=names.get("thumbnail"),
+        preview_object_name=names.get("preview")
+    ))
+
+@job_handler("files.fingerprint")
+def fingerprint_file_job(db: Session, payload: dict):
+    """Hash a file that was uploaded straight to storage and move it onto a shared blob."""
+    db_file = db.get(ProjectFile, payload["file_id"])
+    if db_file is None or db_file.blob_id is not None:
+        return
+    object_name = db_file.object_name
+    # Don't hold a pooled connection while the object streams through.
+    db.rollback()
+    digest = hashlib.sha256()
+    response = minio_client.get_object(settings.MINIO_BUCKET_NAME, object_name)
+    try:
+        for chunk in response.stream(1024 * 1024):
+            digest.update(chunk)
+    finally:
+        response.close()
+        response.release_conn()
+
+    # Locked like delete_project_file does, so a concurrent delete sees either no blob or this one.
+    db_file = db.query(ProjectFile).filter(ProjectFile.id == payload["file_id"]).with_for_update().first()
+    if db_file is None or db_file.blob_id is not None:
+        return
+    db_file.checksum = digest.hexdigest()
+    db_file.blob_id, redundant = attach_blob(db, db_file.checksum, object_name, db_file.file_size or 0)
+    if redundant:
+        # Download links may already point at this copy; remove it once they have expired.
+        enqueue_job(db, "files.remove_object", {"object_name": object_name}, delay_seconds=settings.DOWNLOAD_URL_EXPIRES_SECONDS)
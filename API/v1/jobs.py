@@ -0,0 +1,269 @@
+import logging
+import os
+import random
+import socket
+import threading
+import time
+from datetime import timedelta
+from typing import Callable, Dict, List, Optional, Sequence
+
+from sqlalchemy import delete, func, select, text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, aliased
+
+from core.config import settings
+from core.database import SessionLocal
+from v1.models import Job
+
+logger = logging.getLogger("api.jobs")
+
+HANDLERS: Dict[str, Callable[[Session, dict], None]] = {}
+
+SUPERSEDED = "Superseded by a queued job with the same idempotency key"
+
+def job_handler(kind: str):
+    """Register `fn(db, payload)` for a job kind. It runs in the transaction that marks the job done."""
+    def register(fn):
+        HANDLERS[kind] = fn
+        return fn
+    return register
+
+def load_job_handlers():
+    import v1.job_handlers  # noqa: F401  (registers the handlers)
+
+def enqueue_job(
+    db: Session,
+    kind: str,
+    payload: dict,
+    idempotency_key: Optional[str] = None,
+    delay_seconds: float = 0,
+    max_attempts: Optional[int] = None,
+):
+    """Queue a job in the caller's transaction, so it only exists if the caller commits.
+
+    While a job with the same `idempotency_key` is still queued, enqueueing another is a
+    no-op: repeated requests for the same effect collapse into one run.
+    """
+    values = {
+        "kind": kind,
+        "payload": payload,
+        "status": "queued",
+        "attempts": 0,
+        "max_attempts": max_attempts or settings.JOB_MAX_ATTEMPTS,
+        "idempotency_key": idempotency_key,
+    }
+    if delay_seconds:
+        values["run_at"] = func.now() + timedelta(seconds=delay_seconds)
+    stmt = insert(Job).values(**values)
+    if idempotency_key is not None:
+        # The predicate must be a literal: a bound parameter can't be matched to the partial index.
+        stmt = stmt.on_conflict_do_nothing(index_elements=[Job.idempotency_key], index_where=text("status = 'queued'"))
+    db.execute(stmt)
+
+def retry_delay(attempts: int) -> float:
+    # Exponential backoff with jitter, so a failing dependency isn't hit by every retry at once.
+    delay = min(settings.JOB_RETRY_BASE_SECONDS * 2 ** (attempts - 1), settings.JOB_RETRY_MAX_SECONDS)
+    return delay * random.uniform(0.5, 1.0)
+
+def claim_jobs(db: Session, worker_id: str, limit: int, kinds: Optional[Sequence[str]] = None) -> List:
+    ready = select(Job.id).where(Job.status == 'queued', Job.run_at <= func.now())
+    if kinds:
+        ready = ready.where(Job.kind.in_(kinds))
+    ready = ready.order_by(Job.run_at, Job.id).limit(limit).with_for_update(skip_locked=True)
+    rows = db.execute(
+        update(Job).where(Job.id.in_(ready.scalar_subquery())).values(
+            status='running', attempts=Job.attempts + 1, locked_at=func.now(), locked_by=worker_id
+        ).returning(Job.id, Job.kind, Job.payload, Job.attempts, Job.max_attempts).execution_options(synchronize_session=False)
+    ).all()
+    db.commit()
+    return sorted(rows, key=lambda row: row.id)
+
+def _owned(job_id: int, worker_id: str):
+    # A job re-queued as stale may have been claimed by another worker since; only its owner records the outcome.
+    return (Job.id == job_id, Job.status == 'running', Job.locked_by == worker_id)
+
+def _start_job(db: Session, job_id: int, worker_id: str) -> bool:
+    """Re-stamp the lock as the job starts, so jobs waiting behind others in the batch don't look lost."""
+    count = db.execute(update(Job).where(*_owned(job_id, worker_id)).values(
+        locked_at=func.now()
+    ).execution_options(synchronize_session=False)).rowcount
+    db.commit()
+    return bool(count)
+
+def _mark_done(db: Session, job_id: int, worker_id: str) -> bool:
+    return bool(db.execute(update(Job).where(*_owned(job_id, worker_id)).values(
+        status='done', finished_at=func.now(), locked_at=None, locked_by=None, last_error=None
+    ).execution_options(synchronize_session=False)).rowcount)
+
+def _requeue(db: Session, where, values: dict) -> Optional[str]:
+    """Queue the job matching `where` again; "queued", "done" if it was superseded, or None if no job matched.
+
+    While another job with the same idempotency key is queued this one can't be (the partial
+    unique index allows one), and needn't be: that job will have the same effect.
+    """
+    twin = aliased(Job)
+    queued_twin = select(twin.id).where(twin.idempotency_key == Job.idempotency_key, twin.status == 'queued', twin.id != Job.id).exists()
+    try:
+        with db.begin_nested():
+            if db.execute(update(Job).where(*where, ~queued_twin).values(status='queued', **values).execution_options(synchronize_session=False)).rowcount:
+                return 'queued'
+    except IntegrityError:
+        pass  # the twin was queued concurrently
+    count = db.execute(update(Job).where(*where).values(
+        status='done', finished_at=func.now(), locked_at=None, locked_by=None, last_error=SUPERSEDED
+    ).execution_options(synchronize_session=False)).rowcount
+    return 'done' if count else None
+
+def _mark_failed(db: Session, job_id: int, worker_id: str, attempts: int, retry: bool, error: str):
+    values = {"locked_at": None, "locked_by": None, "last_error": error[:4000]}
+    if retry:
+        _requeue(db, _owned(job_id, worker_id), dict(values, run_at=func.now() + timedelta(seconds=retry_delay(attempts))))
+    else:
+        db.execute(update(Job).where(*_owned(job_id, worker_id)).values(
+            status='failed', finished_at=func.now(), **values
+        ).execution_options(synchronize_session=False))
+    db.commit()
+
+def requeue_stale_jobs(db: Session) -> int:
+    # Jobs left running by a worker that died; the attempt already counts.
+    stale = db.execute(select(Job.id).where(
+        Job.status == 'running',
+        Job.locked_at < func.now() - timedelta(seconds=settings.JOB_LOCK_TIMEOUT_SECONDS)
+    ).with_for_update(skip_locked=True)).scalars().all()
+    # One at a time, so two stale jobs sharing a key don't both go back in the queue.
+    for job_id in stale:
+        _requeue(db, (Job.id == job_id, Job.status == 'running'), {"locked_at": None, "locked_by": None, "last_error": "Worker lost"})
+    db.commit()
+    return len(stale)
+
+def prune_finished_jobs(db: Session) -> int:
+    # Failed jobs are kept until an admin retries or deletes them.
+    count = db.execute(delete(Job).where(
+        Job.status == 'done',
+        Job.finished_at < func.now() - timedelta(hours=settings.JOB_RETENTION_HOURS)
+    ).execution_options(synchronize_session=False)).rowcount
+    db.commit()
+    return count
+
+def retry_failed_job(db: Session, job_id: int) -> bool:
+    # A job already queued under the same key stands in for the retry.
+    outcome = _requeue(db, (Job.id == job_id, Job.status == 'failed'), {"attempts": 0, "run_at": func.now(), "finished_at": None})
+    db.commit()
+    return outcome is not None
+
+def job_stats(db: Session) -> dict:
+    rows = db.query(
+        Job.kind,
+        Job.status,
+        func.count(),
+        func.count().filter(Job.run_at <= func.now()),
+        func.extract("epoch", func.now() - func.min(Job.run_at)),
+    ).group_by(Job.kind, Job.status).all()
+
+    stats = {"queued": 0, "ready": 0, "running": 0, "failed": 0, "done": 0, "oldest_ready_seconds": 0.0, "by_kind": {}}
+    for kind, job_status, count, ready, oldest in rows:
+        stats[job_status] = stats.get(job_status, 0) + count
+        stats["by_kind"].setdefault(kind, {})[job_status] = count
+        if job_status == 'queued':
+            stats["ready"] += ready
+            if ready:
+                stats["oldest_ready_seconds"] = max(stats["oldest_ready_seconds"], round(float(oldest), 3))
+    return stats
+
+class JobWorker:
+    """Claims ready jobs with SKIP LOCKED and runs each in its own transaction.
+
+    A job's handler and the update marking it done commit together; a failure rolls the
+    handler back and re-queues the job with backoff until it runs out of attempts. Each job's
+    lock is stamped again as it starts, and its outcome is only recorded while this worker
+    still holds it.
+    """
+
+    HOUSEKEEPING_SECONDS = 60
+
+    def __init__(self, name: Optional[str] = None, kinds: Optional[Sequence[str]] = None):
+        load_job_handlers()
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+        self.kinds = list(kinds) if kinds else None
+
+    def run_once(self) -> int:
+        db = SessionLocal()
+        try:
+            jobs = claim_jobs(db, self.name, settings.JOB_BATCH_SIZE, self.kinds)
+        finally:
+            db.close()
+        for job in jobs:
+            self._run(job)
+        return len(jobs)
+
+    def _run(self, job):
+        handler = HANDLERS.get(job.kind)
+        # A fresh session per job, so nothing (request memos, pending events) leaks between jobs.
+        db = SessionLocal()
+        try:
+            if not _start_job(db, job.id, self.name):
+                logger.warning("Job %s (%s) was re-queued before it started here; skipping", job.id, job.kind)
+                return
+            try:
+                if handler is None:
+                    raise LookupError(f"No handler registered for job kind {job.kind!r}")
+                handler(db, job.payload)
+                if not _mark_done(db, job.id, self.name):
+                    # Another worker owns the job now and will run it; don't apply its effects twice.
+                    db.rollback()
+                    logger.warning("Job %s (%s) was re-queued while running here; discarding this run", job.id, job.kind)
+                    return
+                db.commit()
+            except Exception as exc:
+                db.rollback()
+                logger.exception("Job %s (%s) failed on attempt %s/%s", job.id, job.kind, job.attempts, job.max_attempts)
+                retry = handler is not None and job.attempts < job.max_attempts
+                _mark_failed(db, job.id, self.name, job.attempts, retry, f"{type(exc).__name__}: {exc}")
+        except Exception:
+            # Left running, the job is picked up again as stale; the rest of the batch still runs.
+            db.rollback()
+            logger.exception("Could not record the outcome of job %s (%s)", job.id, job.kind)
+        finally:
+            db.close()
+
+    def housekeeping(self):
+        db = SessionLocal()
+        try:
+            requeued = requeue_stale_jobs(db)
+            pruned = prune_finished_jobs(db)
+        finally:
+            db.close()
+        if requeued:
+            logger.warning("Re-queued %s jobs from lost workers", requeued)
+        return requeued, pruned
+
+    def run(self, stop: threading.Event):
+        next_housekeeping = 0.0
+        while not stop.is_set():
+            try:
+                if time.monotonic() >= next_housekeeping:
+                    # Scheduled first, so a failing pass can't keep the worker from running jobs.
+                    next_housekeeping = time.monotonic() + self.HOUSEKEEPING_SECONDS
+                    self.housekeeping()
+                if self.run_once():
+                    continue
+            except Exception:
+                logger.exception("Job worker %s hit an error; backing off", self.name)
+            stop.wait(settings.JOB_POLL_SECONDS)
+
+def start_job_workers(count: int, kinds: Optional[Sequence[str]] = None):
+    """Start `count` worker threads; returns the event that stops them and the threads."""
+    stop = threading.Event()
+    threads = []
+    for index in range(count):
+        worker = JobWorker(name=f"{socket.gethostname()}:{os.getpid()}:{index}", kinds=kinds)
+        thread = threading.Thread(target=worker.run, args=(stop,), name=f"job-worker-{index}", daemon=True)
+        thread.start()
+        threads.append(thread)
+    return stop, threads
+
+def stop_job_workers(stop: threading.Event, threads: List[threading.Thread], timeout: float = 10):
+    stop.set()
+    for thread in threads:
+        thread.join(timeout)
@@ -1,18 +1,25 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, ForeignKey, Date, DateTime, Numeric, Table
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Computed, Integer, BigInteger, String, Text, Boolean, ForeignKey, Date, DateTime, Numeric, Table, Index, text
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from core.database import Base
 from sqlalchemy.sql import func
 
+def _search_vector(expression: str):
+    # Maintained by Postgres on every write; deferred so ordinary loads don't fetch it. See v1/routers/search.py.
+    return deferred(Column(TSVECTOR, Computed(expression, persisted=True)))
+
 task_dependency_table = Table(
     'task_dependencies', Base.metadata,
     Column('task_id', Integer, ForeignKey('tasks.id', ondelete="CASCADE"), primary_key=True),
-    Column('depends_on_task_id', Integer, ForeignKey('tasks.id', ondelete="CASCADE"), primary_key=True)
+    Column('depends_on_task_id', Integer, ForeignKey('tasks.id', ondelete="CASCADE"), primary_key=True),
+    Index("ix_task_dependencies_depends_on", "depends_on_task_id", "task_id")
 )
 
 task_files_table = Table(
     'task_files', Base.metadata,
     Column('task_id', Integer, ForeignKey('tasks.id', ondelete="CASCADE"), primary_key=True),
-    Column('file_id', Integer, ForeignKey('project_files.id', ondelete="CASCADE"), primary_key=True)
+    Column('file_id', Integer, ForeignKey('project_files.id', ondelete="CASCADE"), primary_key=True),
+    Index("ix_task_files_file", "file_id")
 )
 
 class Role(Base):
@@ -48,6 +55,21 @@ class Project(Base):
     files = relationship("ProjectFile", back_populates="project", cascade="all, delete-orphan")
     project_members = relationship("ProjectMember", cascade="all, delete-orphan", overlaps="members,projects")
 
+class ProjectTaskCount(Base):
+    __tablename__ = "project_task_counts"
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    status = Column(String, primary_key=True)
+    task_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+class AssigneeTaskCount(Base):
+    """Tasks per assignee and status across all projects, maintained like ProjectTaskCount."""
+    __tablename__ = "assignee_task_counts"
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    status = Column(String, primary_key=True)
+    task_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
 class ProjectMember(Base):
     __tablename__ = "project_members"
     project_id = Column(Integer, ForeignKey("projects.id"), primary_key=True)
@@ -55,6 +77,9 @@ class ProjectMember(Base):
     role_id = Column(Integer, ForeignKey("roles.id"))
     user = relationship("User", overlaps="members,projects")
     role = relationship("Role")
+    __table_args__ = (
+        Index("ix_project_members_user", "user_id", "project_id"),
+    )
 
 class ProjectFile(Base):
     __tablename__ = "project_files"
@@ -63,11 +88,45 @@ class ProjectFile(Base):
     file_name = Column(String, nullable=False)
     object_name = Column(String, unique=True, nullable=False)
     content_type = Column(String)
-    file_size = Column(Integer)
+    file_size = Column(BigInteger)
+    # Hex SHA-256 of the stored object, computed while it streams in
+    checksum = Column(String(64))
+    # Shared content; NULL for files stored before deduplication, which own `object_name` outright
+    blob_id = Column(BigInteger, ForeignKey("file_blobs.id"))
     uploaded_at = Column(DateTime(timezone=True), server_default=func.now())
     uploaded_by_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     project = relationship("Project", back_populates="files")
     uploader = relationship("User")
+    blob = relationship("FileBlob")
+    # Names are split on punctuation and not stemmed: "q3-report_final.pdf" -> q3, report, final, pdf
+    search_vector = _search_vector("to_tsvector('simple', regexp_replace(file_name, '[^[:alnum:]]+', ' ', 'g'))")
+    __table_args__ = (
+        Index("ix_project_files_project_uploaded", "project_id", "uploaded_at", "id"),
+        Index("ix_project_files_blob_id", "blob_id"),
+        Index("ix_project_files_search", "search_vector", postgresql_using="gin"),
+    )
+
+class FileBlob(Base):
+    """One stored object per distinct file content, shared by every ProjectFile with that checksum."""
+    __tablename__ = "file_blobs"
+    id = Column(BigInteger, primary_key=True)
+    checksum = Column(String(64), unique=True, nullable=False)
+    object_name = Column(String, unique=True, nullable=False)
+    size = Column(BigInteger, nullable=False)
+    # project_files rows pointing here; the blob and its object are collected when it reaches zero
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Set by the files.render_previews job: "pending", "ready", "unsupported" or "failed"
+    preview_status = Column(String(20), nullable=False, default="pending", server_default="pending")
+    thumbnail_object_name = Column(String)
+    preview_object_name = Column(String)
+
+class ProjectStorage(Base):
+    __tablename__ = "project_storage"
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    # Logical usage: every file counts in full, even when its content is shared
+    file_count = Column(Integer, nullable=False, default=0)
+    total_bytes = Column(BigInteger, nullable=False, default=0)
 
 class Milestone(Base):
     __tablename__ = "milestones"
@@ -78,7 +137,11 @@ class Milestone(Base):
     due_date = Column(Date)
     status = Column(String, default='pending')
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
     project = relationship("Project", back_populates="milestones")
+    __table_args__ = (
+        Index("ix_milestones_project_due", "project_id", "due_date"),
+    )
 
 class Task(Base):
     __tablename__ = "tasks"
@@ -90,6 +153,7 @@ class Task(Base):
     project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
     assignee_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
     due_date = Column(Date)
     reminder_date = Column(DateTime(timezone=True))
     dependencies = relationship("Task", secondary=task_dependency_table, 
@@ -98,6 +162,18 @@ class Task(Base):
                                 backref="dependents")
     files = relationship("ProjectFile", secondary=task_files_table)
     project = relationship("Project")
+    search_vector = _search_vector(
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+    )
+    __table_args__ = (
+        Index("ix_tasks_search", "search_vector", postgresql_using="gin"),
+        Index("ix_tasks_project_created", "project_id", "created_at", "id"),
+        Index("ix_tasks_project_status_created", "project_id", "status", "created_at", "id"),
+        Index("ix_tasks_project_updated", "project_id", "updated_at"),
+        Index("ix_tasks_project_assignee", "project_id", "assignee_id"),
+        Index("ix_tasks_project_due", "project_id", "due_date", postgresql_where=text("due_date IS NOT NULL")),
+        Index("ix_tasks_assignee_status", "assignee_id", "status", postgresql_where=text("assignee_id IS NOT NULL")),
+    )
 
 class Comment(Base):
     __tablename__ = "comments"
@@ -106,8 +182,14 @@ class Comment(Base):
     task_id = Column(Integer, ForeignKey("tasks.id", ondelete="CASCADE"), nullable=False)
     author_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
     mentions = relationship("Mention", cascade="all, delete-orphan")
     task = relationship("Task")
+    search_vector = _search_vector("to_tsvector('english', content)")
+    __table_args__ = (
+        Index("ix_comments_task_created", "task_id", "created_at", "id"),
+        Index("ix_comments_search", "search_vector", postgresql_using="gin"),
+    )
 
 class Mention(Base):
     __tablename__ = "mentions"
@@ -116,6 +198,10 @@ class Mention(Base):
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     user = relationship("User")
+    __table_args__ = (
+        Index("ix_mentions_comment", "comment_id"),
+        Index("ix_mentions_user", "user_id"),
+    )
 
 class TimeLog(Base):
     __tablename__ = "time_logs"
@@ -125,6 +211,10 @@ class TimeLog(Base):
     start_time = Column(DateTime(timezone=True), nullable=False)
     end_time = Column(DateTime(timezone=True))
     notes = Column(Text)
+    __table_args__ = (
+        Index("ix_time_logs_task_start", "task_id", "start_time", "id"),
+        Index("ix_time_logs_user_start", "user_id", "start_time"),
+    )
 
 class Issue(Base):
     __tablename__ = "issues"
@@ -137,9 +227,19 @@ class Issue(Base):
     reporter_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     assignee_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
     resolved_at = Column(DateTime(timezone=True))
     reporter = relationship("User", foreign_keys=[reporter_id])
     assignee = relationship("User", foreign_keys=[assignee_id])
+    search_vector = _search_vector(
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+    )
+    __table_args__ = (
+        Index("ix_issues_search", "search_vector", postgresql_using="gin"),
+        Index("ix_issues_project_created", "project_id", "created_at", "id"),
+        Index("ix_issues_project_status_created", "project_id", "status", "created_at", "id"),
+        Index("ix_issues_assignee_status", "assignee_id", "status", postgresql_where=text("assignee_id IS NOT NULL")),
+    )
 
 class Notification(Base):
     __tablename__ = "notifications"
@@ -147,4 +247,38 @@ class Notification(Base):
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     message = Column(Text, nullable=False)
     is_read = Column(Boolean, default=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    __table_args__ = (
+        Index("ix_notifications_user_created", "user_id", "created_at", "id"),
+        Index("ix_notifications_user_unread", "user_id", "created_at", "id", postgresql_where=text("is_read = false")),
+        Index("ix_notifications_read_created", "created_at", postgresql_where=text("is_read = true")),
+    )
+
+class NotificationCounter(Base):
+    __tablename__ = "notification_counters"
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    unread_count = Column(Integer, nullable=False, default=0)
+    # Bumped on every change to the user's notifications; tags the inbox for conditional GETs.
+    version = Column(BigInteger, nullable=False, default=0)
+
+class Job(Base):
+    __tablename__ = "jobs"
+    id = Column(BigInteger, primary_key=True)
+    kind = Column(String, nullable=False)
+    payload = Column(JSONB, nullable=False, server_default=text("'{}'::jsonb"))
+    status = Column(String, nullable=False, default='queued')
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False)
+    # At most one queued job per key; see v1/jobs.py
+    idempotency_key = Column(String)
+    run_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    locked_at = Column(DateTime(timezone=True))
+    locked_by = Column(String)
+    last_error = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    finished_at = Column(DateTime(timezone=True))
+    __table_args__ = (
+        Index("ix_jobs_queued_run_at", "run_at", "id", postgresql_where=text("status = 'queued'")),
+        Index("ix_jobs_idempotency_key", "idempotency_key", unique=True, postgresql_where=text("status = 'queued'")),
+        Index("ix_jobs_status_finished", "status", "finished_at"),
+    )
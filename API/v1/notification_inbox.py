@@ -0,0 +1,75 @@
+import time
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import delete, func, literal, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from v1.models import Notification, NotificationCounter, User
+
+def apply_unread_deltas(db: Session, deltas: Dict[int, int]):
+    # One upsert for every affected user, in user id order so concurrent writers lock counters in the same order.
+    # Every call bumps the users' versions, even with a zero delta. Committing is left to the caller.
+    rows = [{"user_id": user_id, "unread_count": delta, "version": 1} for user_id, delta in sorted(deltas.items())]
+    if not rows:
+        return
+    stmt = insert(NotificationCounter).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[NotificationCounter.user_id],
+        set_={
+            "unread_count": NotificationCounter.unread_count + stmt.excluded.unread_count,
+            "version": NotificationCounter.version + 1,
+        }
+    )
+    db.execute(stmt)
+
+def get_inbox_state(db: Session, user_id: int) -> Tuple[int, int]:
+    """(unread count, version) for a user's notifications, from a single primary-key lookup."""
+    row = db.query(NotificationCounter.unread_count, NotificationCounter.version).filter(
+        NotificationCounter.user_id == user_id
+    ).first()
+    return (row.unread_count, row.version) if row else (0, 0)
+
+def reconcile_notification_counters(db: Session, user_id: Optional[int] = None):
+    # Block concurrent counter upserts so the rebuilt totals match the notifications table exactly.
+    db.execute(text("LOCK TABLE notification_counters IN EXCLUSIVE MODE"))
+
+    counts = select(
+        User.id, func.count(Notification.id).filter(Notification.is_read == False), literal(1)
+    ).outerjoin(Notification, Notification.user_id == User.id).group_by(User.id)
+    if user_id is not None:
+        counts = counts.where(User.id == user_id)
+
+    stmt = insert(NotificationCounter).from_select(
+        [NotificationCounter.user_id, NotificationCounter.unread_count, NotificationCounter.version], counts
+    )
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[NotificationCounter.user_id],
+        set_={"unread_count": stmt.excluded.unread_count, "version": NotificationCounter.version + 1}
+    ))
+    db.commit()
+
+def prune_read_notifications(db: Session, older_than: datetime, batch_size: int, pause_seconds: float = 0) -> int:
+    """Delete read notifications created before `older_than`, one short transaction per batch.
+
+    Each batch locks at most `batch_size` rows and skips rows another transaction holds,
+    so inbox reads and mark-read requests are never blocked for long.
+    """
+    deleted = 0
+    while True:
+        batch = select(Notification.id).where(
+            Notification.is_read == True,
+            Notification.created_at < older_than
+        ).order_by(Notification.created_at).limit(batch_size).with_for_update(skip_locked=True)
+        user_ids = db.execute(
+            delete(Notification).where(Notification.id.in_(batch.scalar_subquery())).returning(Notification.user_id)
+        ).scalars().all()
+        # Read rows don't move the unread counts, but the inboxes did change.
+        apply_unread_deltas(db, dict.fromkeys(user_ids, 0))
+        db.commit()
+        deleted += len(user_ids)
+        if len(user_ids) < batch_size:
+            return deleted
+        if pause_seconds:
+            time.sleep(pause_seconds)
@@ -0,0 +1,34 @@
+from collections import Counter
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from typing import Iterable, Tuple
+
+from v1.events import publish_user_event
+from v1.jobs import enqueue_job
+from v1.models import Notification
+from v1.notification_inbox import apply_unread_deltas
+
+def send_notifications(db: Session, notifications: Iterable[Tuple[int, str]]):
+    # Queued in the caller's transaction; a worker inserts the rows and pushes them to the recipients.
+    rows = [{"user_id": user_id, "message": message} for user_id, message in notifications if user_id]
+    if rows:
+        enqueue_job(db, "notifications.send", {"notifications": rows})
+
+def deliver_notifications(db: Session, notifications: Iterable[Tuple[int, str]]):
+    # One multi-row INSERT, however many recipients there are.
+    rows = [{"user_id": user_id, "message": message} for user_id, message in notifications if user_id]
+    if not rows:
+        return
+    created = db.execute(
+        insert(Notification).returning(Notification.id, Notification.created_at, sort_by_parameter_order=True), rows
+    ).all()
+    apply_unread_deltas(db, Counter(row["user_id"] for row in rows))
+    # Pushed to the recipients' event streams once the job commits.
+    for row, (notification_id, created_at) in zip(rows, created):
+        publish_user_event(
+            db, row["user_id"], "notification",
+            id=notification_id, message=row["message"], is_read=False, created_at=created_at.isoformat(),
+        )
+
+def notify_users(db: Session, user_ids: Iterable[int], message: str):
+    send_notifications(db, [(user_id, message) for user_id in dict.fromkeys(user_ids)])
@@ -0,0 +1,69 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from typing import Optional
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import Date, DateTime, tuple_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def _encode_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+def _decode_value(value, column):
+    if value is None:
+        return None
+    if isinstance(column.type, DateTime):
+        return datetime.fromisoformat(value)
+    if isinstance(column.type, Date):
+        return date.fromisoformat(value)
+    return value
+
+def encode_cursor(sort: str, values) -> str:
+    payload = json.dumps({"s": sort, "v": [_encode_value(v) for v in values]}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, sort: str, columns):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if payload["s"] != sort or len(payload["v"]) != len(columns):
+            raise ValueError("cursor does not match the requested sort")
+        return [_decode_value(v, c) for v, c in zip(payload["v"], columns)]
+    except (ValueError, KeyError, TypeError, binascii.Error):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor")
+
+def keyset_page(query, sort: str, sort_columns: dict, id_column, limit: int, after: Optional[str] = None):
+    """Keyset pagination over (sort column, id); returns the rows and the cursor of the next page, if any.
+
+    `sort` is a key of `sort_columns`, optionally prefixed with "-" for descending order.
+    """
+    descending = sort.startswith("-")
+    sort_column = sort_columns[sort.lstrip("-")]
+    columns = [id_column] if sort_column is id_column else [sort_column, id_column]
+    key = tuple_(*columns) if len(columns) > 1 else columns[0]
+
+    if after:
+        values = decode_cursor(after, sort, columns)
+        bound = tuple_(*values) if len(values) > 1 else values[0]
+        query = query.filter(key < bound if descending else key > bound)
+
+    ordering = [c.desc() if descending else c.asc() for c in columns]
+    rows = query.order_by(*ordering).limit(limit + 1).all()
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        return rows, encode_cursor(sort, [getattr(last, c.key) for c in columns])
+    return rows, None
+
+def paginate(query, response: Response, sort: str, sort_columns: dict, id_column, limit: int, after: Optional[str] = None):
+    """keyset_page for list endpoints: the cursor for the next page goes in the X-Next-Cursor header."""
+    rows, next_cursor = keyset_page(query, sort, sort_columns, id_column, limit, after)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return rows
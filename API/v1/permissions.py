@@ -0,0 +1,93 @@
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+from typing import Dict, Iterable, Optional
+
+from core.cache import TTLCache
+from core.config import settings
+from v1.models import ProjectMember, Role, Task
+
+# (user_id, project_id) -> project role name. Only members are cached: a user added on one worker
+# must not stay locked out by another worker's cached refusal. Changes are invalidated only in the
+# worker that made them, so a role change or removal may take MEMBERSHIP_CACHE_TTL_SECONDS elsewhere.
+membership_cache = TTLCache(maxsize=settings.MEMBERSHIP_CACHE_MAX_SIZE, ttl=settings.MEMBERSHIP_CACHE_TTL_SECONDS)
+
+def _request_memo(db: Session) -> dict:
+    # The session lives exactly as long as the request, so its info dict doubles as a per-request memo.
+    return db.info.setdefault("project_roles", {})
+
+def get_project_role(project_id: int, user_id: int, db: Session) -> Optional[str]:
+    key = (user_id, project_id)
+    memo = _request_memo(db)
+    if key in memo:
+        return memo[key]
+
+    role_name = membership_cache.get(key)
+    if role_name is None:
+        membership = db.query(ProjectMember.user_id, Role.name).outerjoin(
+            Role, Role.id == ProjectMember.role_id
+        ).filter(
+            ProjectMember.project_id == project_id,
+            ProjectMember.user_id == user_id
+        ).first()
+        role_name = membership.name if membership else None
+        if role_name:
+            membership_cache.set(key, role_name)
+
+    memo[key] = role_name or None
+    return memo[key]
+
+def get_project_roles(project_id: int, user_ids: Iterable[int], db: Session) -> Dict[int, str]:
+    """Project role of each given user who is a member, resolved with at most one IN query."""
+    memo = _request_memo(db)
+    roles = {}
+    missing = []
+    for user_id in set(user_ids):
+        key = (user_id, project_id)
+        if key not in memo:
+            role_name = membership_cache.get(key)
+            if role_name is None:
+                missing.append(user_id)
+                continue
+            memo[key] = role_name
+        if memo[key]:
+            roles[user_id] = memo[key]
+
+    if missing:
+        found = dict(db.query(ProjectMember.user_id, Role.name).outerjoin(
+            Role, Role.id == ProjectMember.role_id
+        ).filter(
+            ProjectMember.project_id == project_id,
+            ProjectMember.user_id.in_(missing)
+        ).all())
+        for user_id in missing:
+            role_name = found.get(user_id)
+            memo[(user_id, project_id)] = role_name or None
+            if role_name:
+                membership_cache.set((user_id, project_id), role_name)
+                roles[user_id] = role_name
+
+    return roles
+
+def check_project_membership(project_id: int, user_id: int, db: Session) -> str:
+    role_name = get_project_role(project_id, user_id, db)
+    if role_name is None:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not a member of this project")
+    return role_name
+
+def get_task_and_check_membership(task_id: int, user_id: int, db: Session) -> Task:
+    task = db.query(Task).filter(Task.id == task_id).first()
+    if not task:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
+
+    if get_project_role(task.project_id, user_id, db) is None:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to access this task")
+
+    return task
+
+def invalidate_project_membership(project_id: int, user_id: int, db: Optional[Session] = None):
+    membership_cache.pop((user_id, project_id))
+    if db is not None:
+        _request_memo(db).pop((user_id, project_id), None)
+
+def invalidate_user_memberships(user_id: int):
+    membership_cache.discard_where(lambda key: key[0] == user_id)
@@ -0,0 +1,111 @@
+import io
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pypdfium2
+from PIL import Image, ImageOps
+
+from core.config import settings
+from core.minio_client import presign_client
+from v1.schemas import ProjectFileResponse
+
+# Derivatives are never rewritten in place, so browsers and proxies may keep them for good.
+DERIVATIVE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+TEXT_TYPES = ("application/json", "application/xml", "application/javascript", "application/x-yaml")
+TEXT_EXTENSIONS = ("txt", "md", "csv", "tsv", "log", "json", "xml", "yaml", "yml", "py", "js", "ts", "html", "css", "sql")
+
+class PreviewError(Exception):
+    """The source can't be rendered; retrying won't help."""
+
+def preview_kind(content_type: Optional[str], file_name: str) -> Optional[str]:
+    """"image", "pdf", "text" or None when no preview is generated for this file."""
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    extension = file_name.rsplit(".", 1)[-1].lower() if "." in file_name else ""
+    if content_type.startswith("image/") and content_type != "image/svg+xml":
+        return "image"
+    if content_type == "application/pdf" or extension == "pdf":
+        return "pdf"
+    if content_type.startswith("text/") or content_type in TEXT_TYPES or extension in TEXT_EXTENSIONS:
+        return "text"
+    return None
+
+def _webp(image: Image.Image, size: int) -> bytes:
+    image = image.copy()
+    image.thumbnail((size, size))
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "transparency" in image.info or image.mode in ("LA", "PA") else "RGB")
+    out = io.BytesIO()
+    image.save(out, "WEBP", quality=80, method=4)
+    return out.getvalue()
+
+def _image_derivatives(image: Image.Image) -> Dict[str, Tuple[bytes, str]]:
+    return {
+        "thumbnail": (_webp(image, settings.PREVIEW_THUMBNAIL_SIZE), "image/webp"),
+        "preview": (_webp(image, settings.PREVIEW_IMAGE_SIZE), "image/webp"),
+    }
+
+def render_image(data: bytes) -> Dict[str, Tuple[bytes, str]]:
+    try:
+        image = Image.open(io.BytesIO(data))
+        # JPEGs decode at a reduced scale straight away instead of at full resolution.
+        image.draft("RGB", (settings.PREVIEW_IMAGE_SIZE, settings.PREVIEW_IMAGE_SIZE))
+        image = ImageOps.exif_transpose(image)
+        return _image_derivatives(image)
+    except (OSError, ValueError, SyntaxError, Image.DecompressionBombError) as e:
+        raise PreviewError(f"Unreadable image: {e}")
+
+def render_pdf(data: bytes) -> Dict[str, Tuple[bytes, str]]:
+    try:
+        pdf = pypdfium2.PdfDocument(data)
+    except pypdfium2.PdfiumError as e:
+        raise PreviewError(f"Unreadable PDF: {e}")
+    try:
+        if len(pdf) == 0:
+            raise PreviewError("PDF has no pages")
+        page = pdf[0]
+        # Render the first page just large enough for the preview.
+        scale = settings.PREVIEW_IMAGE_SIZE / max(page.get_size())
+        image = page.render(scale=scale).to_pil()
+        return _image_derivatives(image)
+    finally:
+        pdf.close()
+
+def render_text(data: bytes) -> Dict[str, Tuple[bytes, str]]:
+    # `data` is only the head of the file; drop a multi-byte character cut off at the end.
+    text = data.decode("utf-8", errors="ignore" if len(data) >= settings.PREVIEW_TEXT_BYTES else "replace")
+    if "\x00" in text:
+        raise PreviewError("Binary content")
+    return {"preview": (text.encode("utf-8"), "text/plain; charset=utf-8")}
+
+def derivative_name(blob_id: int, name: str, content_type: str) -> str:
+    extension = "webp" if content_type == "image/webp" else "txt"
+    return f"previews/{blob_id}/{name}.{extension}"
+
+def derivative_url(object_name: str) -> str:
+    """A URL that stays the same for PREVIEW_URL_WINDOW_SECONDS, so a cached copy keeps being hit.
+
+    Signing with the start of the current window as the request date makes the signature
+    deterministic; the URL stays valid for a further window after that.
+    """
+    window = settings.PREVIEW_URL_WINDOW_SECONDS
+    now = int(datetime.now(timezone.utc).timestamp())
+    signed_at = datetime.fromtimestamp(now - now % window, timezone.utc)
+    return presign_client.presigned_get_object(
+        settings.MINIO_BUCKET_NAME, object_name, expires=timedelta(seconds=2 * window), request_date=signed_at
+    )
+
+def file_responses(files: Iterable) -> List[ProjectFileResponse]:
+    """ProjectFileResponses with preview URLs; load `ProjectFile.blob` eagerly for lists."""
+    responses = []
+    for db_file in files:
+        response = ProjectFileResponse.model_validate(db_file)
+        blob = db_file.blob
+        if blob is not None:
+            response.preview_status = blob.preview_status
+            if blob.thumbnail_object_name:
+                response.thumbnail_url = derivative_url(blob.thumbnail_object_name)
+            if blob.preview_object_name:
+                response.preview_url = derivative_url(blob.preview_object_name)
+        responses.append(response)
+    return responses
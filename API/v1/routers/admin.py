@@ -1,12 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from typing import List
 
-from core.database import get_db
-from v1.auth import get_current_user
-from v1.models import Role, User
+from core.database import database_pool_stats, get_db
+from core.pubsub import broker
+from v1.auth import get_current_user, invalidate_cached_user, user_cache
+from v1.file_storage import storage_stats
+from v1.jobs import job_stats, retry_failed_job
+from v1.models import Job, Role, User
+from v1.permissions import invalidate_user_memberships, membership_cache
+from v1.routers.files import download_url_cache
+from v1.task_graph import task_graph_cache
 from .users import UserResponse, RoleResponse
-from v1.schemas import UserResponse, RoleResponse
+from v1.schemas import UserResponse, RoleResponse, JobResponse
 
 router = APIRouter(
     prefix="/admin",
@@ -39,5 +45,72 @@ def change_user_role(
         
     user.role_id = role_id
     db.commit()
+    invalidate_cached_user(user.email)
+    invalidate_user_memberships(user.id)
     db.refresh(user)
-    return user
\ No newline at end of file
+    return user
+
+@router.put("/users/{user_id}/deactivate", response_model=UserResponse)
+def deactivate_user(
+    user_id: int,
+    db: Session = Depends(get_db),
+    admin: User = Depends(get_current_admin_user)
+):
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    if user.id == admin.id:
+        raise HTTPException(status_code=400, detail="You cannot deactivate your own account")
+
+    user.is_active = False
+    db.commit()
+    invalidate_cached_user(user.email)
+    invalidate_user_memberships(user.id)
+    db.refresh(user)
+    return user
+
+@router.get("/cache/users")
+def get_user_cache_stats(admin: User = Depends(get_current_admin_user)):
+    return user_cache.stats()
+
+@router.get("/metrics/database")
+def get_database_pool_metrics(admin: User = Depends(get_current_admin_user)):
+    return database_pool_stats()
+
+@router.get("/metrics/events")
+def get_event_broker_metrics(admin: User = Depends(get_current_admin_user)):
+    return broker.stats()
+
+@router.get("/cache/memberships")
+def get_membership_cache_stats(admin: User = Depends(get_current_admin_user)):
+    return membership_cache.stats()
+
+@router.get("/cache/task-graphs")
+def get_task_graph_cache_stats(admin: User = Depends(get_current_admin_user)):
+    return task_graph_cache.stats()
+
+@router.get("/cache/download-urls")
+def get_download_url_cache_stats(admin: User = Depends(get_current_admin_user)):
+    return download_url_cache.stats()
+
+@router.get("/metrics/storage")
+def get_storage_metrics(db: Session = Depends(get_db), admin: User = Depends(get_current_admin_user)):
+    return storage_stats(db)
+
+@router.get("/jobs")
+def get_job_queue_stats(db: Session = Depends(get_db), admin: User = Depends(get_current_admin_user)):
+    return job_stats(db)
+
+@router.get("/jobs/failed", response_model=List[JobResponse])
+def list_failed_jobs(
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db),
+    admin: User = Depends(get_current_admin_user)
+):
+    return db.query(Job).filter(Job.status == 'failed').order_by(Job.finished_at.desc(), Job.id.desc()).limit(limit).all()
+
+@router.post("/jobs/{job_id}/retry", status_code=status.HTTP_204_NO_CONTENT)
+def retry_job(job_id: int, db: Session = Depends(get_db), admin: User = Depends(get_current_admin_user)):
+    if not retry_failed_job(db, job_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No failed job with this id")
+    return
@@ -1,31 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import insert
+from sqlalchemy.orm import Session, joinedload, selectinload
+from typing import List, Literal, Optional
 
+from core.config import settings
 from core.database import get_db
 from v1.auth import get_current_user
-from v1.models import User, Task, ProjectMember, Comment, Notification, Mention
+from v1.conditional import collection_version, not_modified, version_etag
+from v1.events import publish_project_event
+from v1.models import User, Comment, Mention
+from v1.notifier import notify_users
+from v1.pagination import paginate
+from v1.permissions import get_project_roles, get_task_and_check_membership
 from v1.schemas import CommentCreate, CommentResponse
 
 router = APIRouter(
     tags=["comments"],
 )
 
-def get_task_and_check_membership(task_id: int, user_id: int, db: Session):
-    task = db.query(Task).filter(Task.id == task_id).first()
-    if not task:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
-    
-    membership = db.query(ProjectMember).filter(
-        ProjectMember.project_id == task.project_id,
-        ProjectMember.user_id == user_id
-    ).first()
-    
-    if not membership:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to access this task")
-    
-    return task
-
 @router.post("/tasks/{task_id}/comments/", response_model=CommentResponse, status_code=status.HTTP_201_CREATED)
 def create_comment_on_task(
     task_id: int,
@@ -34,36 +26,47 @@ def create_comment_on_task(
     current_user: User = Depends(get_current_user)
 ):
     task = get_task_and_check_membership(task_id, current_user.id, db)
+
+    # Ensure every mentioned user is part of the project, with a single query
+    mentioned_ids = sorted(set(comment.mentioned_user_ids or []) - {current_user.id})
+    if mentioned_ids and len(get_project_roles(task.project_id, mentioned_ids, db)) != len(mentioned_ids):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not a member of this project")
     
     db_comment = Comment(content=comment.content, task_id=task_id, author_id=current_user.id)
     db.add(db_comment)
+    db.flush()
+
+    if mentioned_ids:
+        db.execute(insert(Mention), [{"comment_id": db_comment.id, "user_id": user_id} for user_id in mentioned_ids])
+        notification_msg = f"@{current_user.email} mentioned you in a comment on task '{task.title}'"
+        notify_users(db, mentioned_ids, notification_msg)
+    publish_project_event(db, task.project_id, "comment.created", task_id=task_id, comment_id=db_comment.id)
     db.commit()
 
-    # Handle mentions
-    if comment.mentioned_user_ids:
-        for user_id in set(comment.mentioned_user_ids):
-            # Ensure mentioned user is part of the project
-            check_project_membership(task.project_id, user_id, db)
-            if user_id != current_user.id:
-                mention = Mention(comment_id=db_comment.id, user_id=user_id)
-                db.add(mention)
-                
-                notification_msg = f"@{current_user.email} mentioned you in a comment on task '{task.title}'"
-                notification = Notification(user_id=user_id, message=notification_msg)
-                db.add(notification)
-        db.commit()
-    
-    db.refresh(db_comment)
-    return db_comment
+    return db.query(Comment).options(
+        selectinload(Comment.mentions).joinedload(Mention.user).joinedload(User.role)
+    ).filter(Comment.id == db_comment.id).one()
 
 @router.get("/tasks/{task_id}/comments/", response_model=List[CommentResponse])
 def read_comments_for_task(
     task_id: int,
+    request: Request,
+    response: Response,
+    sort: Literal["created_at", "-created_at"] = "created_at",
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    after: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     get_task_and_check_membership(task_id, current_user.id, db)
-    return db.query(Comment).options(joinedload(Comment.mentions).joinedload(Mention.user)).filter(Comment.task_id == task_id).all()
+    etag = version_etag(request, *collection_version(db, Comment.updated_at, Comment.task_id == task_id))
+    unchanged = not_modified(request, response, etag)
+    if unchanged:
+        return unchanged
+    query = db.query(Comment).options(
+        selectinload(Comment.mentions).joinedload(Mention.user).joinedload(User.role)
+    ).filter(Comment.task_id == task_id)
+    return paginate(query, response, sort, {"created_at": Comment.created_at}, Comment.id, limit, after)
 
 @router.delete("/comments/{comment_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_comment(
@@ -1,25 +1,20 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import delete, insert
 from sqlalchemy.orm import Session
 from typing import List
 
 from core.database import get_db
 from v1.auth import get_current_user
-from v1.models import User, Task
+from v1.models import User, Project, task_dependency_table
 from v1.schemas import TaskDependencyCreate, TaskResponse
-from .tasks import check_project_membership
+from v1.permissions import get_task_and_check_membership
+from v1.task_graph import DependencyCycleError, invalidate_task_graph, load_task_graph
 
 router = APIRouter(
     prefix="/tasks/{task_id}/dependencies",
     tags=["dependencies"],
 )
 
-def get_task_and_check_auth(task_id: int, user_id: int, db: Session):
-    task = db.query(Task).filter(Task.id == task_id).first()
-    if not task:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
-    check_project_membership(task.project_id, user_id, db)
-    return task
-
 @router.post("/", status_code=status.HTTP_201_CREATED)
 def add_task_dependency(
     task_id: int,
@@ -27,17 +22,27 @@ def add_task_dependency(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    task = get_task_and_check_auth(task_id, current_user.id, db)
-    depends_on_task = get_task_and_check_auth(dependency.depends_on_task_id, current_user.id, db)
+    task = get_task_and_check_membership(task_id, current_user.id, db)
+    depends_on_task = get_task_and_check_membership(dependency.depends_on_task_id, current_user.id, db)
 
     if task.project_id != depends_on_task.project_id:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Tasks must be in the same project")
 
-    if depends_on_task in task.dependencies:
+    # Serialize edge changes per project so two concurrent inserts cannot close a cycle between them.
+    # FOR NO KEY UPDATE leaves task writes (which only take KEY SHARE on the project) unblocked.
+    db.query(Project.id).filter(Project.id == task.project_id).with_for_update(key_share=True).first()
+    graph = load_task_graph(db, task.project_id)
+
+    if graph.has_edge(task.id, depends_on_task.id):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Dependency already exists")
+    try:
+        graph.check_new_edge(task.id, depends_on_task.id)
+    except DependencyCycleError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-    task.dependencies.append(depends_on_task)
+    db.execute(insert(task_dependency_table).values(task_id=task.id, depends_on_task_id=depends_on_task.id))
     db.commit()
+    invalidate_task_graph(task.project_id)
     return {"message": "Dependency added successfully"}
 
 @router.get("/", response_model=List[TaskResponse])
@@ -46,7 +51,7 @@ def get_task_dependencies(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    task = get_task_and_check_auth(task_id, current_user.id, db)
+    task = get_task_and_check_membership(task_id, current_user.id, db)
     return task.dependencies
 
 @router.delete("/{depends_on_task_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -56,12 +61,14 @@ def remove_task_dependency(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    task = get_task_and_check_auth(task_id, current_user.id, db)
-    depends_on_task = get_task_and_check_auth(depends_on_task_id, current_user.id, db)
-    
-    if depends_on_task not in task.dependencies:
+    task = get_task_and_check_membership(task_id, current_user.id, db)
+    result = db.execute(delete(task_dependency_table).where(
+        task_dependency_table.c.task_id == task.id,
+        task_dependency_table.c.depends_on_task_id == depends_on_task_id
+    ))
+    if result.rowcount == 0:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Dependency not found")
-        
-    task.dependencies.remove(depends_on_task)
+
     db.commit()
-    return
\ No newline at end of file
+    invalidate_task_graph(task.project_id)
+    return
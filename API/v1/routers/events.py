@@ -0,0 +1,71 @@
+import asyncio
+import json
+import time
+from typing import List
+
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from core.config import settings
+from core.database import get_db
+from core.pubsub import Subscription, broker
+from v1.auth import get_stream_user
+from v1.events import project_channel, user_channel
+from v1.models import ProjectMember, User
+from v1.permissions import check_project_membership
+
+router = APIRouter(
+    prefix="/events",
+    tags=["events"],
+)
+
+def _channels(db: Session, user_id: int, project_ids: List[int]) -> List[str]:
+    if project_ids:
+        for project_id in project_ids:
+            check_project_membership(project_id, user_id, db)
+    else:
+        project_ids = [row.project_id for row in db.query(ProjectMember.project_id).filter(ProjectMember.user_id == user_id)]
+    return [user_channel(user_id)] + [project_channel(project_id) for project_id in project_ids]
+
+def _format(data: dict) -> str:
+    return f"event: {data['type']}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+async def _event_stream(subscription: Subscription):
+    deadline = time.monotonic() + settings.EVENTS_STREAM_MAX_SECONDS
+    try:
+        # Ask EventSource to come back quickly after we close the stream on purpose.
+        yield "retry: 2000\n\n"
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            try:
+                data = await asyncio.wait_for(subscription.get(), timeout=min(settings.EVENTS_HEARTBEAT_SECONDS, remaining))
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            yield _format(data)
+    finally:
+        broker.unsubscribe(subscription)
+
+@router.get("/stream")
+async def stream_events(
+    project_id: List[int] = Query([]),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_stream_user)
+):
+    """Server-sent events for the caller's notifications and for changes in their projects.
+
+    Subscribes to the given projects, or to every project the caller belongs to.
+    """
+    channels = await run_in_threadpool(_channels, db, current_user.id, project_id)
+    # The stream can stay open for minutes; don't keep a pooled connection checked out meanwhile.
+    await run_in_threadpool(db.close)
+    subscription = broker.subscribe(channels)
+    return StreamingResponse(
+        _event_stream(subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
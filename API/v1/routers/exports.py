@@ -0,0 +1,137 @@
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Literal, Optional
+import csv
+import io
+import json
+
+from core.database import SessionLocal, get_db
+from v1.auth import get_current_user
+from v1.models import User, Task, TimeLog, Issue
+from v1.permissions import check_project_membership
+
+router = APIRouter(
+    prefix="/projects/{project_id}/export",
+    tags=["exports"],
+)
+
+EXPORT_BATCH_SIZE = 1000
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+def _plain(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+def _stream_rows(stmt, export_format: str):
+    # The request's session is gone once streaming starts, so the export owns its own
+    # session and reads through a server-side cursor one batch at a time.
+    db = SessionLocal()
+    try:
+        result = db.execute(stmt.execution_options(stream_results=True, yield_per=EXPORT_BATCH_SIZE))
+        columns = list(result.keys())
+
+        if export_format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(columns)
+            for batch in result.partitions():
+                writer.writerows([[_plain(value) for value in row] for row in batch])
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate(0)
+            if buffer.tell():
+                yield buffer.getvalue()
+        else:
+            for batch in result.partitions():
+                yield "".join(
+                    json.dumps({column: _plain(value) for column, value in zip(columns, row)}) + "\n"
+                    for row in batch
+                )
+    finally:
+        db.close()
+
+def _export_response(stmt, project_id: int, name: str, export_format: str):
+    filename = f"project-{project_id}-{name}.{export_format}"
+    return StreamingResponse(
+        _stream_rows(stmt, export_format),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+@router.get("/tasks")
+def export_tasks(
+    project_id: int,
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    check_project_membership(project_id, current_user.id, db)
+
+    stmt = select(
+        Task.id, Task.project_id, Task.title, Task.description, Task.status, Task.priority,
+        Task.assignee_id, Task.created_at, Task.due_date, Task.reminder_date
+    ).where(Task.project_id == project_id)
+    if created_after is not None:
+        stmt = stmt.where(Task.created_at >= created_after)
+    if created_before is not None:
+        stmt = stmt.where(Task.created_at <= created_before)
+
+    return _export_response(stmt.order_by(Task.id), project_id, "tasks", export_format)
+
+@router.get("/timelogs")
+def export_time_logs(
+    project_id: int,
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    started_after: Optional[datetime] = None,
+    started_before: Optional[datetime] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    check_project_membership(project_id, current_user.id, db)
+
+    stmt = select(
+        TimeLog.id, TimeLog.task_id, TimeLog.user_id, TimeLog.start_time, TimeLog.end_time,
+        func.extract("epoch", TimeLog.end_time - TimeLog.start_time).label("duration_seconds"),
+        TimeLog.notes
+    ).join(Task, Task.id == TimeLog.task_id).where(Task.project_id == project_id)
+    if started_after is not None:
+        stmt = stmt.where(TimeLog.start_time >= started_after)
+    if started_before is not None:
+        stmt = stmt.where(TimeLog.start_time <= started_before)
+
+    return _export_response(stmt.order_by(TimeLog.id), project_id, "timelogs", export_format)
+
+@router.get("/issues")
+def export_issues(
+    project_id: int,
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    check_project_membership(project_id, current_user.id, db)
+
+    stmt = select(
+        Issue.id, Issue.project_id, Issue.title, Issue.description, Issue.status, Issue.severity,
+        Issue.reporter_id, Issue.assignee_id, Issue.created_at, Issue.resolved_at
+    ).where(Issue.project_id == project_id)
+    if created_after is not None:
+        stmt = stmt.where(Issue.created_at >= created_after)
+    if created_before is not None:
+        stmt = stmt.where(Issue.created_at <= created_before)
+
+    return _export_response(stmt.order_by(Issue.id), project_id, "issues", export_format)
@@ -1,21 +1,84 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status, UploadFile, File
+from sqlalchemy import and_, func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import ClientDisconnect
 from minio import Minio
+from minio.error import S3Error
+import contextlib
 import uuid
-from typing import List
-
-from core.database import get_db
-from core.minio_client import get_minio_client
-from v1.auth import get_current_user
-from v1.models import User, ProjectFile
-from v1.schemas import ProjectFileResponse
-from .tasks import check_project_membership
+from datetime import datetime, timedelta, timezone
+from typing import List, Literal, Optional
+
+from core.cache import TTLCache
+from core.database import get_db, get_session, run_db
+from core.minio_client import get_minio_client, presign_client
+from v1.auth import get_current_user, get_session_user
+from v1.events import publish_project_event
+from v1.file_storage import attach_blob, get_storage_usage, release_blob, release_storage, remaining_quota, reserve_storage
+from v1.jobs import enqueue_job
+from v1.models import User, FileBlob, ProjectFile, ProjectMember, Task, task_files_table
+from v1.previews import file_responses
+from v1.schemas import (
+    DownloadLinksRequest, DownloadLinksResponse, PresignedUploadComplete, PresignedUploadCreate,
+    PresignedUploadResponse, ProjectFileResponse, ProjectStorageResponse
+)
+from v1.pagination import paginate
+from v1.permissions import check_project_membership
+from v1.uploads import RequestBodyReader, create_upload_token, presign_upload, put_object_streaming, read_upload_token
 from core.config import settings
 
 router = APIRouter(
     tags=["files"],
 )
 
+# Presigned download URLs keyed by object name, stored as (url, expires_at). Access is checked
+# before a URL is handed out, so one cached URL can be shared by every member.
+download_url_cache = TTLCache(maxsize=settings.DOWNLOAD_URL_CACHE_MAX_SIZE, ttl=settings.DOWNLOAD_URL_CACHE_SECONDS)
+
+def _object_name(file_name: str) -> str:
+    file_extension = file_name.split('.')[-1] if '.' in file_name else ''
+    return f"{uuid.uuid4()}.{file_extension}"
+
+def _quota_exceeded():
+    return HTTPException(status_code=status.HTTP_413_CONTENT_TOO_LARGE, detail="Project storage quota exceeded")
+
+def _record_file(db: Session, project_id: int, user_id: int, file_name: str, object_name: str, content_type: Optional[str], file_size: int, checksum: Optional[str]):
+    """Record an object already in storage as a project file, sharing its content with identical files.
+
+    Without a checksum (direct uploads) the file keeps its own object until a worker hashes it.
+    """
+    if not reserve_storage(db, project_id, file_size):
+        db.rollback()
+        enqueue_job(db, "files.remove_object", {"bucket": settings.MINIO_BUCKET_NAME, "object_name": object_name})
+        db.commit()
+        raise _quota_exceeded()
+
+    blob_id = None
+    if checksum is not None:
+        blob_id, redundant = attach_blob(db, checksum, object_name, file_size)
+        if redundant:
+            # Identical content is already stored; nothing has handed out this copy yet.
+            enqueue_job(db, "files.remove_object", {"bucket": settings.MINIO_BUCKET_NAME, "object_name": object_name})
+    db_file = ProjectFile(
+        project_id=project_id,
+        file_name=file_name,
+        object_name=object_name,
+        content_type=content_type,
+        file_size=file_size,
+        checksum=checksum,
+        blob_id=blob_id,
+        uploaded_by_id=user_id
+    )
+    db.add(db_file)
+    if checksum is None:
+        db.flush()
+        enqueue_job(db, "files.fingerprint", {"file_id": db_file.id})
+    db.commit()
+    db.refresh(db_file)
+    return ProjectFileResponse.model_validate(db_file)
+
 @router.post("/projects/{project_id}/files", response_model=ProjectFileResponse, status_code=status.HTTP_201_CREATED)
 def upload_file_for_project(
     project_id: int,
@@ -26,67 +89,220 @@ def upload_file_for_project(
 ):
     check_project_membership(project_id, current_user.id, db)
 
-    file_extension = file.filename.split('.')[-1] if '.' in file.filename else ''
-    object_name = f"{uuid.uuid4()}.{file_extension}"
-    
+    object_name = _object_name(file.filename)
     try:
-        file.file.seek(0, 2)
-        file_size = file.file.tell()
-        file.file.seek(0)
-        
-        minio_client.put_object(
-            bucket_name=settings.MINIO_BUCKET_NAME,
-            object_name=object_name,
-            data=file.file,
-            length=file_size,
-            content_type=file.content_type
+        file_size, checksum = put_object_streaming(minio_client, object_name, file.file, file.content_type)
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to upload file to storage: {e}")
+
+    return _record_file(db, project_id, current_user.id, file.filename, object_name, file.content_type, file_size, checksum)
+
+def _check_upload_access(db: Session, project_id: int, user_id: int) -> Optional[int]:
+    check_project_membership(project_id, user_id, db)
+    remaining = remaining_quota(db, project_id)
+    # The body can take minutes to arrive; don't keep a pooled connection checked out meanwhile.
+    db.rollback()
+    return remaining
+
+@router.post("/projects/{project_id}/files/stream", response_model=ProjectFileResponse, status_code=status.HTTP_201_CREATED)
+async def stream_file_to_project(
+    project_id: int,
+    request: Request,
+    filename: str = Query(..., min_length=1, max_length=255),
+    db: Session = Depends(get_session),
+    current_user: User = Depends(get_session_user),
+    minio_client: Minio = Depends(get_minio_client)
+):
+    """Store the raw request body as a project file, piping it into storage as it arrives.
+
+    Unlike the form upload above, nothing is spooled to a temporary file first. Send the
+    file's type as Content-Type and its name as `filename`.
+    """
+    # Read before the rollback below expires the user object.
+    user_id = current_user.id
+    remaining = await run_db(db, _check_upload_access, project_id, user_id)
+    # Refuse early when the declared size can't fit; the quota is enforced again once the size is known.
+    content_length = request.headers.get("content-length")
+    if remaining is not None and content_length and content_length.isdigit() and int(content_length) > remaining:
+        raise _quota_exceeded()
+
+    object_name = _object_name(filename)
+    content_type = request.headers.get("content-type")
+    try:
+        file_size, checksum = await run_in_threadpool(
+            put_object_streaming, minio_client, object_name, RequestBodyReader(request.stream()), content_type
         )
+    except ClientDisconnect:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Upload interrupted")
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to upload file to storage: {e}")
 
-    db_file = ProjectFile(
-        project_id=project_id,
-        file_name=file.filename,
-        object_name=object_name,
-        content_type=file.content_type,
-        file_size=file_size,
-        uploaded_by_id=current_user.id
+    try:
+        return await run_db(db, _record_file, project_id, user_id, filename, object_name, content_type, file_size, checksum)
+    except Exception:
+        # Don't leave behind an object that no row points to.
+        with contextlib.suppress(Exception):
+            await run_in_threadpool(minio_client.remove_object, settings.MINIO_BUCKET_NAME, object_name)
+        raise
+
+@router.post("/projects/{project_id}/files/uploads", response_model=PresignedUploadResponse)
+def create_presigned_upload(
+    project_id: int,
+    upload: PresignedUploadCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Issue a URL the browser uploads to directly, then call /uploads/complete with the returned token."""
+    check_project_membership(project_id, current_user.id, db)
+    if upload.method not in ("PUT", "POST"):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="method must be PUT or POST")
+    if upload.file_size is not None and not 0 <= upload.file_size <= settings.UPLOAD_MAX_BYTES:
+        raise HTTPException(status_code=status.HTTP_413_CONTENT_TOO_LARGE, detail=f"Files are limited to {settings.UPLOAD_MAX_BYTES} bytes")
+    remaining = remaining_quota(db, project_id)
+    if remaining is not None and (upload.file_size or 0) > remaining:
+        raise _quota_exceeded()
+
+    object_name = _object_name(upload.file_name)
+    try:
+        url, fields, headers, expires_at = presign_upload(object_name, upload.method, upload.content_type, upload.file_size)
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Could not generate upload URL: {e}")
+
+    # If the upload is never completed, the object is removed once the token can no longer be used.
+    enqueue_job(
+        db, "files.discard_unclaimed", {"bucket": settings.MINIO_BUCKET_NAME, "object_name": object_name},
+        delay_seconds=settings.PRESIGNED_UPLOAD_COMPLETE_SECONDS + 300
     )
-    db.add(db_file)
     db.commit()
-    db.refresh(db_file)
+    token = create_upload_token(project_id, current_user.id, object_name, upload.file_name, upload.content_type, upload.file_size)
+    return PresignedUploadResponse(
+        method=upload.method, url=url, fields=fields, headers=headers, upload_token=token, expires_at=expires_at
+    )
 
-    return db_file
+@router.post("/projects/{project_id}/files/uploads/complete", response_model=ProjectFileResponse, status_code=status.HTTP_201_CREATED)
+def complete_presigned_upload(
+    project_id: int,
+    completion: PresignedUploadComplete,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    minio_client: Minio = Depends(get_minio_client)
+):
+    claims = read_upload_token(completion.upload_token)
+    if claims["project_id"] != project_id or claims["user_id"] != current_user.id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Upload token was issued for another project or user")
+    check_project_membership(project_id, current_user.id, db)
+
+    object_name = claims["object_name"]
+    # Completing twice (e.g. a retried request) returns the file recorded the first time.
+    existing = db.query(ProjectFile).filter(ProjectFile.object_name == object_name).first()
+    if existing:
+        return existing
+
+    try:
+        stat = minio_client.stat_object(settings.MINIO_BUCKET_NAME, object_name)
+    except S3Error as e:
+        if e.code in ("NoSuchKey", "NoSuchObject"):
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="The file has not been uploaded yet")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Could not verify the upload: {e}")
+
+    if (claims["file_size"] is not None and stat.size != claims["file_size"]) or stat.size > settings.UPLOAD_MAX_BYTES:
+        enqueue_job(db, "files.remove_object", {"bucket": settings.MINIO_BUCKET_NAME, "object_name": object_name})
+        db.commit()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Uploaded file does not match the declared size")
+
+    try:
+        return _record_file(
+            db, project_id, current_user.id, claims["file_name"], object_name,
+            stat.content_type or claims["content_type"], stat.size, None
+        )
+    except IntegrityError:
+        db.rollback()
+        return db.query(ProjectFile).filter(ProjectFile.object_name == object_name).one()
 
 @router.get("/projects/{project_id}/files", response_model=List[ProjectFileResponse])
 def list_files_for_project(
+    project_id: int,
+    response: Response,
+    content_type: Optional[str] = None,
+    sort: Literal["uploaded_at", "-uploaded_at"] = "uploaded_at",
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    after: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    check_project_membership(project_id, current_user.id, db)
+    query = db.query(ProjectFile).options(joinedload(ProjectFile.blob)).filter(ProjectFile.project_id == project_id)
+    if content_type is not None:
+        query = query.filter(ProjectFile.content_type == content_type)
+    return file_responses(paginate(query, response, sort, {"uploaded_at": ProjectFile.uploaded_at}, ProjectFile.id, limit, after))
+
+# The object holding a file's bytes: its blob's, or its own for files stored before deduplication.
+_stored_object = func.coalesce(FileBlob.object_name, ProjectFile.object_name)
+
+def _download_links(rows) -> List[dict]:
+    """Presigned GET URLs for (file id, object name) rows, reusing recently generated ones."""
+    links = []
+    for file_id, object_name in rows:
+        cached = download_url_cache.get(object_name)
+        if cached is None:
+            expires = timedelta(seconds=settings.DOWNLOAD_URL_EXPIRES_SECONDS)
+            url = presign_client.presigned_get_object(settings.MINIO_BUCKET_NAME, object_name, expires=expires)
+            cached = (url, datetime.now(timezone.utc) + expires)
+            download_url_cache.set(object_name, cached)
+        links.append({"file_id": file_id, "url": cached[0], "expires_at": cached[1]})
+    return links
+
+@router.post("/files/download-links", response_model=DownloadLinksResponse)
+def get_file_download_links(
+    request: DownloadLinksRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Download URLs for many files in one call; ids the caller can't see are listed as missing."""
+    file_ids = list(dict.fromkeys(request.file_ids))
+    if len(file_ids) > settings.DOWNLOAD_LINKS_MAX:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"At most {settings.DOWNLOAD_LINKS_MAX} files per request")
+    if not file_ids:
+        return {"links": [], "missing": []}
+
+    rows = db.query(ProjectFile.id, _stored_object).outerjoin(FileBlob, FileBlob.id == ProjectFile.blob_id).join(ProjectMember, and_(
+        ProjectMember.project_id == ProjectFile.project_id, ProjectMember.user_id == current_user.id
+    )).filter(ProjectFile.id.in_(file_ids)).all()
+    order = {file_id: index for index, file_id in enumerate(file_ids)}
+    rows.sort(key=lambda row: order[row.id])
+    try:
+        links = _download_links(rows)
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Could not generate download links: {e}")
+    found = {row.id for row in rows}
+    return {"links": links, "missing": [file_id for file_id in file_ids if file_id not in found]}
+
+@router.get("/projects/{project_id}/storage", response_model=ProjectStorageResponse)
+def get_project_storage(
     project_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     check_project_membership(project_id, current_user.id, db)
-    return db.query(ProjectFile).filter(ProjectFile.project_id == project_id).all()
+    return get_storage_usage(db, project_id)
 
 @router.get("/files/{file_id}/download")
 def get_file_download_link(
     file_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-    minio_client: Minio = Depends(get_minio_client)
+    current_user: User = Depends(get_current_user)
 ):
-    db_file = db.query(ProjectFile).filter(ProjectFile.id == file_id).first()
+    # Kept for existing clients; POST /files/download-links fetches many links at once.
+    db_file = db.query(ProjectFile.id, ProjectFile.project_id, _stored_object).outerjoin(
+        FileBlob, FileBlob.id == ProjectFile.blob_id
+    ).filter(ProjectFile.id == file_id).first()
     if not db_file:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found")
         
     check_project_membership(db_file.project_id, current_user.id, db)
     
     try:
-        presigned_url = minio_client.presigned_get_object(
-            bucket_name=settings.MINIO_BUCKET_NAME,
-            object_name=db_file.object_name,
-            expires=timedelta(hours=1)
-        )
-        return {"url": presigned_url}
+        return {"url": _download_links([(db_file.id, db_file[2])])[0]["url"]}
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Could not generate download link: {e}")
 
@@ -94,23 +310,36 @@ def get_file_download_link(
 def delete_project_file(
     file_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-    minio_client: Minio = Depends(get_minio_client)
+    current_user: User = Depends(get_current_user)
 ):
-    db_file = db.query(ProjectFile).filter(ProjectFile.id == file_id).first()
+    # Locked so a worker fingerprinting this file can't attach it to a blob behind our back.
+    db_file = db.query(ProjectFile).filter(ProjectFile.id == file_id).with_for_update().first()
     if not db_file:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found")
     
-    membership = check_project_membership(db_file.project_id, current_user.id, db)
+    project_role = check_project_membership(db_file.project_id, current_user.id, db)
 
-    if membership.role.name != 'manager' and db_file.uploaded_by_id != current_user.id:
+    if project_role != 'manager' and db_file.uploaded_by_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to delete this file")
 
-    try:
-        minio_client.remove_object(settings.MINIO_BUCKET_NAME, db_file.object_name)
-    except Exception as e:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to delete file from storage: {e}")
+    object_name = db_file.object_name
+    # Download links are cached under the object actually holding the bytes (see _stored_object).
+    stored_object = db_file.blob.object_name if db_file.blob_id is not None else object_name
+    release_storage(db, db_file.project_id, db_file.file_size or 0)
+    if db_file.blob_id is not None:
+        # Shared content; its object goes once the last file referencing it does.
+        release_blob(db, db_file.blob_id)
+    else:
+        # The object is removed by a worker once the row is gone, with retries if storage is unavailable.
+        enqueue_job(db, "files.remove_object", {"bucket": settings.MINIO_BUCKET_NAME, "object_name": object_name})
 
+    # Tasks listing this file change with it; stamp them before the cascade drops the links.
+    task_ids = db.execute(update(Task).where(
+        Task.id.in_(select(task_files_table.c.task_id).where(task_files_table.c.file_id == file_id))
+    ).values(updated_at=func.now()).returning(Task.id).execution_options(synchronize_session=False)).scalars().all()
+    if task_ids:
+        publish_project_event(db, db_file.project_id, "task.updated", task_ids=task_ids)
     db.delete(db_file)
     db.commit()
+    download_url_cache.pop(stored_object)
     return
\ No newline at end of file
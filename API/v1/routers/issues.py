@@ -1,12 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Literal, Optional
 
+from core.config import settings
 from core.database import get_db
 from v1.auth import get_current_user
+from v1.conditional import collection_version, not_modified, version_etag
 from v1.models import User, Issue
 from v1.schemas import IssueCreate, IssueUpdate, IssueResponse
-from .tasks import check_project_membership
+from v1.pagination import paginate
+from v1.permissions import check_project_membership
 
 router = APIRouter(
     tags=["issues"],
@@ -30,11 +33,30 @@ def create_issue_for_project(
 @router.get("/projects/{project_id}/issues/", response_model=List[IssueResponse])
 def read_issues_for_project(
     project_id: int,
+    request: Request,
+    response: Response,
+    issue_status: Optional[str] = Query(None, alias="status"),
+    severity: Optional[str] = None,
+    assignee_id: Optional[int] = None,
+    sort: Literal["created_at", "-created_at", "id", "-id"] = "created_at",
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    after: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     check_project_membership(project_id, current_user.id, db)
-    return db.query(Issue).filter(Issue.project_id == project_id).all()
+    etag = version_etag(request, *collection_version(db, Issue.updated_at, Issue.project_id == project_id))
+    unchanged = not_modified(request, response, etag)
+    if unchanged:
+        return unchanged
+    query = db.query(Issue).filter(Issue.project_id == project_id)
+    if issue_status is not None:
+        query = query.filter(Issue.status == issue_status)
+    if severity is not None:
+        query = query.filter(Issue.severity == severity)
+    if assignee_id is not None:
+        query = query.filter(Issue.assignee_id == assignee_id)
+    return paginate(query, response, sort, {"created_at": Issue.created_at, "id": Issue.id}, Issue.id, limit, after)
 
 @router.put("/issues/{issue_id}", response_model=IssueResponse)
 def update_issue(
@@ -1,12 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 from typing import List
 
 from core.database import get_db
 from v1.auth import get_current_user
-from v1.models import User, ProjectMember, Milestone
+from v1.conditional import collection_version, not_modified, version_etag
+from v1.events import publish_project_event
+from v1.models import User, Milestone
 from v1.schemas import MilestoneCreate, MilestoneResponse
-from .tasks import check_project_membership
+from v1.permissions import check_project_membership
 
 router = APIRouter(
     tags=["milestones"],
@@ -19,12 +21,14 @@ def create_milestone_for_project(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    membership = check_project_membership(project_id, current_user.id, db)
-    if membership.role.name != 'manager':
+    project_role = check_project_membership(project_id, current_user.id, db)
+    if project_role != 'manager':
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only project managers can create milestones")
 
     db_milestone = Milestone(**milestone.dict(), project_id=project_id)
     db.add(db_milestone)
+    db.flush()
+    publish_project_event(db, project_id, "milestone.created", milestone_id=db_milestone.id)
     db.commit()
     db.refresh(db_milestone)
     return db_milestone
@@ -32,10 +36,16 @@ def create_milestone_for_project(
 @router.get("/projects/{project_id}/milestones/", response_model=List[MilestoneResponse])
 def read_milestones_for_project(
     project_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     check_project_membership(project_id, current_user.id, db)
+    etag = version_etag(request, *collection_version(db, Milestone.updated_at, Milestone.project_id == project_id))
+    unchanged = not_modified(request, response, etag)
+    if unchanged:
+        return unchanged
     return db.query(Milestone).filter(Milestone.project_id == project_id).all()
 
 @router.put("/milestones/{milestone_id}", response_model=MilestoneResponse)
@@ -49,13 +59,14 @@ def update_milestone(
     if not db_milestone:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Milestone not found")
 
-    membership = check_project_membership(db_milestone.project_id, current_user.id, db)
-    if membership.role.name != 'manager':
+    project_role = check_project_membership(db_milestone.project_id, current_user.id, db)
+    if project_role != 'manager':
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only project managers can update milestones")
 
     for key, value in milestone_update.dict().items():
         setattr(db_milestone, key, value)
 
+    publish_project_event(db, db_milestone.project_id, "milestone.updated", milestone_id=milestone_id)
     db.commit()
     db.refresh(db_milestone)
     return db_milestone
@@ -70,10 +81,11 @@ def delete_milestone(
     if not db_milestone:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Milestone not found")
 
-    membership = check_project_membership(db_milestone.project_id, current_user.id, db)
-    if membership.role.name != 'manager':
+    project_role = check_project_membership(db_milestone.project_id, current_user.id, db)
+    if project_role != 'manager':
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only project managers can delete milestones")
 
+    publish_project_event(db, db_milestone.project_id, "milestone.deleted", milestone_id=milestone_id)
     db.delete(db_milestone)
     db.commit()
     return
\ No newline at end of file
@@ -1,38 +1,90 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, Request, Response, status
+from sqlalchemy import update
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Literal, Optional
 
-from core.database import get_db
-from v1.auth import get_current_user
+from core.config import settings
+from core.database import get_session, run_db
+from v1.auth import get_session_user
+from v1.conditional import not_modified, version_etag
 from v1.models import User, Notification
-from v1.schemas import NotificationResponse
+from v1.notification_inbox import apply_unread_deltas, get_inbox_state
+from v1.pagination import paginate
+from v1.schemas import NotificationMarkRead, NotificationMarkReadResponse, NotificationResponse, UnreadCountResponse
 
 router = APIRouter(
     prefix="/notifications",
     tags=["notifications"],
 )
 
+def _read_notifications(db: Session, request: Request, response: Response, user_id: int, unread_only: bool, sort: str, limit: int, after: Optional[str]):
+    # The counter row's version moves on every change to this inbox, so it tags every page of it.
+    unchanged = not_modified(request, response, version_etag(request, user_id, *get_inbox_state(db, user_id)))
+    if unchanged:
+        return unchanged
+    query = db.query(Notification).filter(Notification.user_id == user_id)
+    if unread_only:
+        query = query.filter(Notification.is_read == False)
+    return paginate(query, response, sort, {"created_at": Notification.created_at}, Notification.id, limit, after)
+
 @router.get("/me", response_model=List[NotificationResponse])
-def get_my_notifications(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+async def get_my_notifications(
+    request: Request,
+    response: Response,
+    unread_only: bool = False,
+    sort: Literal["created_at", "-created_at"] = "-created_at",
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    after: Optional[str] = None,
+    db: Session = Depends(get_session),
+    current_user: User = Depends(get_session_user)
+):
+    return await run_db(db, _read_notifications, request, response, current_user.id, unread_only, sort, limit, after)
+
+def _unread_count(db: Session, user_id: int):
+    return UnreadCountResponse(unread_count=get_inbox_state(db, user_id)[0])
+
+@router.get("/me/unread-count", response_model=UnreadCountResponse)
+async def get_my_unread_count(
+    db: Session = Depends(get_session),
+    current_user: User = Depends(get_session_user)
+):
+    return await run_db(db, _unread_count, current_user.id)
+
+def _mark_as_read(db: Session, user_id: int, *criteria) -> int:
+    marked = db.execute(
+        update(Notification).where(
+            Notification.user_id == user_id,
+            Notification.is_read == False,
+            *criteria
+        ).values(is_read=True).execution_options(synchronize_session=False)
+    ).rowcount
+    if marked:
+        apply_unread_deltas(db, {user_id: -marked})
+    return marked
+
+def _mark_all_as_read(db: Session, user_id: int, up_to_id: Optional[int]):
+    criteria = [Notification.id <= up_to_id] if up_to_id is not None else []
+    marked = _mark_as_read(db, user_id, *criteria)
+    db.commit()
+    return NotificationMarkReadResponse(marked_read=marked, unread_count=get_inbox_state(db, user_id)[0])
+
+@router.post("/me/read", response_model=NotificationMarkReadResponse)
+async def mark_my_notifications_as_read(
+    body: NotificationMarkRead,
+    db: Session = Depends(get_session),
+    current_user: User = Depends(get_session_user)
 ):
-    return db.query(Notification).filter(Notification.user_id == current_user.id).order_by(Notification.created_at.desc()).all()
+    return await run_db(db, _mark_all_as_read, current_user.id, body.up_to_id)
+
+def _mark_notification_as_read(db: Session, notification_id: int, current_user: User):
+    _mark_as_read(db, current_user.id, Notification.id == notification_id)
+    db.commit()
 
 @router.post("/{notification_id}/read", status_code=status.HTTP_204_NO_CONTENT)
-def mark_notification_as_read(
+async def mark_notification_as_read(
     notification_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: Session = Depends(get_session),
+    current_user: User = Depends(get_session_user)
 ):
-    notification = db.query(Notification).filter(
-        Notification.id == notification_id,
-        Notification.user_id == current_user.id
-    ).first()
-
-    if not notification:
-        return
-    
-    notification.is_read = True
-    db.commit()
-    return
\ No newline at end of file
+    await run_db(db, _mark_notification_as_read, notification_id, current_user)
+    return
@@ -1,11 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy.orm import Session, joinedload, selectinload
+from typing import List, Optional
 
-from core.database import get_db
-from v1.auth import get_current_user
-from v1.models import User, Role, Project, ProjectMember
-from v1.schemas import ProjectCreate, ProjectResponse, MemberCreate, ProjectMemberResponse
+from core.config import settings
+from core.database import get_db, get_session, run_db
+from v1.auth import get_current_user, get_session_user
+from v1.conditional import json_response_with_etag
+from v1.models import User, Role, Project, ProjectMember, Task, ProjectFile, Milestone
+from v1.pagination import keyset_page
+from v1.permissions import get_project_role, invalidate_project_membership
+from v1.previews import file_responses
+from v1.schemas import (
+    ProjectCreate, ProjectResponse, MemberCreate, ProjectMemberResponse, ProjectInfoResponse, ProjectBoardResponse,
+    TaskResponse, MilestoneResponse, RoleResponse, UserResponse
+)
 
 router = APIRouter(
     prefix="/projects",
@@ -29,6 +37,7 @@ def create_project(project: ProjectCreate, db: Session = Depends(get_db), curren
     first_member = ProjectMember(project_id=db_project.id, user_id=current_user.id, role_id=manager_role.id)
     db.add(first_member)
     db.commit()
+    invalidate_project_membership(db_project.id, current_user.id, db)
     db.refresh(db_project)
     
     # Eagerly load the members for the response
@@ -52,11 +61,7 @@ def read_projects_for_user(db: Session = Depends(get_db), current_user: User = D
 @router.get("/{project_id}", response_model=ProjectResponse)
 def read_project(project_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     # First check for membership
-    membership = db.query(ProjectMember).filter(
-        ProjectMember.project_id == project_id,
-        ProjectMember.user_id == current_user.id
-    ).first()
-    if not membership:
+    if get_project_role(project_id, current_user.id, db) is None:
         raise HTTPException(status_code=404, detail="Project not found or you do not have access")
 
     # Then fetch the project with all its data
@@ -72,16 +77,96 @@ def read_project(project_id: int, db: Session = Depends(get_db), current_user: U
 
 @router.get("/{project_id}/members", response_model=List[ProjectMemberResponse])
 def get_project_members(project_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    is_member = db.query(ProjectMember).filter(
-        ProjectMember.project_id == project_id,
-        ProjectMember.user_id == current_user.id
-    ).first()
-    if not is_member:
+    if get_project_role(project_id, current_user.id, db) is None:
         raise HTTPException(status_code=403, detail="You are not a member of this project")
     
-    members = db.query(ProjectMember).filter(ProjectMember.project_id == project_id).all()
+    members = db.query(ProjectMember).options(
+        joinedload(ProjectMember.user).joinedload(User.role),
+        joinedload(ProjectMember.role)
+    ).filter(ProjectMember.project_id == project_id).all()
     return members
 
+BOARD_FIELDS = ("project", "tasks", "members", "files", "milestones", "roles", "available_users")
+
+def _read_project_board(db: Session, project_id: int, current_user: User, fields: set):
+    if get_project_role(project_id, current_user.id, db) is None:
+        raise HTTPException(status_code=403, detail="You are not a member of this project")
+
+    # Every list is ordered so the same data always serializes to the same ETag.
+    board = {}
+    if "project" in fields:
+        project = db.query(Project).filter(Project.id == project_id).first()
+        if not project:
+            raise HTTPException(status_code=404, detail="Project not found")
+        board["project"] = ProjectInfoResponse.model_validate(project)
+
+    cursors = {}
+    if "tasks" in fields:
+        tasks, cursors["tasks"] = keyset_page(
+            db.query(Task).options(selectinload(Task.files)).filter(Task.project_id == project_id),
+            "created_at", {"created_at": Task.created_at}, Task.id, settings.PAGE_SIZE_DEFAULT
+        )
+        board["tasks"] = [TaskResponse.model_validate(task) for task in tasks]
+
+    if "files" in fields:
+        files, cursors["files"] = keyset_page(
+            db.query(ProjectFile).options(joinedload(ProjectFile.blob)).filter(ProjectFile.project_id == project_id),
+            "uploaded_at", {"uploaded_at": ProjectFile.uploaded_at}, ProjectFile.id, settings.PAGE_SIZE_DEFAULT
+        )
+        board["files"] = file_responses(files)
+    if cursors:
+        board["cursors"] = cursors
+
+    if "members" in fields:
+        members = db.query(ProjectMember).options(
+            joinedload(ProjectMember.user).joinedload(User.role),
+            joinedload(ProjectMember.role)
+        ).filter(ProjectMember.project_id == project_id).order_by(ProjectMember.user_id).all()
+        board["members"] = [ProjectMemberResponse.model_validate(member) for member in members]
+
+    if "milestones" in fields:
+        milestones = db.query(Milestone).filter(Milestone.project_id == project_id).order_by(
+            Milestone.due_date, Milestone.id
+        ).all()
+        board["milestones"] = [MilestoneResponse.model_validate(m) for m in milestones]
+
+    if "roles" in fields:
+        board["roles"] = [RoleResponse.model_validate(role) for role in db.query(Role).order_by(Role.id).all()]
+
+    if "available_users" in fields:
+        # Candidates for the "add member" form; same visibility rule as GET /users/.
+        available = []
+        if current_user.role and current_user.role.name in ['superadmin', 'manager']:
+            is_member = db.query(ProjectMember.user_id).filter(
+                ProjectMember.project_id == project_id,
+                ProjectMember.user_id == User.id
+            ).exists()
+            available = db.query(User).options(joinedload(User.role)).filter(
+                User.is_active == True,
+                ~is_member
+            ).order_by(User.email).limit(settings.PAGE_SIZE_MAX).all()
+        board["available_users"] = [UserResponse.model_validate(user) for user in available]
+
+    return board
+
+@router.get("/{project_id}/board", response_model=ProjectBoardResponse, response_model_exclude_unset=True)
+async def read_project_board(
+    project_id: int,
+    request: Request,
+    fields: Optional[str] = Query(None, description=f"Comma-separated subset of: {', '.join(BOARD_FIELDS)}"),
+    db: Session = Depends(get_session),
+    current_user: User = Depends(get_session_user)
+):
+    selected = set(BOARD_FIELDS)
+    if fields:
+        selected = {field.strip() for field in fields.split(",") if field.strip()}
+        unknown = selected - set(BOARD_FIELDS)
+        if unknown:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown board fields: {', '.join(sorted(unknown))}")
+
+    board = await run_db(db, _read_project_board, project_id, current_user, selected)
+    return json_response_with_etag(request, board)
+
 @router.post("/{project_id}/members", status_code=201)
 def add_project_member(
     project_id: int, 
@@ -89,22 +174,14 @@ def add_project_member(
     db: Session = Depends(get_db), 
     current_user: User = Depends(get_current_user)
 ):
-    membership = db.query(ProjectMember).filter(
-        ProjectMember.project_id == project_id,
-        ProjectMember.user_id == current_user.id
-    ).first()
-    
-    if not membership or membership.role.name != 'manager':
+    if get_project_role(project_id, current_user.id, db) != 'manager':
         raise HTTPException(status_code=403, detail="Not authorized to add members to this project")
 
-    new_member_exists = db.query(ProjectMember).filter(
-        ProjectMember.project_id == project_id,
-        ProjectMember.user_id == member.user_id
-    ).first()
-    if new_member_exists:
+    if get_project_role(project_id, member.user_id, db) is not None:
         raise HTTPException(status_code=400, detail="User is already a member of this project")
         
     db_member = ProjectMember(project_id=project_id, user_id=member.user_id, role_id=member.role_id)
     db.add(db_member)
     db.commit()
+    invalidate_project_membership(project_id, member.user_id, db)
     return {"message": "Member added successfully"}
\ No newline at end of file
@@ -5,8 +5,10 @@ from typing import List
 
 from core.database import get_db
 from v1.auth import get_current_user
-from v1.models import User, Project, Task, ProjectMember
+from v1.models import User, AssigneeTaskCount, Project
+from v1.permissions import check_project_membership
 from v1.schemas import ProjectSummaryResponse, TeamWorkloadResponse
+from v1.task_counters import get_task_counts
 
 router = APIRouter(
     prefix="/reports",
@@ -19,27 +21,16 @@ def get_project_summary(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    membership = db.query(ProjectMember).filter(
-        ProjectMember.project_id == project_id,
-        ProjectMember.user_id == current_user.id
-    ).first()
-
-    if not membership:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not a member of this project")
+    check_project_membership(project_id, current_user.id, db)
 
     project = db.query(Project).filter(Project.id == project_id).first()
     if not project:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
 
-    tasks_by_status = db.query(Task.status, func.count(Task.id)).filter(
-        Task.project_id == project_id
-    ).group_by(Task.status).all()
+    tasks_by_status, updated_at = get_task_counts(db, project_id)
 
-    total_tasks = db.query(Task).filter(Task.project_id == project_id).count()
-    completed_tasks = db.query(Task).filter(
-        Task.project_id == project_id,
-        Task.status == 'completed'
-    ).count()
+    total_tasks = sum(tasks_by_status.values())
+    completed_tasks = tasks_by_status.get('completed', 0)
     
     progress = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
 
@@ -50,7 +41,8 @@ def get_project_summary(
         "total_tasks": total_tasks,
         "completed_tasks": completed_tasks,
         "progress_percentage": progress,
-        "tasks_by_status": dict(tasks_by_status)
+        "tasks_by_status": tasks_by_status,
+        "updated_at": updated_at
     }
 
 @router.get("/team_workload", response_model=List[TeamWorkloadResponse])
@@ -58,13 +50,15 @@ def get_team_workload(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
+    """Open tasks per member who has ever been assigned one, read from the assignee rollup."""
     if current_user.role.name not in ['superadmin', 'manager']:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to view team reports")
 
     workload = db.query(
         User.id.label("assignee_id"),
         User.email,
-        func.count(case((Task.status != 'completed', Task.id), else_=None)).label("open_tasks_count")
-    ).outerjoin(Task, User.id == Task.assignee_id).group_by(User.id, User.email).all()
+        func.sum(case((AssigneeTaskCount.status != 'completed', AssigneeTaskCount.task_count), else_=0)).label("open_tasks_count"),
+        func.max(AssigneeTaskCount.updated_at).label("updated_at")
+    ).join(AssigneeTaskCount, AssigneeTaskCount.user_id == User.id).group_by(User.id, User.email).order_by(User.id).all()
 
     return workload
\ No newline at end of file
@@ -0,0 +1,119 @@
+import html
+import re
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy import Float, Integer, case, cast, func, literal, literal_column, select, tuple_, union_all
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from core.database import get_db
+from v1.auth import get_current_user
+from v1.models import User, Comment, Issue, ProjectFile, ProjectMember, Task
+from v1.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+from v1.permissions import check_project_membership
+from v1.schemas import SearchResult
+
+router = APIRouter(
+    tags=["search"],
+)
+
+# Must match the text search configurations of the generated search_vector columns (v1/models.py).
+ENGLISH = literal_column("'english'::regconfig")
+SIMPLE = literal_column("'simple'::regconfig")
+
+# ts_headline wraps matches in these; the excerpt is HTML-escaped before they become <mark> tags.
+_START, _STOP = "\x02", "\x03"
+HEADLINE_OPTIONS = f'StartSel={_START}, StopSel={_STOP}, MaxWords=30, MinWords=10, MaxFragments=2, FragmentDelimiter=" … "'
+
+_TERM = re.compile(r"[^\W_]+")
+
+def _prefix_query(q: str) -> Optional[str]:
+    """Every word must match, the last one(s) as a prefix too: "desi spec" finds "design specification"."""
+    terms = _TERM.findall(q.lower())[:settings.SEARCH_MAX_TERMS]
+    return " & ".join(f"'{term}':*" for term in terms) or None
+
+def _highlight(headline: str) -> str:
+    return html.escape(headline).replace(_START, "<mark>").replace(_STOP, "</mark>")
+
+@router.get("/search", response_model=List[SearchResult])
+def search(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    project_id: Optional[int] = None,
+    types: Optional[List[Literal["task", "comment", "issue", "file"]]] = Query(None, alias="type"),
+    limit: int = Query(settings.SEARCH_PAGE_SIZE_DEFAULT, ge=1, le=settings.SEARCH_PAGE_SIZE_MAX),
+    after: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Ranked full-text search over the tasks, comments, issues and file names of the caller's projects.
+
+    Pass `type` (repeatable) to restrict the kinds of results and `project_id` to search one project.
+    The cursor for the next page is returned in the X-Next-Cursor header.
+    """
+    terms = _prefix_query(q)
+    if terms is None:
+        return []
+    if project_id is not None:
+        check_project_membership(project_id, current_user.id, db)
+        in_scope = lambda column: column == project_id
+    else:
+        projects = select(ProjectMember.project_id).where(ProjectMember.user_id == current_user.id)
+        in_scope = lambda column: column.in_(projects)
+
+    english_query = func.to_tsquery(ENGLISH, terms)
+    simple_query = func.to_tsquery(SIMPLE, terms)
+    wanted = set(types or ("task", "comment", "issue", "file"))
+    rank = lambda vector, query: cast(func.ts_rank(vector, query), Float).label("rank")
+
+    arms = []
+    if "task" in wanted:
+        arms.append(select(
+            literal("task").label("type"), Task.id, Task.project_id, Task.id.label("task_id"), Task.title,
+            func.concat_ws(" ", Task.title, Task.description).label("body"), rank(Task.search_vector, english_query)
+        ).where(Task.search_vector.op("@@")(english_query), in_scope(Task.project_id)))
+    if "comment" in wanted:
+        arms.append(select(
+            literal("comment").label("type"), Comment.id, Task.project_id, Comment.task_id, Task.title,
+            Comment.content.label("body"), rank(Comment.search_vector, english_query)
+        ).join(Task, Task.id == Comment.task_id).where(Comment.search_vector.op("@@")(english_query), in_scope(Task.project_id)))
+    if "issue" in wanted:
+        arms.append(select(
+            literal("issue").label("type"), Issue.id, Issue.project_id, cast(None, Integer).label("task_id"), Issue.title,
+            func.concat_ws(" ", Issue.title, Issue.description).label("body"), rank(Issue.search_vector, english_query)
+        ).where(Issue.search_vector.op("@@")(english_query), in_scope(Issue.project_id)))
+    if "file" in wanted:
+        arms.append(select(
+            literal("file").label("type"), ProjectFile.id, ProjectFile.project_id, cast(None, Integer).label("task_id"), ProjectFile.file_name,
+            ProjectFile.file_name.label("body"), rank(ProjectFile.search_vector, simple_query)
+        ).where(ProjectFile.search_vector.op("@@")(simple_query), in_scope(ProjectFile.project_id)))
+
+    hits = union_all(*arms).subquery("hits")
+    key = [hits.c.rank, hits.c.type, hits.c.id]
+    page = select(hits)
+    if after:
+        page = page.where(tuple_(*key) < tuple_(*decode_cursor(after, "rank", key)))
+    page = page.order_by(*(column.desc() for column in key)).limit(limit + 1).subquery("page")
+
+    # Excerpts are only built for the rows of this page.
+    headline = case(
+        (page.c.type == "file", func.ts_headline(SIMPLE, page.c.body, simple_query, HEADLINE_OPTIONS)),
+        else_=func.ts_headline(ENGLISH, page.c.body, english_query, HEADLINE_OPTIONS)
+    )
+    rows = db.execute(
+        select(page.c.type, page.c.id, page.c.project_id, page.c.task_id, page.c.title, headline.label("headline"), page.c.rank)
+        .order_by(page.c.rank.desc(), page.c.type.desc(), page.c.id.desc())
+    ).all()
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor("rank", [last.rank, last.type, last.id])
+    return [
+        SearchResult(
+            type=row.type, id=row.id, project_id=row.project_id, task_id=row.task_id,
+            title=row.title, highlight=_highlight(row.headline), rank=row.rank
+        )
+        for row in rows
+    ]
@@ -0,0 +1,50 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from core.database import get_db
+from v1.auth import get_current_user
+from v1.models import User
+from v1.permissions import check_project_membership
+from v1.schemas import TaskGraphOrderResponse, TaskGraphStatusResponse, CriticalPathResponse
+from v1.task_graph import DependencyCycleError, get_task_graph
+
+router = APIRouter(
+    prefix="/projects/{project_id}/graph",
+    tags=["task graph"],
+)
+
+@router.get("/order", response_model=TaskGraphOrderResponse)
+def get_topological_order(
+    project_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    check_project_membership(project_id, current_user.id, db)
+    try:
+        task_ids = get_task_graph(db, project_id).topological_order()
+    except DependencyCycleError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return TaskGraphOrderResponse(project_id=project_id, task_ids=task_ids)
+
+@router.get("/status", response_model=TaskGraphStatusResponse)
+def get_blocked_tasks(
+    project_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    check_project_membership(project_id, current_user.id, db)
+    blocked, unblocked = get_task_graph(db, project_id).blocked_tasks()
+    return TaskGraphStatusResponse(project_id=project_id, blocked=blocked, unblocked=unblocked)
+
+@router.get("/critical-path", response_model=CriticalPathResponse)
+def get_critical_path(
+    project_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    check_project_membership(project_id, current_user.id, db)
+    try:
+        task_ids, length_days = get_task_graph(db, project_id).critical_path()
+    except DependencyCycleError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return CriticalPathResponse(project_id=project_id, task_ids=task_ids, length_days=length_days)
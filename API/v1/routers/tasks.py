@@ -1,51 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import delete, func, insert, update
+from collections import Counter
+from typing import List, Literal, Optional
+from datetime import date
 
-from core.database import get_db
-from v1.auth import get_current_user
-from v1.models import User, ProjectMember, Task, Notification, Project, ProjectFile
-from v1.schemas import TaskCreate, TaskResponse
+from core.config import settings
+from core.database import get_db, get_session, run_db
+from v1.auth import get_current_user, get_session_user
+from v1.conditional import collection_version, not_modified, version_etag
+from v1.events import publish_project_event
+from v1.models import User, Task, ProjectFile
+from v1.notifier import notify_users, send_notifications
+from v1.pagination import paginate
+from v1.permissions import check_project_membership, get_project_roles
+from v1.schemas import TaskCreate, TaskResponse, TaskBulkRequest, TaskBulkResponse
+from v1.task_counters import apply_assignee_count_deltas, apply_task_count_deltas, assignee_deltas, record_task_change
+from v1.task_graph import invalidate_task_graph
 
 router = APIRouter(
     tags=["tasks"],
 )
 
-def update_project_progress(project_id: int, db: Session):
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
-        return
-    
-    total_tasks = db.query(Task).filter(Task.project_id == project_id).count()
-    completed_tasks = db.query(Task).filter(
-        Task.project_id == project_id,
-        Task.status == 'completed'
-    ).count()
-
-    progress = 0
-    if total_tasks > 0:
-        progress = int((completed_tasks / total_tasks) * 100)
-
-    project.progress = progress
-    db.commit()
-
-def check_project_membership(project_id: int, user_id: int, db: Session):
-    membership = db.query(ProjectMember).filter(
-        ProjectMember.project_id == project_id,
-        ProjectMember.user_id == user_id
-    ).first()
-    if not membership:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not a member of this project")
-    return membership
-
-@router.post("/projects/{project_id}/tasks/", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
-def create_task_for_project(
-    project_id: int,
-    task: TaskCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
+def _create_task(db: Session, project_id: int, task: TaskCreate, current_user: User):
     check_project_membership(project_id, current_user.id, db)
     
     if task.assignee_id:
@@ -53,58 +30,203 @@ def create_task_for_project(
 
     db_task = Task(**task.dict(), project_id=project_id)
     db.add(db_task)
-    db.commit()
-    db.refresh(db_task)
+    db.flush()
     
     if db_task.assignee_id:
-        notification_msg = f"You have been assigned a new task: '{db_task.title}'"
-        notification = Notification(user_id=db_task.assignee_id, message=notification_msg)
-        db.add(notification)
-        db.commit()
+        notify_users(db, [db_task.assignee_id], f"You have been assigned a new task: '{db_task.title}'")
+
+    record_task_change(db, project_id, None, db_task.status, new_assignee_id=db_task.assignee_id)
+    publish_project_event(db, project_id, "task.created", task_ids=[db_task.id])
+    db.commit()
+    invalidate_task_graph(project_id)
+    db.refresh(db_task)
+    return TaskResponse.model_validate(db_task)
 
-    update_project_progress(project_id, db)
-    return db_task
+@router.post("/projects/{project_id}/tasks/", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
+async def create_task_for_project(
+    project_id: int,
+    task: TaskCreate,
+    db: Session = Depends(get_session),
+    current_user: User = Depends(get_session_user)
+):
+    return await run_db(db, _create_task, project_id, task, current_user)
 
-@router.get("/projects/{project_id}/tasks/", response_model=List[TaskResponse])
-def read_tasks_for_project(
+def _read_tasks(
+    db: Session,
     project_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    request: Request,
+    response: Response,
+    current_user: User,
+    task_status: Optional[str],
+    priority: Optional[str],
+    assignee_id: Optional[int],
+    due_after: Optional[date],
+    due_before: Optional[date],
+    sort: str,
+    limit: int,
+    after: Optional[str]
 ):
     check_project_membership(project_id, current_user.id, db)
-    return db.query(Task).options(joinedload(Task.files)).filter(Task.project_id == project_id).all()
+    etag = version_etag(request, *collection_version(db, Task.updated_at, Task.project_id == project_id))
+    unchanged = not_modified(request, response, etag)
+    if unchanged:
+        return unchanged
+    query = db.query(Task).options(selectinload(Task.files)).filter(Task.project_id == project_id)
+    if task_status is not None:
+        query = query.filter(Task.status == task_status)
+    if priority is not None:
+        query = query.filter(Task.priority == priority)
+    if assignee_id is not None:
+        query = query.filter(Task.assignee_id == assignee_id)
+    if due_after is not None:
+        query = query.filter(Task.due_date >= due_after)
+    if due_before is not None:
+        query = query.filter(Task.due_date <= due_before)
+    return paginate(query, response, sort, {"created_at": Task.created_at, "id": Task.id}, Task.id, limit, after)
 
-@router.put("/tasks/{task_id}", response_model=TaskResponse)
-def update_task(
-    task_id: int,
-    task_update: TaskCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+@router.get("/projects/{project_id}/tasks/", response_model=List[TaskResponse])
+async def read_tasks_for_project(
+    project_id: int,
+    request: Request,
+    response: Response,
+    task_status: Optional[str] = Query(None, alias="status"),
+    priority: Optional[str] = None,
+    assignee_id: Optional[int] = None,
+    due_after: Optional[date] = None,
+    due_before: Optional[date] = None,
+    sort: Literal["created_at", "-created_at", "id", "-id"] = "created_at",
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    after: Optional[str] = None,
+    db: Session = Depends(get_session),
+    current_user: User = Depends(get_session_user)
 ):
-    db_task = db.query(Task).filter(Task.id == task_id).first()
+    return await run_db(
+        db, _read_tasks, project_id, request, response, current_user,
+        task_status, priority, assignee_id, due_after, due_before, sort, limit, after
+    )
+
+def _update_task(db: Session, task_id: int, task_update: TaskCreate, current_user: User):
+    db_task = db.query(Task).filter(Task.id == task_id).with_for_update().first()
     if not db_task:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
     
     check_project_membership(db_task.project_id, current_user.id, db)
     
     original_assignee_id = db_task.assignee_id
+    original_status = db_task.status
         
     update_data = task_update.dict(exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_task, key, value)
-        
-    db.commit()
-    db.refresh(db_task)
     
     new_assignee_id = db_task.assignee_id
     if new_assignee_id and new_assignee_id != original_assignee_id:
-        notification_msg = f"You have been assigned a new task: '{db_task.title}'"
-        notification = Notification(user_id=new_assignee_id, message=notification_msg)
-        db.add(notification)
-        db.commit()
+        notify_users(db, [new_assignee_id], f"You have been assigned a new task: '{db_task.title}'")
     
-    update_project_progress(db_task.project_id, db)
-    return db_task
+    record_task_change(db, db_task.project_id, original_status, db_task.status, original_assignee_id, new_assignee_id)
+    publish_project_event(db, db_task.project_id, "task.updated", task_ids=[db_task.id])
+    db.commit()
+    if update_data.keys() & {"status", "due_date"}:
+        invalidate_task_graph(db_task.project_id)
+    db.refresh(db_task)
+    return TaskResponse.model_validate(db_task)
+
+@router.put("/tasks/{task_id}", response_model=TaskResponse)
+async def update_task(
+    task_id: int,
+    task_update: TaskCreate,
+    db: Session = Depends(get_session),
+    current_user: User = Depends(get_session_user)
+):
+    return await run_db(db, _update_task, task_id, task_update, current_user)
+
+def _bulk_task_operations(db: Session, project_id: int, operations: TaskBulkRequest, current_user: User):
+    if len(operations.create) + len(operations.update) + len(operations.delete) > settings.BULK_TASKS_MAX:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"At most {settings.BULK_TASKS_MAX} operations per request")
+
+    project_role = check_project_membership(project_id, current_user.id, db)
+    if operations.delete and project_role != 'manager':
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only project managers can delete tasks")
+
+    updates = [op.dict(exclude_unset=True) for op in operations.update]
+    update_ids = [op["id"] for op in updates]
+    delete_ids = list(dict.fromkeys(operations.delete))
+    if len(set(update_ids)) != len(update_ids) or set(update_ids) & set(delete_ids):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Each task may appear in only one update or delete operation")
+
+    assignee_ids = {t.assignee_id for t in operations.create if t.assignee_id}
+    assignee_ids |= {op["assignee_id"] for op in updates if op.get("assignee_id")}
+    if assignee_ids and len(get_project_roles(project_id, assignee_ids, db)) != len(assignee_ids):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Assignees must be members of this project")
+
+    # Lock the touched rows and read what the counters and notifications need, in one query
+    existing = {}
+    if update_ids or delete_ids:
+        rows = db.query(Task.id, Task.title, Task.status, Task.assignee_id).filter(
+            Task.project_id == project_id,
+            Task.id.in_(update_ids + delete_ids)
+        ).with_for_update().all()
+        existing = {row.id: row for row in rows}
+        missing = sorted(set(update_ids + delete_ids) - existing.keys())
+        if missing:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Tasks not found in this project: {missing}")
+
+    deltas = Counter()
+    workload = Counter()
+    notifications = []
+
+    created_ids = []
+    if operations.create:
+        # Core insert on the table so rows with different NULL columns still go out as one batch
+        rows = [dict(task.dict(), project_id=project_id) for task in operations.create]
+        tasks_table = Task.__table__
+        created_ids = list(db.execute(
+            insert(tasks_table).returning(tasks_table.c.id, sort_by_parameter_order=True), rows
+        ).scalars())
+        for task in operations.create:
+            deltas[task.status] += 1
+            assignee_deltas(workload, None, None, task.assignee_id, task.status)
+            if task.assignee_id:
+                notifications.append((task.assignee_id, f"You have been assigned a new task: '{task.title}'"))
+
+    changed = [op for op in updates if len(op) > 1]
+    if changed:
+        db.execute(update(Task), changed)
+        for op in changed:
+            before = existing[op["id"]]
+            new_status = op.get("status", before.status)
+            if new_status != before.status:
+                deltas[before.status] -= 1
+                deltas[new_status] += 1
+            new_assignee_id = op.get("assignee_id", before.assignee_id)
+            assignee_deltas(workload, before.assignee_id, before.status, new_assignee_id, new_status)
+            if new_assignee_id and new_assignee_id != before.assignee_id:
+                notifications.append((new_assignee_id, f"You have been assigned a new task: '{op.get('title', before.title)}'"))
+
+    if delete_ids:
+        db.execute(delete(Task).where(Task.id.in_(delete_ids)).execution_options(synchronize_session=False))
+        for task_id in delete_ids:
+            deltas[existing[task_id].status] -= 1
+            assignee_deltas(workload, existing[task_id].assignee_id, existing[task_id].status, None, None)
+
+    send_notifications(db, notifications)
+    apply_task_count_deltas(db, project_id, deltas)
+    apply_assignee_count_deltas(db, workload)
+    for event_type, task_ids in (("task.created", created_ids), ("task.updated", [op["id"] for op in changed]), ("task.deleted", delete_ids)):
+        if task_ids:
+            publish_project_event(db, project_id, event_type, task_ids=task_ids)
+    db.commit()
+    invalidate_task_graph(project_id)
+    return TaskBulkResponse(created=created_ids, updated=update_ids, deleted=delete_ids)
+
+@router.post("/projects/{project_id}/tasks/bulk", response_model=TaskBulkResponse)
+async def bulk_task_operations(
+    project_id: int,
+    operations: TaskBulkRequest,
+    db: Session = Depends(get_session),
+    current_user: User = Depends(get_session_user)
+):
+    return await run_db(db, _bulk_task_operations, project_id, operations, current_user)
 
 @router.delete("/tasks/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_task(
@@ -112,19 +234,21 @@ def delete_task(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    db_task = db.query(Task).filter(Task.id == task_id).first()
+    db_task = db.query(Task).filter(Task.id == task_id).with_for_update().first()
     if not db_task:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
         
-    membership = check_project_membership(db_task.project_id, current_user.id, db)
+    project_role = check_project_membership(db_task.project_id, current_user.id, db)
 
-    if membership.role.name != 'manager':
+    if project_role != 'manager':
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only project managers can delete tasks")
         
     project_id = db_task.project_id
+    record_task_change(db, project_id, db_task.status, None, old_assignee_id=db_task.assignee_id)
+    publish_project_event(db, project_id, "task.deleted", task_ids=[task_id])
     db.delete(db_task)
     db.commit()
-    update_project_progress(project_id, db)
+    invalidate_task_graph(project_id)
     return
 
 @router.post("/tasks/{task_id}/files/{file_id}", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
@@ -148,6 +272,9 @@ def attach_file_to_task(
         raise HTTPException(status_code=400, detail="File already attached to this task")
 
     db_task.files.append(db_file)
+    # The file list is part of the task payload, so it counts as a change to the task.
+    db_task.updated_at = func.now()
+    publish_project_event(db, db_task.project_id, "task.updated", task_ids=[db_task.id])
     db.commit()
     db.refresh(db_task)
     return db_task
\ No newline at end of file
@@ -1,31 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Literal, Optional
+from datetime import datetime
 
+from core.config import settings
 from core.database import get_db
 from v1.auth import get_current_user
-from v1.models import User, Task, TimeLog, ProjectMember
+from v1.models import User, TimeLog
+from v1.pagination import paginate
+from v1.permissions import get_task_and_check_membership
 from v1.schemas import TimeLogCreate, TimeLogResponse
 
 router = APIRouter(
     tags=["time-tracking"],
 )
 
-def get_task_and_check_membership(task_id: int, user_id: int, db: Session):
-    task = db.query(Task).filter(Task.id == task_id).first()
-    if not task:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
-    
-    membership = db.query(ProjectMember).filter(
-        ProjectMember.project_id == task.project_id,
-        ProjectMember.user_id == user_id
-    ).first()
-    
-    if not membership:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to access this task")
-    
-    return task
-
 @router.post("/tasks/{task_id}/timelogs/", response_model=TimeLogResponse, status_code=status.HTTP_201_CREATED)
 def create_time_log_for_task(
     task_id: int,
@@ -44,11 +33,25 @@ def create_time_log_for_task(
 @router.get("/tasks/{task_id}/timelogs/", response_model=List[TimeLogResponse])
 def read_time_logs_for_task(
     task_id: int,
+    response: Response,
+    user_id: Optional[int] = None,
+    started_after: Optional[datetime] = None,
+    started_before: Optional[datetime] = None,
+    sort: Literal["start_time", "-start_time"] = "start_time",
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    after: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     get_task_and_check_membership(task_id, current_user.id, db)
-    return db.query(TimeLog).filter(TimeLog.task_id == task_id).all()
+    query = db.query(TimeLog).filter(TimeLog.task_id == task_id)
+    if user_id is not None:
+        query = query.filter(TimeLog.user_id == user_id)
+    if started_after is not None:
+        query = query.filter(TimeLog.start_time >= started_after)
+    if started_before is not None:
+        query = query.filter(TimeLog.start_time <= started_before)
+    return paginate(query, response, sort, {"start_time": TimeLog.start_time}, TimeLog.id, limit, after)
 
 @router.delete("/timelogs/{time_log_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_time_log(
@@ -1,13 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy.orm import Session, joinedload
+from typing import List, Literal, Optional
 from datetime import timedelta
 from v1.models import User, Role
 from v1.schemas import UserCreate, UserResponse, Token
+from core.config import settings
 from core.database import get_db
 from pydantic import BaseModel, EmailStr
 from v1 import auth
+from v1.pagination import paginate
 from v1.models import User, Role
 
 class RoleResponse(BaseModel):
@@ -58,10 +60,21 @@ def read_users_me(current_user: User = Depends(auth.get_current_user)):
     return current_user
 
 @router.get("/users/", response_model=List[UserResponse], tags=["users"])
-def read_users(db: Session = Depends(get_db), current_user: User = Depends(auth.get_current_user)):
+def read_users(
+    response: Response,
+    is_active: Optional[bool] = None,
+    sort: Literal["id", "-id", "email", "-email"] = "id",
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    after: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(auth.get_current_user)
+):
     if current_user.role.name not in ['superadmin', 'manager']:
         raise HTTPException(status_code=403, detail="Not authorized to view users")
-    return db.query(User).all()
+    query = db.query(User).options(joinedload(User.role))
+    if is_active is not None:
+        query = query.filter(User.is_active == is_active)
+    return paginate(query, response, sort, {"id": User.id, "email": User.email}, User.id, limit, after)
 
 @router.post("/token", response_model=auth.Token, tags=["authentication"])
 def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
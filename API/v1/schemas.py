@@ -1,6 +1,6 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, field_validator
 from datetime import date, datetime
-from typing import List, Optional
+from typing import Dict, List, Literal, Optional
 
 # --- Role Schemas ---
 class RoleResponse(BaseModel):
@@ -48,6 +48,7 @@ class MilestoneResponse(MilestoneBase):
     id: int
     project_id: int
     created_at: datetime
+    updated_at: Optional[datetime] = None
     class Config:
         from_attributes = True
         
@@ -71,18 +72,71 @@ class ProjectResponse(ProjectBase):
     class Config:
         from_attributes = True
 
+class ProjectInfoResponse(ProjectBase):
+    id: int
+    owner_id: int
+    progress: int
+    class Config:
+        from_attributes = True
+
 # --- File Schemas ---
-class ProjectFileResponse(BaseModel):
+class ProjectFileBase(BaseModel):
+    """A file as nested in task payloads; preview links only come with ProjectFileResponse."""
     id: int
     project_id: int
     file_name: str
     content_type: Optional[str] = None
     file_size: Optional[int] = None
+    checksum: Optional[str] = None
     uploaded_at: datetime
     uploaded_by_id: int
     class Config:
         from_attributes = True
 
+class ProjectFileResponse(ProjectFileBase):
+    # "pending" until the preview job has run, then "ready", "unsupported" or "failed"
+    preview_status: str = "pending"
+    thumbnail_url: Optional[str] = None
+    preview_url: Optional[str] = None
+
+class ProjectStorageResponse(BaseModel):
+    file_count: int
+    total_bytes: int
+    quota_bytes: Optional[int] = None
+
+class PresignedUploadCreate(BaseModel):
+    file_name: str
+    content_type: Optional[str] = None
+    # Declared size; when given, the stored object must match it exactly.
+    file_size: Optional[int] = None
+    # "PUT" for a presigned URL, "POST" for a browser form policy
+    method: str = "PUT"
+
+class PresignedUploadResponse(BaseModel):
+    method: str
+    url: str
+    # Form fields to send before the file (POST) or headers to send with it (PUT)
+    fields: Dict[str, str] = {}
+    headers: Dict[str, str] = {}
+    upload_token: str
+    expires_at: datetime
+
+class PresignedUploadComplete(BaseModel):
+    upload_token: str
+
+class DownloadLinksRequest(BaseModel):
+    file_ids: List[int]
+
+class DownloadLink(BaseModel):
+    file_id: int
+    url: str
+    expires_at: datetime
+
+class DownloadLinksResponse(BaseModel):
+    links: List[DownloadLink]
+    # Requested ids that don't exist or belong to projects the caller isn't in
+    missing: List[int] = []
+
 # --- Task Schemas ---
 class TaskBase(BaseModel):
     title: str
@@ -100,13 +154,56 @@ class TaskResponse(TaskBase):
     id: int
     project_id: int
     created_at: datetime
-    files: List[ProjectFileResponse] = []
+    updated_at: Optional[datetime] = None
+    files: List[ProjectFileBase] = []
     class Config:
         from_attributes = True
 
+class TaskBulkUpdate(BaseModel):
+    id: int
+    title: Optional[str] = None
+    description: Optional[str] = None
+    status: Optional[str] = None
+    priority: Optional[str] = None
+    assignee_id: Optional[int] = None
+    due_date: Optional[date] = None
+    reminder_date: Optional[datetime] = None
+
+    @field_validator("title", "status", "priority")
+    @classmethod
+    def not_null(cls, value):
+        # Omit a field to leave it unchanged; these can't be cleared.
+        if value is None:
+            raise ValueError("may be omitted but not null")
+        return value
+
+class TaskBulkRequest(BaseModel):
+    create: List[TaskCreate] = []
+    update: List[TaskBulkUpdate] = []
+    delete: List[int] = []
+
+class TaskBulkResponse(BaseModel):
+    created: List[int]
+    updated: List[int]
+    deleted: List[int]
+
 class TaskDependencyCreate(BaseModel):
     depends_on_task_id: int
 
+class TaskGraphOrderResponse(BaseModel):
+    project_id: int
+    task_ids: List[int]
+
+class TaskGraphStatusResponse(BaseModel):
+    project_id: int
+    blocked: List[int]
+    unblocked: List[int]
+
+class CriticalPathResponse(BaseModel):
+    project_id: int
+    task_ids: List[int]
+    length_days: int
+
 # --- Mention Schemas ---
 class MentionResponse(BaseModel):
     user: UserResponse
@@ -125,6 +222,7 @@ class CommentResponse(CommentBase):
     task_id: int
     author_id: int
     created_at: datetime
+    updated_at: Optional[datetime] = None
     mentions: List[MentionResponse] = []
     class Config:
         from_attributes = True
@@ -168,6 +266,7 @@ class IssueResponse(IssueBase):
     project_id: int
     reporter_id: int
     created_at: datetime
+    updated_at: Optional[datetime] = None
     resolved_at: Optional[datetime] = None
     class Config:
         from_attributes = True
@@ -177,6 +276,8 @@ class TeamWorkloadResponse(BaseModel):
     assignee_id: int
     email: EmailStr
     open_tasks_count: int
+    # When this member's counts last changed
+    updated_at: Optional[datetime] = None
 
 class ProjectSummaryResponse(BaseModel):
     project_id: int
@@ -186,6 +287,19 @@ class ProjectSummaryResponse(BaseModel):
     completed_tasks: int
     progress_percentage: float
     tasks_by_status: dict
+    # When the counts last changed; they are kept current with every task write
+    updated_at: Optional[datetime] = None
+
+# --- Board Schemas ---
+class ProjectBoardResponse(BaseModel):
+    project: Optional[ProjectInfoResponse] = None
+    tasks: Optional[List[TaskResponse]] = None
+    members: Optional[List[ProjectMemberResponse]] = None
+    files: Optional[List[ProjectFileResponse]] = None
+    milestones: Optional[List[MilestoneResponse]] = None
+    roles: Optional[List[RoleResponse]] = None
+    available_users: Optional[List[UserResponse]] = None
+    cursors: Optional[Dict[str, Optional[str]]] = None
 
 # --- Notification Schemas ---
 class NotificationResponse(BaseModel):
@@ -197,6 +311,44 @@ class NotificationResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class NotificationMarkRead(BaseModel):
+    # Mark everything up to and including this id; all unread notifications when omitted.
+    up_to_id: Optional[int] = None
+
+class NotificationMarkReadResponse(BaseModel):
+    marked_read: int
+    unread_count: int
+
+class UnreadCountResponse(BaseModel):
+    unread_count: int
+
+# --- Job Schemas ---
+class JobResponse(BaseModel):
+    id: int
+    kind: str
+    payload: dict
+    status: str
+    attempts: int
+    max_attempts: int
+    last_error: Optional[str] = None
+    created_at: datetime
+    run_at: datetime
+    finished_at: Optional[datetime] = None
+    class Config:
+        from_attributes = True
+
+# --- Search Schemas ---
+class SearchResult(BaseModel):
+    type: Literal["task", "comment", "issue", "file"]
+    id: int
+    project_id: int
+    # The task a comment belongs to
+    task_id: Optional[int] = None
+    title: str
+    # HTML-escaped excerpt with matches wrapped in <mark>
+    highlight: str
+    rank: float
+
 # --- Auth Schemas ---
 class Token(BaseModel):
     access_token: str
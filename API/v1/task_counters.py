@@ -0,0 +1,113 @@
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import case, delete, func, select, text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from v1.jobs import enqueue_job
+from v1.models import AssigneeTaskCount, Project, ProjectTaskCount, Task
+
+def _progress_for(project_id_column):
+    completed = func.sum(case((ProjectTaskCount.status == 'completed', ProjectTaskCount.task_count), else_=0))
+    total = func.sum(ProjectTaskCount.task_count)
+    return select(
+        func.coalesce(completed * 100 / func.nullif(total, 0), 0)
+    ).where(ProjectTaskCount.project_id == project_id_column).scalar_subquery()
+
+def refresh_project_progress(db: Session, project_id: Optional[int] = None):
+    stmt = update(Project).values(progress=_progress_for(Project.id))
+    if project_id is not None:
+        stmt = stmt.where(Project.id == project_id)
+    db.execute(stmt.execution_options(synchronize_session=False))
+
+def apply_task_count_deltas(db: Session, project_id: int, deltas: Dict[str, int]):
+    # Counters are adjusted in the caller's transaction; committing is left to the caller.
+    changed = False
+    for task_status in sorted(deltas):
+        delta = deltas[task_status]
+        if not delta:
+            continue
+        stmt = insert(ProjectTaskCount).values(project_id=project_id, status=task_status, task_count=delta)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ProjectTaskCount.project_id, ProjectTaskCount.status],
+            set_={"task_count": ProjectTaskCount.task_count + stmt.excluded.task_count, "updated_at": func.now()}
+        )
+        db.execute(stmt)
+        changed = True
+
+    if changed:
+        # Recomputed by a worker; a burst of task writes shares one queued refresh per project.
+        enqueue_job(db, "projects.refresh_progress", {"project_id": project_id}, idempotency_key=f"project-progress:{project_id}")
+
+def apply_assignee_count_deltas(db: Session, deltas: Dict[Tuple[int, str], int]):
+    # Keys are (assignee id, status); sorted so concurrent writers lock rows in the same order.
+    for user_id, task_status in sorted(deltas):
+        delta = deltas[user_id, task_status]
+        if not delta:
+            continue
+        stmt = insert(AssigneeTaskCount).values(user_id=user_id, status=task_status, task_count=delta)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[AssigneeTaskCount.user_id, AssigneeTaskCount.status],
+            set_={"task_count": AssigneeTaskCount.task_count + stmt.excluded.task_count, "updated_at": func.now()}
+        )
+        db.execute(stmt)
+
+def assignee_deltas(deltas: Counter, old_assignee_id: Optional[int], old_status: Optional[str], new_assignee_id: Optional[int], new_status: Optional[str]):
+    """Add one task's move from (old assignee, old status) to (new assignee, new status) to `deltas`."""
+    if old_assignee_id is not None and old_status is not None:
+        deltas[old_assignee_id, old_status] -= 1
+    if new_assignee_id is not None and new_status is not None:
+        deltas[new_assignee_id, new_status] += 1
+    return deltas
+
+def record_task_change(
+    db: Session, project_id: int, old_status: Optional[str], new_status: Optional[str],
+    old_assignee_id: Optional[int] = None, new_assignee_id: Optional[int] = None
+):
+    """Adjust the project and assignee rollups for one task being created, edited (old -> new) or deleted."""
+    deltas = Counter()
+    if old_status is not None:
+        deltas[old_status] -= 1
+    if new_status is not None:
+        deltas[new_status] += 1
+    apply_task_count_deltas(db, project_id, deltas)
+    apply_assignee_count_deltas(db, assignee_deltas(Counter(), old_assignee_id, old_status, new_assignee_id, new_status))
+
+def get_task_counts(db: Session, project_id: int) -> Tuple[Dict[str, int], Optional[datetime]]:
+    """The project's task count per status and when any of them last changed."""
+    rows = db.query(ProjectTaskCount.status, ProjectTaskCount.task_count, ProjectTaskCount.updated_at).filter(
+        ProjectTaskCount.project_id == project_id
+    ).all()
+    counts = {row.status: row.task_count for row in rows if row.task_count}
+    return counts, max((row.updated_at for row in rows), default=None)
+
+def reconcile_task_counters(db: Session, project_id: Optional[int] = None):
+    """Rebuild the project rollups (one project's, or all) and, when rebuilding all, the assignee rollups."""
+    # Block concurrent counter upserts so the rebuilt totals match the tasks table exactly.
+    db.execute(text("LOCK TABLE project_task_counts, assignee_task_counts IN EXCLUSIVE MODE"))
+
+    clear = delete(ProjectTaskCount)
+    counts = select(Task.project_id, Task.status, func.count(Task.id)).where(
+        Task.status.isnot(None)
+    ).group_by(Task.project_id, Task.status)
+    if project_id is not None:
+        clear = clear.where(ProjectTaskCount.project_id == project_id)
+        counts = counts.where(Task.project_id == project_id)
+
+    db.execute(clear)
+    db.execute(insert(ProjectTaskCount).from_select(
+        [ProjectTaskCount.project_id, ProjectTaskCount.status, ProjectTaskCount.task_count], counts
+    ))
+    if project_id is None:
+        # Assignees span projects, so their counts are only rebuilt as a whole.
+        db.execute(delete(AssigneeTaskCount))
+        db.execute(insert(AssigneeTaskCount).from_select(
+            [AssigneeTaskCount.user_id, AssigneeTaskCount.status, AssigneeTaskCount.task_count],
+            select(Task.assignee_id, Task.status, func.count(Task.id)).where(
+                Task.assignee_id.isnot(None), Task.status.isnot(None)
+            ).group_by(Task.assignee_id, Task.status)
+        ))
+    refresh_project_progress(db, project_id)
+    db.commit()
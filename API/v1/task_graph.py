@@ -0,0 +1,156 @@
+import heapq
+from collections import deque
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from core.cache import TTLCache
+from core.config import settings
+from v1.models import Task, task_dependency_table
+
+# project_id -> TaskGraph. Writers call invalidate_task_graph after committing.
+task_graph_cache = TTLCache(maxsize=settings.TASK_GRAPH_CACHE_MAX_SIZE, ttl=settings.TASK_GRAPH_CACHE_TTL_SECONDS)
+
+class DependencyCycleError(ValueError):
+    pass
+
+class TaskGraph:
+    """Dependency graph of one project. An edge task -> prerequisite means the task depends on it."""
+
+    def __init__(self, project_id: int):
+        self.project_id = project_id
+        self.status: Dict[int, Optional[str]] = {}
+        self.due_date: Dict[int, Optional[date]] = {}
+        self.start_date: Dict[int, Optional[date]] = {}
+        self.prerequisites: Dict[int, List[int]] = {}
+        self.dependents: Dict[int, List[int]] = {}
+
+    def add_task(self, task_id: int, task_status: Optional[str], due_date: Optional[date], start_date: Optional[date]):
+        self.status[task_id] = task_status
+        self.due_date[task_id] = due_date
+        self.start_date[task_id] = start_date
+        self.prerequisites.setdefault(task_id, [])
+        self.dependents.setdefault(task_id, [])
+
+    def add_edge(self, task_id: int, depends_on_task_id: int):
+        self.prerequisites[task_id].append(depends_on_task_id)
+        self.dependents[depends_on_task_id].append(task_id)
+
+    def has_edge(self, task_id: int, depends_on_task_id: int) -> bool:
+        return depends_on_task_id in self.prerequisites.get(task_id, ())
+
+    def check_new_edge(self, task_id: int, depends_on_task_id: int):
+        """Raise DependencyCycleError if task_id -> depends_on_task_id would close a cycle.
+
+        A cycle appears exactly when task_id is already reachable from depends_on_task_id,
+        so a single BFS over the prerequisite lists decides it in O(V + E).
+        """
+        if task_id == depends_on_task_id:
+            raise DependencyCycleError("A task cannot depend on itself")
+        seen = {depends_on_task_id}
+        queue = deque([depends_on_task_id])
+        while queue:
+            current = queue.popleft()
+            for prerequisite in self.prerequisites.get(current, ()):
+                if prerequisite == task_id:
+                    raise DependencyCycleError("Dependency would create a cycle")
+                if prerequisite not in seen:
+                    seen.add(prerequisite)
+                    queue.append(prerequisite)
+
+    def _order_key(self, task_id: int):
+        due = self.due_date[task_id]
+        return (due is None, due or date.min, task_id)
+
+    def topological_order(self) -> List[int]:
+        # Kahn's algorithm; among ready tasks the earliest due date goes first so the order reads like a schedule.
+        remaining = {task_id: len(prerequisites) for task_id, prerequisites in self.prerequisites.items()}
+        ready = [self._order_key(task_id) for task_id, count in remaining.items() if count == 0]
+        heapq.heapify(ready)
+        order = []
+        while ready:
+            task_id = heapq.heappop(ready)[-1]
+            order.append(task_id)
+            for dependent in self.dependents[task_id]:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    heapq.heappush(ready, self._order_key(dependent))
+        if len(order) != len(remaining):
+            raise DependencyCycleError("Dependency graph contains a cycle")
+        return order
+
+    def blocked_tasks(self) -> Tuple[List[int], List[int]]:
+        """Open tasks split into (blocked, unblocked) by whether every prerequisite is completed."""
+        blocked, unblocked = [], []
+        for task_id in sorted(self.status):
+            if self.status[task_id] == 'completed':
+                continue
+            if any(self.status[p] != 'completed' for p in self.prerequisites[task_id]):
+                blocked.append(task_id)
+            else:
+                unblocked.append(task_id)
+        return blocked, unblocked
+
+    def _duration_days(self, task_id: int) -> int:
+        # A task runs from its latest prerequisite's due date (or its own creation date) to its own due date.
+        due = self.due_date[task_id]
+        if due is None:
+            return 0
+        starts = [self.due_date[p] for p in self.prerequisites[task_id] if self.due_date[p] is not None]
+        start = max(starts) if starts else self.start_date[task_id]
+        if start is None:
+            return 0
+        return max((due - start).days, 0)
+
+    def critical_path(self) -> Tuple[List[int], int]:
+        """Longest chain of dependent tasks weighted by duration in days: (task ids, total days)."""
+        best: Dict[int, int] = {}
+        previous: Dict[int, Optional[int]] = {}
+        for task_id in self.topological_order():
+            before = max(self.prerequisites[task_id], key=lambda p: (best[p], -p), default=None)
+            best[task_id] = self._duration_days(task_id) + (best[before] if before is not None else 0)
+            previous[task_id] = before
+
+        if not best:
+            return [], 0
+        end = max(best, key=lambda task_id: (best[task_id], -task_id))
+        path = []
+        current = end
+        while current is not None:
+            path.append(current)
+            current = previous[current]
+        path.reverse()
+        return path, best[end]
+
+def load_task_graph(db: Session, project_id: int) -> TaskGraph:
+    # Tasks and their outgoing edges come back in a single query; tasks without edges get one NULL row.
+    rows = db.query(
+        Task.id, Task.status, Task.due_date, func.date(Task.created_at), task_dependency_table.c.depends_on_task_id
+    ).outerjoin(
+        task_dependency_table, task_dependency_table.c.task_id == Task.id
+    ).filter(Task.project_id == project_id).all()
+
+    graph = TaskGraph(project_id)
+    edges = []
+    for task_id, task_status, due_date, start_date, depends_on_task_id in rows:
+        if task_id not in graph.status:
+            graph.add_task(task_id, task_status, due_date, start_date)
+        if depends_on_task_id is not None:
+            edges.append((task_id, depends_on_task_id))
+    for task_id, depends_on_task_id in edges:
+        # Edges are only created inside a project; anything pointing elsewhere is ignored.
+        if depends_on_task_id in graph.status:
+            graph.add_edge(task_id, depends_on_task_id)
+    return graph
+
+def get_task_graph(db: Session, project_id: int) -> TaskGraph:
+    graph = task_graph_cache.get(project_id)
+    if graph is None:
+        graph = load_task_graph(db, project_id)
+        task_graph_cache.set(project_id, graph)
+    return graph
+
+def invalidate_task_graph(project_id: int):
+    task_graph_cache.pop(project_id)
@@ -0,0 +1,128 @@
+import hashlib
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterable, BinaryIO, Dict, Optional, Tuple
+
+import anyio.from_thread
+from fastapi import HTTPException, status
+from jose import JWTError, jwt
+from minio import Minio
+from minio.datatypes import PostPolicy
+
+from core.config import settings
+from core.minio_client import presign_client
+from v1.auth import ALGORITHM, SECRET_KEY
+
+class ChecksumReader:
+    """Counts and hashes the bytes read through it."""
+
+    def __init__(self, raw: BinaryIO):
+        self.raw = raw
+        self.size = 0
+        self._sha256 = hashlib.sha256()
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.raw.read(size)
+        self.size += len(data)
+        self._sha256.update(data)
+        return data
+
+    @property
+    def checksum(self) -> str:
+        return self._sha256.hexdigest()
+
+class RequestBodyReader:
+    """Blocking file-like view of an async request body.
+
+    `read` must be called from a worker thread started by anyio (e.g. `run_in_threadpool`);
+    each chunk is pulled from the event loop as it arrives, so nothing is spooled to disk.
+    """
+
+    def __init__(self, chunks: AsyncIterable[bytes]):
+        self._chunks = chunks.__aiter__()
+        self._pending = b""
+        self._done = False
+
+    async def _next_chunk(self) -> Optional[bytes]:
+        try:
+            return await self._chunks.__anext__()
+        except StopAsyncIteration:
+            return None
+
+    def read(self, size: int = -1) -> bytes:
+        buffer = bytearray(self._pending)
+        self._pending = b""
+        while not self._done and (size < 0 or len(buffer) < size):
+            chunk = anyio.from_thread.run(self._next_chunk)
+            if chunk is None:
+                self._done = True
+            else:
+                buffer += chunk
+        if 0 <= size < len(buffer):
+            self._pending = bytes(buffer[size:])
+            del buffer[size:]
+        return bytes(buffer)
+
+def put_object_streaming(minio_client: Minio, object_name: str, data: BinaryIO, content_type: Optional[str]) -> Tuple[int, str]:
+    """Upload `data` without knowing its length; returns (size, sha256 hex).
+
+    MinIO splits it into UPLOAD_PART_SIZE parts and uploads UPLOAD_PARALLEL_PARTS of them
+    concurrently; if anything fails, including reading `data`, the multipart upload is aborted.
+    """
+    reader = ChecksumReader(data)
+    minio_client.put_object(
+        bucket_name=settings.MINIO_BUCKET_NAME,
+        object_name=object_name,
+        data=reader,
+        length=-1,
+        part_size=settings.UPLOAD_PART_SIZE,
+        num_parallel_uploads=settings.UPLOAD_PARALLEL_PARTS,
+        content_type=content_type or "application/octet-stream",
+    )
+    return reader.size, reader.checksum
+
+def presign_upload(object_name: str, method: str, content_type: Optional[str], file_size: Optional[int]) -> Tuple[str, Dict[str, str], Dict[str, str], datetime]:
+    """Returns (url, form fields, headers, expires_at) for a browser upload straight to MinIO."""
+    expires = timedelta(seconds=settings.PRESIGNED_UPLOAD_EXPIRES_SECONDS)
+    expires_at = datetime.now(timezone.utc) + expires
+    if method == "PUT":
+        url = presign_client.presigned_put_object(settings.MINIO_BUCKET_NAME, object_name, expires=expires)
+        return url, {}, {"Content-Type": content_type or "application/octet-stream"}, expires_at
+
+    # A POST policy lets MinIO itself enforce the key, size and type.
+    policy = PostPolicy(settings.MINIO_BUCKET_NAME, expires_at)
+    policy.add_equals_condition("key", object_name)
+    if file_size is not None:
+        policy.add_content_length_range_condition(file_size, file_size)
+    else:
+        policy.add_content_length_range_condition(0, settings.UPLOAD_MAX_BYTES)
+    fields = {"key": object_name}
+    if content_type:
+        policy.add_equals_condition("Content-Type", content_type)
+        fields["Content-Type"] = content_type
+    fields.update(presign_client.presigned_post_policy(policy))
+    scheme = "https" if settings.MINIO_PUBLIC_SECURE else "http"
+    url = f"{scheme}://{settings.MINIO_PUBLIC_ENDPOINT or settings.MINIO_ENDPOINT}/{settings.MINIO_BUCKET_NAME}"
+    return url, fields, {}, expires_at
+
+def create_upload_token(project_id: int, user_id: int, object_name: str, file_name: str, content_type: Optional[str], file_size: Optional[int]) -> str:
+    # Carries everything the completion call needs, so no pending-upload state is kept server-side.
+    claims = {
+        "purpose": "upload",
+        "project_id": project_id,
+        "user_id": user_id,
+        "object_name": object_name,
+        "file_name": file_name,
+        "content_type": content_type,
+        "file_size": file_size,
+        "exp": datetime.now(timezone.utc) + timedelta(seconds=settings.PRESIGNED_UPLOAD_COMPLETE_SECONDS),
+    }
+    return jwt.encode(claims, SECRET_KEY, algorithm=ALGORITHM)
+
+def read_upload_token(token: str) -> dict:
+    try:
+        claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid or expired upload token")
+    if claims.get("purpose") != "upload":
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid or expired upload token")
+    return claims
@@ -0,0 +1,20 @@
+import argparse
+import logging
+import signal
+
+from v1.jobs import start_job_workers, stop_job_workers
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run background jobs from the Postgres job queue.")
+    parser.add_argument("--threads", type=int, default=2, help="Worker threads in this process")
+    parser.add_argument("--kind", action="append", default=None, metavar="KIND", help="Only run jobs of this kind (repeatable)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    stop, threads = start_job_workers(args.threads, args.kind)
+    # Finish the jobs in hand on SIGTERM/SIGINT; anything unclaimed stays queued for the next worker.
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    logging.getLogger("api.jobs").info("Started %s job worker threads", args.threads)
+    stop.wait()
+    stop_job_workers(stop, threads, timeout=60)
@@ -36,6 +36,11 @@ const router = createRouter({
           name: 'admin-users',
           component: UserManagement
         },
+        {
+          path: 'reports',
+          name: 'admin-reports',
+          component: () => import('@/components/admin/AdminReportsView.vue')
+        },
         // add more admin sections here later
         // { path: 'roles', name: 'admin-roles', component: () => import(...) },
       ]
@@ -1,6 +1,17 @@
 import { defineStore } from 'pinia';
+import axios from 'axios';
 import apiClient from '@/api';
 import { useUiStore } from './ui';
+import { useAuthStore } from './auth';
+
+const nextCursor = (response) => response.headers['x-next-cursor'] || null;
+
+// Server-sent events that change what the board shows.
+const PROJECT_EVENTS = ['task.created', 'task.updated', 'task.deleted', 'milestone.created', 'milestone.updated', 'milestone.deleted', 'resync'];
+
+// Kept outside the state so $reset() and devtools never touch the live connection.
+let eventSource = null;
+let refreshTimer = null;
 
 export const useProjectStore = defineStore('project', {
   state: () => ({
@@ -9,8 +20,18 @@ export const useProjectStore = defineStore('project', {
     members: [],
     files: [],
     milestones: [],
+    // Presigned download URLs by file id: { url, expires_at }
+    downloadLinks: {},
     allUsers: [],
     allRoles: [],
+    cursors: {
+      tasks: null,
+      files: null,
+    },
+    loadingMore: {
+      tasks: false,
+      files: false,
+    },
     loading: {
       details: false,
       tasks: false,
@@ -59,31 +80,66 @@ export const useProjectStore = defineStore('project', {
             useUiStore().showToast('Failed to update task status.', 'error');
         }
     },
-    async fetchProjectData(projectId) {
-        const dataTypes = ['tasks', 'members', 'files', 'milestones'];
+    async fetchProjectData(projectId, { silent = false } = {}) {
+        const dataTypes = silent ? [] : ['details', 'tasks', 'members', 'files', 'milestones'];
         dataTypes.forEach(type => this.loading[type] = true);
         
         try {
-            const [tasksRes, membersRes, filesRes, usersRes, rolesRes, milestonesRes] = await Promise.all([
-                apiClient.get(`/projects/${projectId}/tasks/`),
-                apiClient.get(`/projects/${projectId}/members`),
-                apiClient.get(`/projects/${projectId}/files`),
-                apiClient.get('/users/'),
-                apiClient.get('/admin/roles'),
-                apiClient.get(`/projects/${projectId}/milestones/`),
-            ]);
-            this.tasks = tasksRes.data;
-            this.members = membersRes.data;
-            this.files = filesRes.data;
-            this.allUsers = usersRes.data;
-            this.allRoles = rolesRes.data;
-            this.milestones = milestonesRes.data;
+            // One request for the whole board; the browser revalidates it with If-None-Match.
+            const { data } = await apiClient.get(`/projects/${projectId}/board`);
+            this.project = data.project;
+            this.tasks = data.tasks;
+            this.cursors.tasks = data.cursors.tasks;
+            this.members = data.members;
+            this.files = data.files;
+            this.cursors.files = data.cursors.files;
+            this.allUsers = data.available_users;
+            this.allRoles = data.roles;
+            this.milestones = data.milestones;
         } catch (error) {
             useUiStore().showToast('Failed to load project data.', 'error');
         } finally {
             dataTypes.forEach(type => this.loading[type] = false);
         }
     },
+    subscribeToProject(projectId) {
+        this.unsubscribeFromProject();
+        const token = useAuthStore().token;
+        if (!token || typeof EventSource === 'undefined') return;
+
+        // EventSource cannot send headers, so the token goes in the query string.
+        const params = new URLSearchParams({ project_id: projectId, access_token: token });
+        eventSource = new EventSource(`${import.meta.env.VITE_API_BASE_URL}/events/stream?${params}`);
+        const refresh = () => {
+            // Coalesce bursts (a bulk edit sends several events) into one board revalidation.
+            clearTimeout(refreshTimer);
+            refreshTimer = setTimeout(() => this.fetchProjectData(projectId, { silent: true }), 300);
+        };
+        PROJECT_EVENTS.forEach(type => eventSource.addEventListener(type, refresh));
+    },
+    unsubscribeFromProject() {
+        clearTimeout(refreshTimer);
+        if (eventSource) {
+            eventSource.close();
+            eventSource = null;
+        }
+    },
+    async loadMore(projectId, type) {
+        const cursor = this.cursors[type];
+        if (!cursor || this.loadingMore[type]) return;
+
+        this.loadingMore[type] = true;
+        try {
+            const path = type === 'tasks' ? `/projects/${projectId}/tasks/` : `/projects/${projectId}/${type}`;
+            const response = await apiClient.get(path, { params: { after: cursor } });
+            this[type].push(...response.data);
+            this.cursors[type] = nextCursor(response);
+        } catch (error) {
+            useUiStore().showToast(`Failed to load more ${type}.`, 'error');
+        } finally {
+            this.loadingMore[type] = false;
+        }
+    },
     async createTask(projectId, taskData) {
         try {
             const response = await apiClient.post(`/projects/${projectId}/tasks/`, taskData);
@@ -105,11 +161,18 @@ export const useProjectStore = defineStore('project', {
             useUiStore().showToast(error.response?.data?.detail || 'Failed to add member.', 'error');
         }
     },
-    async uploadFile(projectId, formData) {
+    async uploadFile(projectId, file) {
         this.loading.files = true;
         try {
-            const response = await apiClient.post(`/projects/${projectId}/files`, formData, {
-                headers: { 'Content-Type': 'multipart/form-data' },
+            // The browser sends the bytes straight to storage; the API only issues the URL and records the result.
+            const { data: upload } = await apiClient.post(`/projects/${projectId}/files/uploads`, {
+                file_name: file.name,
+                content_type: file.type || null,
+                file_size: file.size,
+            });
+            await axios.put(upload.url, file, { headers: upload.headers });
+            const response = await apiClient.post(`/projects/${projectId}/files/uploads/complete`, {
+                upload_token: upload.upload_token,
             });
             this.files.push(response.data);
             useUiStore().showToast('File uploaded successfully!');
@@ -119,10 +182,24 @@ export const useProjectStore = defineStore('project', {
             this.loading.files = false;
         }
     },
+    hasFreshDownloadLink(fileId) {
+        const link = this.downloadLinks[fileId];
+        return link && new Date(link.expires_at).getTime() - Date.now() > 60 * 1000;
+    },
+    async fetchDownloadLinks(fileIds) {
+        const response = await apiClient.post('/files/download-links', { file_ids: fileIds });
+        for (const link of response.data.links) {
+            this.downloadLinks[link.file_id] = link;
+        }
+    },
     async getDownloadUrl(fileId) {
         try {
-            const response = await apiClient.get(`/files/${fileId}/download`);
-            window.open(response.data.url, '_blank');
+            if (!this.hasFreshDownloadLink(fileId)) {
+                // One call covers every listed file, so later downloads open without a round trip.
+                const stale = this.files.map(f => f.id).filter(id => id !== fileId && !this.hasFreshDownloadLink(id));
+                await this.fetchDownloadLinks([fileId, ...stale].slice(0, 200));
+            }
+            window.open(this.downloadLinks[fileId].url, '_blank');
         } catch (error) {
             useUiStore().showToast('Could not get download link.', 'error');
         }